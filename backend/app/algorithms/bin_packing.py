@@ -1,33 +1,189 @@
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Callable, Union
+from concurrent.futures import ProcessPoolExecutor
+import os
 import time
 import logging
-from ..models.container import Container, Dimensions
-from ..models.item import Item, Position
-from ..utils.spatial_grid import SpatialGrid
+from ..models.container import Container
+from ..models.item import Item
+from ..utils.spatial_grid import SpatialGrid, SEARCH_MODES, choose_resolution
+from ..utils.records import ItemRecord, PositionRecord
+from ..utils.metrics import CANDIDATE_CHECKS, ITEMS_PACKED, PACKING_SECONDS
+from .container_pool import ContainerWorkerPool
+from .capability_index import CapabilityIndex
+from .multi_start import pack_multi_start
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class BinPacker:
+# Score penalty for placing an item outside its preferred zone
+NON_PREFERRED_ZONE_PENALTY = 1000
+
+# Share of a time budget after which scan searches switch to the cheaper extreme points
+FAST_SEARCH_FRACTION = 0.5
+
+# Share of the remaining time budget given to zone-parallel workers; the rest covers
+# process start-up, replaying their placements and the overflow pass
+ZONE_WORKER_BUDGET_SHARE = 0.5
 
-    # 3D bin packing algorithms for optimal placement of items in containers.
 
+class PackingCancelled(Exception):
+    # Raised by BinPacker.place_items when should_stop() asks it to abandon the run
+    pass
+
+
+class TimeBudget:
+    
+    # Deadline of a time-budgeted packing run. Items are packed in priority order until
+    # the budget is spent; the items not reached by then are cut short. Once
+    # FAST_SEARCH_FRACTION of the budget is used, "scan" searches fall back to
+    # "extreme_points" so the remaining time covers more items.
+    
+    
+    def __init__(self, seconds: float, search_mode: str):
+        self.seconds = seconds
+        self.search_mode = search_mode
+        self.start = time.perf_counter()
+        self.deadline = self.start + seconds
+        self.fast_search_at = self.start + seconds * FAST_SEARCH_FRACTION
+        self.fast_search_items = 0  # Items searched with the fallback mode
+        self.cut_short = []  # ItemRecords not attempted before the deadline
+    
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.deadline
+    
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.perf_counter())
+    
+    def mode_for(self, item_count: int = 1) -> str:
+        # Search mode for the next item_count items
+        if self.search_mode == "scan" and time.perf_counter() >= self.fast_search_at:
+            self.fast_search_items += item_count
+            return "extreme_points"
+        return self.search_mode
+    
+    def to_dict(self) -> Dict:
+        return {
+            "timeBudget": self.seconds,
+            "elapsedSeconds": round(time.perf_counter() - self.start, 4),
+            "expired": bool(self.cut_short),
+            "fastSearchItems": self.fast_search_items,
+            "cutShortItems": [item.item_id for item in self.cut_short],
+            "highestCutShortPriority": max((item.priority for item in self.cut_short), default=None)
+        }
+
+
+def _pack_zone(zone: str, items: List[ItemRecord], containers: List[Container],
+               item_dimensions: List[Tuple[float, float, float]], search_mode: str,
+               time_budget: Optional[float] = None) -> Tuple[List[Tuple[str, str, PositionRecord]], List[str]]:
+    
+    # Worker entry point for zone-parallel packing: place a zone's preferred-zone
+    # items (already in packing order) into that zone's containers only, stopping
+    # when time_budget (the seconds left of the run's worker share) is spent.
+    # Returns (item_id, container_id, position) for every item placed, and the ids
+    # of the items not attempted before the budget ran out.
+    
+    logger.info(f"Packing {len(items)} items into {len(containers)} containers of zone '{zone}'")
+    budget = TimeBudget(time_budget, search_mode) if time_budget is not None else None
+    spatial_grids = BinPacker._build_grids(containers, item_dimensions)
+    capabilities = CapabilityIndex(spatial_grids)
+    
+    placed = []
+    for index, item in enumerate(items):
+        if budget and budget.expired():
+            return placed, [item.item_id for item in items[index:]]
+        best_position, best_container = BinPacker._find_best_position(
+            item, containers, spatial_grids, budget.mode_for() if budget else search_mode, 0,
+            index=capabilities
+        )
+        if best_position:
+            BinPacker._commit(item, best_container, best_position, spatial_grids, index=capabilities)
+            placed.append((item.item_id, best_container.container_id, best_position))
+    return placed, []
+
+
+class BinPacker:
+    
+    # 3D bin packing algorithms for optimal placement of items in containers.
     
-    @staticmethod
-    def place_items(items: List[Item], containers: List[Container]) -> Dict:
     
+    @staticmethod
+    def place_items(items: List[Union[Item, ItemRecord]], containers: List[Container], search_mode: str = "scan",
+                    parallel_zones: bool = False, max_workers: Optional[int] = None,
+                    container_workers: int = 0,
+                    progress: Optional[Callable[[int, int, Optional[Dict]], None]] = None,
+                    should_stop: Optional[Callable[[], bool]] = None,
+                    spatial_grids: Optional[Dict[str, SpatialGrid]] = None,
+                    block_building: bool = False, time_budget: Optional[float] = None,
+                    multi_start: int = 0, seed: Optional[int] = None,
+                    sort_weights: Optional[Dict[str, float]] = None) -> Dict:
+        
         # Place items in containers using an optimized First-Fit Decreasing algorithm
         # with zone preferences and multi-orientation support.
+        # search_mode picks the candidate generator of SpatialGrid.find_best_fit:
+        # "scan" (every origin) or "extreme_points" (maintained extreme points only)
+        # parallel_zones packs each zone's preferred-zone items in its own worker
+        # process (up to max_workers), then places the leftovers in a serial overflow pass
+        # container_workers > 1 keeps the container grids in that many worker processes and
+        # evaluates the candidate containers of each item concurrently
+        # progress(done, total, placement) is called after every item (placement is None
+        # if it did not fit); should_stop() is polled before every item and raises
+        # PackingCancelled when it returns True
+        # spatial_grids (container_id -> grid) packs around the items already in those
+        # grids instead of starting from empty ones; the grids and their containers are
+        # updated in place
+        # block_building places each run of consecutive items (in packing order) with the
+        # same dimensions and preferred zone as blocks: one search for the first copy, then
+        # as many copies as fit beside and above it in one grid update (see _place_block)
+        # time_budget (seconds) bounds the run: items are packed in priority order until it
+        # is spent and the rest are returned unplaced, with a "budget" entry describing
+        # what was cut short (see TimeBudget)
+        # multi_start > 1 runs that many packs in worker processes (up to max_workers),
+        # the first unperturbed and the others on orderings, orientations and container
+        # orders randomized from seed, and keeps the plan placing the most priority-weighted
+        # volume, with a "multiStart" entry reporting its gain (see pack_multi_start);
+        # time_budget then caps the whole search
+        # sort_weights (item_id -> factor) scales each item's volume in the sort key;
+        # priority order is kept
+        # Inside the run items and positions are slim records (see utils/records.py);
+        # only the placement dicts of the result are built from them. items may already
+        # be ItemRecords (e.g. from a columnar request), which skips the Item models
+        # altogether
         
         #returns a dictionary of placement results and rearrangement suggestions
-    
-        start_time = time.time()
-        print(f"Starting bin packing with {len(items)} items and {len(containers)} containers")
+        
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search_mode}', expected one of {SEARCH_MODES}")
+        if spatial_grids is not None and (parallel_zones or container_workers > 1):
+            raise ValueError("Preloaded spatial grids cannot be combined with parallel_zones or container_workers")
+        if block_building and (parallel_zones or container_workers > 1):
+            raise ValueError("block_building cannot be combined with parallel_zones or container_workers")
+        if parallel_zones and container_workers > 1:
+            raise ValueError("parallel_zones cannot be combined with container_workers")
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("time_budget must be a positive number of seconds")
+        if multi_start > 1:
+            if spatial_grids is not None or parallel_zones or container_workers > 1:
+                raise ValueError("multi_start cannot be combined with spatial_grids, parallel_zones or container_workers")
+            return pack_multi_start(items, containers, multi_start, seed if seed is not None else 0,
+                                    max_workers=max_workers, time_budget=time_budget, progress=progress,
+                                    should_stop=should_stop, search_mode=search_mode,
+                                    block_building=block_building)
+        
+        start_time = time.perf_counter()
+        budget = TimeBudget(time_budget, search_mode) if time_budget is not None else None
+        logger.info(f"Starting bin packing with {len(items)} items and {len(containers)} containers")
         
         #Sort items by priority (descending) and then by volume (descending)
         # This ensures high priority items are placed first and larger items get better positions
-        sorted_items = sorted(items, key=lambda x: (x.priority, x.calculate_volume()), reverse=True)
-        print(f"Sorted {len(sorted_items)} items by priority and volume")
+        # With block building, identical items of equal priority are also kept together
+        # sort_weights reorders items within a priority level
+        weight = (lambda x: sort_weights[x.item_id]) if sort_weights else (lambda x: 1)
+        if block_building:
+            sort_key = lambda x: (x.priority, x.volume * weight(x), BinPacker._block_key(x))
+        else:
+            sort_key = lambda x: (x.priority, x.volume * weight(x))
+        records = (item if isinstance(item, ItemRecord) else ItemRecord.from_item(item) for item in items)
+        sorted_items = sorted(records, key=sort_key, reverse=True)
+        logger.debug("Sorted %d items by priority and volume", len(sorted_items))
         
         # Group containers by zone for preferred placement
         containers_by_zone = {}
@@ -40,154 +196,88 @@ class BinPacker:
         for zone, zone_containers in containers_by_zone.items():
             zone_containers.sort(key=lambda x: x.get_available_volume(), reverse=True)
         
-        print(f"Grouped containers into {len(containers_by_zone)} zones")
+        logger.debug("Grouped containers into %d zones", len(containers_by_zone))
         
-        # Initialize spatial grids for each container
-        spatial_grids = {}
-        for container in containers:
-            print(f"Initializing grid for container {container.container_id}")
-            spatial_grids[container.container_id] = SpatialGrid(container)
+        # Initialize spatial grids for each container, with a cell size derived from
+        # the container and item dimensions (distinct item shapes only); with
+        # container_workers the grids are built inside the worker processes instead
+        item_dimensions = list(dict.fromkeys(item.dimensions for item in sorted_items))
+        if spatial_grids is not None:
+            pool = None
+        elif container_workers > 1:
+            pool = ContainerWorkerPool(containers, item_dimensions, container_workers)
+            spatial_grids = {}
+        else:
+            pool = None
+            spatial_grids = BinPacker._build_grids(containers, item_dimensions)
         
-        placements = []
-        unplaced_items = []
+        # Free-extent summary of the local grids, to skip containers that cannot take an item
+        capabilities = None if pool else CapabilityIndex(spatial_grids)
         
-        #Try to place each item
-        for index, item in enumerate(sorted_items):
-            if index % 10 == 0:  # Log every 10 items for performance
-                print(f"Processing item {index+1}/{len(sorted_items)}: {item.item_id}")
-                
-            placed = False
-            best_position = None
-            best_container = None
-            best_score = float('inf')  # Lower is better
-            
-            # Calculate item volume once
-            item_volume = item.calculate_volume()
+        if parallel_zones:
+            placements, unplaced_items = BinPacker._place_zone_parallel(
+                sorted_items, containers, containers_by_zone, spatial_grids,
+                item_dimensions, search_mode, max_workers, progress, should_stop, capabilities, budget
+            )
+        else:
+            placements = []
+            unplaced_items = []
             
-            #Try preferred zone first with containers that have enough space
-            if item.preferred_zone in containers_by_zone:
-                print(f"Trying preferred zone '{item.preferred_zone}' for item {item.item_id}")
-                preferred_containers = containers_by_zone[item.preferred_zone]
-                
-                for container in preferred_containers:
-                    # Skip if container doesn't have enough space
-                    if container.get_available_volume() < item_volume:
-                        continue
-                        
-                    grid = spatial_grids[container.container_id]
-                    position = grid.find_best_fit(item.dimensions)
+            #Try to place each item (or each run of identical items with block building)
+            try:
+                index = 0
+                while index < len(sorted_items):
+                    if should_stop and should_stop():
+                        raise PackingCancelled(f"Packing cancelled after {index} of {len(sorted_items)} items")
+                    if budget and budget.expired():
+                        budget.cut_short = sorted_items[index:]
+                        break
+                    item = sorted_items[index]
+                    if index % 10 == 0:  # Log every 10 items for performance
+                        logger.debug("Processing item %d/%d: %s", index + 1, len(sorted_items), item.item_id)
                     
-                    if position:
-                        # Calculate score (0 base score for preferred zone)
-                        score = position.start_coordinates.height * 10  # Prefer lower positions
-                        score += position.start_coordinates.width  # Prefer leftmost positions
-                        score += position.start_coordinates.depth  # Prefer deepest positions
-                        
-                        if score < best_score:
-                            best_score = score
-                            best_position = position
-                            best_container = container
-                
-                # If found in preferred zone, place it
-                if best_position:
-                    print(f"Found placement in preferred zone for item {item.item_id}")
-                    item_with_position = item.copy()
-                    item_with_position.position = best_position
-                    item_with_position.container_id = best_container.container_id
+                    run = BinPacker._identical_run(sorted_items, index) if block_building else [item]
+                    mode = budget.mode_for(len(run)) if budget else search_mode
+                    if len(run) > 1:
+                        records = BinPacker._place_block(run, containers, containers_by_zone,
+                                                         spatial_grids, mode, capabilities)
+                    else:
+                        records = [BinPacker._place_item(item, containers, containers_by_zone,
+                                                         spatial_grids, mode, pool=pool,
+                                                         index=capabilities)]
                     
-                    grid = spatial_grids[best_container.container_id]
-                    grid.place_item(item_with_position, best_position)
-                    
-                    placements.append({
-                        "itemId": item.item_id,
-                        "containerId": best_container.container_id,
-                        "position": {
-                            "startCoordinates": {
-                                "width": best_position.start_coordinates.width,
-                                "depth": best_position.start_coordinates.depth,
-                                "height": best_position.start_coordinates.height
-                            },
-                            "endCoordinates": {
-                                "width": best_position.end_coordinates.width,
-                                "depth": best_position.end_coordinates.depth,
-                                "height": best_position.end_coordinates.height
-                            }
-                        }
-                    })
-                    
-                    placed = True
-            
-            #If not placed in preferred zone, try other zones
-            if not placed:
-                print(f"Trying non-preferred zones for item {item.item_id}")
-                # Reset best values for non-preferred zones
-                best_position = None
-                best_container = None
-                best_score = float('inf')
-                
-                for container in containers:
-                    # Skip if container doesn't have enough space or is in preferred zone (already tried)
-                    if (container.get_available_volume() < item_volume or 
-                        container.zone == item.preferred_zone):
-                        continue
-                        
-                    grid = spatial_grids[container.container_id]
-                    position = grid.find_best_fit(item.dimensions)
-                    
-                    if position:
-                        # Calculate score (1000 base penalty for non-preferred zone)
-                        score = 1000  # Non-preferred zone penalty
-                        score += position.start_coordinates.height * 10  # Prefer lower positions
-                        score += position.start_coordinates.width  # Prefer leftmost positions
-                        score += position.start_coordinates.depth  # Prefer deepest positions
-                        
-                        if score < best_score:
-                            best_score = score
-                            best_position = position
-                            best_container = container
-                
-                if best_position:
-                    print(f"Found placement in non-preferred zone for item {item.item_id}")
-                    item_with_position = item.copy()
-                    item_with_position.position = best_position
-                    item_with_position.container_id = best_container.container_id
-                    
-                    grid = spatial_grids[best_container.container_id]
-                    grid.place_item(item_with_position, best_position)
-                    
-                    placements.append({
-                        "itemId": item.item_id,
-                        "containerId": best_container.container_id,
-                        "position": {
-                            "startCoordinates": {
-                                "width": best_position.start_coordinates.width,
-                                "depth": best_position.start_coordinates.depth,
-                                "height": best_position.start_coordinates.height
-                            },
-                            "endCoordinates": {
-                                "width": best_position.end_coordinates.width,
-                                "depth": best_position.end_coordinates.depth,
-                                "height": best_position.end_coordinates.height
-                            }
-                        }
-                    })
-                    
-                    placed = True
-            
-            if not placed:
-                print(f"Unable to place item {item.item_id}")
-                unplaced_items.append(item)
+                    for run_item, placement in zip(run, records):
+                        index += 1
+                        if placement:
+                            placements.append(placement)
+                        else:
+                            logger.debug("Unable to place item %s", run_item.item_id)
+                            unplaced_items.append(run_item)
+                        if progress:
+                            progress(index, len(sorted_items), placement)
+            finally:
+                if pool:
+                    pool.close()
         
-        print(f"Bin packing completed: {len(placements)} items placed, {len(unplaced_items)} items unplaced")
-        print(f"Total time: {time.time() - start_time:.2f} seconds")
+        cut_short = budget.cut_short if budget else []
+        elapsed = time.perf_counter() - start_time
+        PACKING_SECONDS.observe(elapsed)
+        ITEMS_PACKED.inc(len(placements), outcome="placed")
+        ITEMS_PACKED.inc(len(unplaced_items), outcome="unplaced")
+        ITEMS_PACKED.inc(len(cut_short), outcome="cut_short")
+        logger.info(f"Bin packing completed: {len(placements)} items placed, "
+                    f"{len(unplaced_items)} items unplaced in {elapsed:.2f} seconds")
+        if cut_short:
+            logger.info(f"Time budget of {budget.seconds}s spent; {len(cut_short)} items were not attempted")
         
         # Generate simple rearrangement suggestions for unplaced items
         rearrangements = []
         
-        # If there are unplaced items, suggest expanding containers
+        # If there are unplaced items, suggest expanding containers (items cut short by the
+        # time budget were never tried, so they are left out of the estimate)
         if unplaced_items:
             # Calculate total volume needed for unplaced items
-            total_unplaced_volume = sum(item.calculate_volume() for item in unplaced_items)
+            total_unplaced_volume = sum(item.volume for item in unplaced_items)
             
             # Suggest container expansion
             rearrangements.append({
@@ -196,9 +286,282 @@ class BinPacker:
                 "items": [item.item_id for item in unplaced_items]
             })
         
-        return {
-            "success": len(unplaced_items) == 0,
+        result = {
+            "success": len(unplaced_items) == 0 and not cut_short,
             "placements": placements,
             "rearrangements": rearrangements,
-            "unplaced_items": [item.item_id for item in unplaced_items]
-        }
\ No newline at end of file
+            "unplaced_items": [item.item_id for item in unplaced_items + cut_short]
+        }
+        if budget:
+            result["budget"] = budget.to_dict()
+        return result
+    
+    @staticmethod
+    def _block_key(item: ItemRecord) -> Tuple:
+        # Items with equal keys can be stacked as copies of one another
+        return (item.dimensions, item.zone)
+    
+    @staticmethod
+    def _identical_run(sorted_items: List[ItemRecord], start: int) -> List[ItemRecord]:
+        # The items from start on with the same block key as the item at start
+        key = BinPacker._block_key(sorted_items[start])
+        end = start + 1
+        while end < len(sorted_items) and BinPacker._block_key(sorted_items[end]) == key:
+            end += 1
+        return sorted_items[start:end]
+    
+    @staticmethod
+    def _build_grids(containers: List[Container], item_dimensions: List[Tuple[float, float, float]]) -> Dict[str, SpatialGrid]:
+        # Create a spatial grid per container with a cell size fitting the given item shapes
+        spatial_grids = {}
+        for container in containers:
+            logger.debug("Initializing grid for container %s", container.container_id)
+            resolution = choose_resolution(container, item_dimensions)
+            spatial_grids[container.container_id] = SpatialGrid(container, resolution)
+        return spatial_grids
+    
+    @staticmethod
+    def _score(position: PositionRecord, base_score: float) -> float:
+        # Score a candidate position (lower is better)
+        width, depth, height = position.start
+        score = base_score
+        score += height * 10  # Prefer lower positions
+        score += width  # Prefer leftmost positions
+        score += depth  # Prefer deepest positions
+        return score
+    
+    @staticmethod
+    def _find_best_position(item: ItemRecord, candidates: List[Container], spatial_grids: Dict[str, SpatialGrid],
+                            search_mode: str, base_score: float,
+                            pool: Optional[ContainerWorkerPool] = None,
+                            index: Optional[CapabilityIndex] = None) -> Tuple[Optional[PositionRecord], Optional[Container]]:
+        
+        # Search every candidate container with enough free volume and return the
+        # best scoring position (lower, then leftmost, then deepest) and its container
+        # With an index, containers whose free extent cannot take the item in any
+        # orientation are dropped before their grids are searched
+        
+        if pool:
+            CANDIDATE_CHECKS.inc(len(candidates), result="delegated")
+            best_position, best_container_id, _ = pool.find_best_position(item, candidates, search_mode, base_score)
+            best_container = next((c for c in candidates if c.container_id == best_container_id), None)
+            return best_position, best_container
+        
+        best_position = None
+        best_container = None
+        best_score = float('inf')  # Lower is better
+        
+        if index is not None:
+            fitting = index.candidates(candidates, item.dimensions)
+            CANDIDATE_CHECKS.inc(len(candidates) - len(fitting), result="pruned")
+            candidates = fitting
+        
+        for container in candidates:
+            grid = spatial_grids[container.container_id]
+            # Skip if container doesn't have enough space
+            if grid.capacity - container.occupied_volume < item.volume:
+                CANDIDATE_CHECKS.inc(result="skipped")
+                continue
+            
+            position = grid.search(item.dimensions, search_mode)
+            CANDIDATE_CHECKS.inc(result="fit" if position else "no_fit")
+            
+            if position:
+                score = BinPacker._score(position, base_score)
+                
+                if score < best_score:
+                    best_score = score
+                    best_position = position
+                    best_container = container
+        
+        return best_position, best_container
+    
+    @staticmethod
+    def _commit(item: ItemRecord, container: Container, position: PositionRecord,
+                spatial_grids: Dict[str, SpatialGrid], pool: Optional[ContainerWorkerPool] = None,
+                index: Optional[CapabilityIndex] = None) -> Dict:
+        # Write an item into its container's grid and build the placement record
+        if pool:
+            # The grid lives in a worker; keep the local container's volume in step
+            pool.place(item, container.container_id, position)
+            container.occupied_volume += item.volume
+        else:
+            grid = spatial_grids[container.container_id]
+            grid.place_record(item, position)
+            if index is not None:
+                index.refresh(container.container_id)
+        
+        return BinPacker._placement_record(item, container, position)
+    
+    @staticmethod
+    def _placement_record(item: ItemRecord, container: Container, position: PositionRecord) -> Dict:
+        return {
+            "itemId": item.item_id,
+            "containerId": container.container_id,
+            "position": position.to_dict()
+        }
+    
+    @staticmethod
+    def _locate(item: ItemRecord, containers: List[Container], containers_by_zone: Dict[str, List[Container]],
+                spatial_grids: Dict[str, SpatialGrid], search_mode: str,
+                try_preferred: bool = True, pool: Optional[ContainerWorkerPool] = None,
+                index: Optional[CapabilityIndex] = None) -> Tuple[Optional[PositionRecord], Optional[Container]]:
+        
+        # Find the position for one item: preferred zone first, then every other zone
+        # with a penalty. Returns (None, None) if the item does not fit anywhere
+        
+        #Try preferred zone first with containers that have enough space
+        if try_preferred and item.zone in containers_by_zone:
+            logger.debug("Trying preferred zone '%s' for item %s", item.zone, item.item_id)
+            best_position, best_container = BinPacker._find_best_position(
+                item, containers_by_zone[item.zone], spatial_grids, search_mode, 0, pool, index
+            )
+            
+            # If found in preferred zone, place it
+            if best_position:
+                logger.debug("Found placement in preferred zone for item %s", item.item_id)
+                return best_position, best_container
+        
+        #If not placed in preferred zone, try other zones
+        logger.debug("Trying non-preferred zones for item %s", item.item_id)
+        other_containers = [c for c in containers if c.zone != item.zone]
+        best_position, best_container = BinPacker._find_best_position(
+            item, other_containers, spatial_grids, search_mode, NON_PREFERRED_ZONE_PENALTY, pool, index
+        )
+        
+        if best_position:
+            logger.debug("Found placement in non-preferred zone for item %s", item.item_id)
+        return best_position, best_container
+    
+    @staticmethod
+    def _place_item(item: ItemRecord, containers: List[Container], containers_by_zone: Dict[str, List[Container]],
+                    spatial_grids: Dict[str, SpatialGrid], search_mode: str,
+                    try_preferred: bool = True, pool: Optional[ContainerWorkerPool] = None,
+                    index: Optional[CapabilityIndex] = None) -> Optional[Dict]:
+        
+        # Place one item where _locate finds the best position
+        # Returns the placement record, or None if the item does not fit anywhere
+        
+        best_position, best_container = BinPacker._locate(item, containers, containers_by_zone, spatial_grids,
+                                                          search_mode, try_preferred, pool, index)
+        if best_position:
+            return BinPacker._commit(item, best_container, best_position, spatial_grids, pool, index)
+        return None
+    
+    @staticmethod
+    def _place_block(run: List[ItemRecord], containers: List[Container], containers_by_zone: Dict[str, List[Container]],
+                     spatial_grids: Dict[str, SpatialGrid], search_mode: str,
+                     index: Optional[CapabilityIndex] = None) -> List[Optional[Dict]]:
+        
+        # Place a run of identical items (same dimensions and preferred zone) as blocks.
+        # The first remaining copy is located as a single item would be, then the block
+        # grows from that position (see SpatialGrid.find_block) and takes as many copies
+        # as fit; the rest start a new block. Once a copy fits nowhere, none of the
+        # remaining copies can.
+        # Returns the placement record (or None) of every item of the run, in order
+        
+        records = []
+        remaining = run
+        while remaining:
+            best_position, best_container = BinPacker._locate(remaining[0], containers, containers_by_zone,
+                                                              spatial_grids, search_mode, index=index)
+            if not best_position:
+                break
+            
+            grid = spatial_grids[best_container.container_id]
+            counts = grid.find_block(best_position, len(remaining))
+            positions = grid.block_positions(best_position, counts)[:len(remaining)]
+            logger.debug("Placing a block of %d copies of item %s in container %s",
+                         len(positions), remaining[0].item_id, best_container.container_id)
+            
+            # A partial top layer is placed as its full rows, then the last partial row,
+            # so every part tiles a box
+            layer = counts[0] * counts[1]
+            full_layers = len(positions) // layer * layer
+            full_rows = full_layers + (len(positions) - full_layers) // counts[0] * counts[0]
+            parts = [(0, full_layers), (full_layers, full_rows), (full_rows, len(positions))]
+            
+            for start, end in parts:
+                if start == end:
+                    continue
+                grid.place_block(remaining[start:end], positions[start:end])
+                records.extend(BinPacker._placement_record(item, best_container, position)
+                               for item, position in zip(remaining[start:end], positions[start:end]))
+            if index is not None:
+                index.refresh(best_container.container_id)
+            remaining = remaining[len(positions):]
+        
+        return records + [None] * len(remaining)
+    
+    @staticmethod
+    def _place_zone_parallel(sorted_items: List[ItemRecord], containers: List[Container],
+                             containers_by_zone: Dict[str, List[Container]],
+                             spatial_grids: Dict[str, SpatialGrid], item_dimensions: List[Tuple[float, float, float]],
+                             search_mode: str, max_workers: Optional[int],
+                             progress: Optional[Callable[[int, int, Optional[Dict]], None]] = None,
+                             should_stop: Optional[Callable[[], bool]] = None,
+                             capabilities: Optional[CapabilityIndex] = None,
+                             budget: Optional[TimeBudget] = None) -> Tuple[List[Dict], List[ItemRecord]]:
+        
+        # Zone-parallel variant of the placement loop. Every zone packs its own
+        # preferred-zone items (in priority order) in a worker process; the results are
+        # replayed into the local grids, then items that did not fit their zone (or whose
+        # zone has no containers) overflow into other zones serially, in priority order,
+        # exactly as in the serial second stage.
+        # With a budget the workers get ZONE_WORKER_BUDGET_SHARE of the time left, and the
+        # overflow pass stops at the deadline (items not reached go to budget.cut_short).
+        # Items a worker did not reach before its share ran out are tried in their
+        # preferred zone first by the overflow pass, as the serial loop would
+        
+        items_by_zone = {}
+        for item in sorted_items:
+            if item.zone in containers_by_zone:
+                items_by_zone.setdefault(item.zone, []).append(item)
+        
+        workers = max_workers or min(len(items_by_zone), os.cpu_count() or 1) or 1
+        logger.info(f"Packing {len(items_by_zone)} zones with {workers} worker processes")
+        
+        items_by_id = {item.item_id: item for item in sorted_items}
+        records = {}
+        unattempted = set()  # Ids of items their zone's worker did not reach
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_pack_zone, zone, zone_items, containers_by_zone[zone],
+                                item_dimensions, search_mode,
+                                budget.remaining() * ZONE_WORKER_BUDGET_SHARE if budget else None)
+                for zone, zone_items in items_by_zone.items()
+            ]
+            for future in futures:
+                placed, not_reached = future.result()
+                unattempted.update(not_reached)
+                for item_id, container_id, position in placed:
+                    container = spatial_grids[container_id].container
+                    records[item_id] = BinPacker._commit(items_by_id[item_id], container,
+                                                         position, spatial_grids, index=capabilities)
+        
+        placements = []
+        unplaced_items = []
+        for index, item in enumerate(sorted_items):
+            if item.item_id in records:
+                placement = records[item.item_id]
+            else:
+                if should_stop and should_stop():
+                    raise PackingCancelled(f"Packing cancelled after {index} of {len(sorted_items)} items")
+                if budget and budget.expired():
+                    budget.cut_short.append(item)
+                    continue
+                
+                # Overflow pass: the preferred zone was already searched by its worker,
+                # unless the worker ran out of time before this item
+                placement = BinPacker._place_item(item, containers, containers_by_zone,
+                                                  spatial_grids, budget.mode_for() if budget else search_mode,
+                                                  try_preferred=item.item_id in unattempted, index=capabilities)
+            if placement:
+                placements.append(placement)
+            else:
+                logger.debug("Unable to place item %s", item.item_id)
+                unplaced_items.append(item)
+            if progress:
+                progress(index + 1, len(sorted_items), placement)
+        
+        return placements, unplaced_items
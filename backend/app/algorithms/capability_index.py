@@ -0,0 +1,48 @@
+from typing import Dict, List
+from itertools import permutations
+import numpy as np
+from ..models.container import Container
+from ..utils.spatial_grid import SpatialGrid
+from ..utils.records import as_dimensions_tuple
+
+# Slack for the extent comparison (free extents are multiples of the grid resolution)
+_EXTENT_TOLERANCE = 1e-6
+
+# Axis permutations giving the six orientations of an item
+_PERMUTATIONS = np.array(list(permutations(range(3))))
+
+
+class CapabilityIndex:
+    
+    #Free-space summary of every container's grid, used to prune candidate containers.
+    #Each row holds a container's SpatialGrid.free_extent (the longest empty run along
+    #width, depth and height), so containers that cannot take an item in any orientation
+    #are dropped with one vectorized test across all containers; the survivors are then
+    #checked with SpatialGrid.may_fit (run counts per axis). Both tests are necessary
+    #but not sufficient: containers that pass may still have no position for the item.
+    
+    
+    def __init__(self, spatial_grids: Dict[str, SpatialGrid]):
+        self.spatial_grids = spatial_grids
+        self.rows = {container_id: row for row, container_id in enumerate(spatial_grids)}
+        self.extents = np.array([grid.free_extent for grid in spatial_grids.values()],
+                                dtype=np.float64).reshape(len(spatial_grids), 3)
+    
+    def refresh(self, container_id: str) -> None:
+        #Re-read a container's free extent after an item was placed in or removed from it
+        self.extents[self.rows[container_id]] = self.spatial_grids[container_id].free_extent
+    
+    def fitting_mask(self, dimensions) -> np.ndarray:
+        #Boolean mask over the rows: True where some orientation of the item (Dimensions
+        #or a (width, depth, height) tuple) fits the free extent
+        orientations = np.array(as_dimensions_tuple(dimensions))[_PERMUTATIONS]
+        limits = self.extents * (1 + _EXTENT_TOLERANCE) + _EXTENT_TOLERANCE
+        return (orientations[None, :, :] <= limits[:, None, :]).all(axis=2).any(axis=1)
+    
+    def candidates(self, containers: List[Container], dimensions) -> List[Container]:
+        #The containers (in their given order) whose free space may take the item
+        if not containers:
+            return containers
+        mask = self.fitting_mask(dimensions)
+        return [c for c in containers
+                if mask[self.rows[c.container_id]] and self.spatial_grids[c.container_id].may_fit(dimensions)]
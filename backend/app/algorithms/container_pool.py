@@ -0,0 +1,131 @@
+from typing import List, Dict, Tuple, Optional
+from multiprocessing import Pipe, Process
+import logging
+from ..models.container import Container
+from ..utils.spatial_grid import SpatialGrid, choose_resolution
+from ..utils.records import ItemRecord, PositionRecord
+
+logger = logging.getLogger(__name__)
+
+
+def _shard_worker(conn, containers: List[Container], item_dimensions: List[Tuple[float, float, float]]) -> None:
+
+    # Worker process loop: owns the grids of one shard of containers and answers
+    # "search" requests (best position among the given containers) and applies
+    # "place" commands for the containers it owns
+
+    from .bin_packing import BinPacker
+
+    spatial_grids = {
+        container.container_id: SpatialGrid(container, choose_resolution(container, item_dimensions))
+        for container in containers
+    }
+
+    while True:
+        message = conn.recv()
+        command = message[0]
+
+        if command == "search":
+            _, dimensions, item_volume, candidates, search_mode, base_score = message
+            best = None
+            for order, container_id in candidates:
+                grid = spatial_grids[container_id]
+                # Skip if container doesn't have enough space
+                if grid.capacity - grid.container.occupied_volume < item_volume:
+                    continue
+                # Skip if the container's free runs rule the item out
+                if not grid.may_fit(dimensions):
+                    continue
+                position = grid.search(dimensions, search_mode)
+                if position:
+                    score = BinPacker._score(position, base_score)
+                    if best is None or (score, order) < (best[0], best[1]):
+                        best = (score, order, container_id, position)
+            conn.send(best)
+
+        elif command == "place":
+            _, container_id, item, position = message
+            spatial_grids[container_id].place_record(item, position)
+
+        elif command == "stop":
+            conn.close()
+            return
+
+
+class ContainerWorkerPool:
+
+    # Pool of long-lived worker processes, each owning the spatial grids of a subset
+    # of the containers. Candidate containers for an item are searched concurrently
+    # (one request per shard), and only the winning container is updated.
+
+
+    def __init__(self, containers: List[Container], item_dimensions: List[Tuple[float, float, float]], workers: int):
+        workers = max(1, min(workers, len(containers)))
+        shards = [containers[i::workers] for i in range(workers)]
+
+        self.owner = {}  # Map of container_id to shard index
+        self.connections = []
+        self.processes = []
+        for index, shard in enumerate(shards):
+            parent_conn, child_conn = Pipe()
+            process = Process(target=_shard_worker, args=(child_conn, shard, item_dimensions), daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+            for container in shard:
+                self.owner[container.container_id] = index
+
+        logger.info(f"Started {workers} container workers for {len(containers)} containers")
+
+    def find_best_position(self, item: ItemRecord, candidates: List[Container], search_mode: str,
+                           base_score: float) -> Tuple[Optional[PositionRecord], Optional[str], float]:
+
+        # Evaluate all candidate containers concurrently across shards
+        # Returns (position, container_id, score); ties go to the earliest candidate,
+        # as in the serial loop
+
+        requests = {}
+        for order, container in enumerate(candidates):
+            shard = self.owner[container.container_id]
+            requests.setdefault(shard, []).append((order, container.container_id))
+
+        for shard, shard_candidates in requests.items():
+            self.connections[shard].send(
+                ("search", item.dimensions, item.volume, shard_candidates, search_mode, base_score)
+            )
+
+        best = None
+        for shard in requests:
+            reply = self.connections[shard].recv()
+            if reply is not None and (best is None or (reply[0], reply[1]) < (best[0], best[1])):
+                best = reply
+
+        if best is None:
+            return None, None, float('inf')
+        return best[3], best[2], best[0]
+
+    def place(self, item: ItemRecord, container_id: str, position: PositionRecord) -> None:
+        # Commit an item into the grid of the shard owning the container
+        self.connections[self.owner[container_id]].send(("place", container_id, item, position))
+
+    def close(self) -> None:
+        # Stop all workers; a worker that already died has closed its end of the pipe,
+        # and the error that killed it should not be masked by one from here
+        for conn in self.connections:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                conn.close()
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
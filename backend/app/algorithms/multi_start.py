@@ -0,0 +1,175 @@
+from typing import List, Dict, Tuple, Optional, Callable, Union
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import os
+import random
+import time
+import logging
+from ..models.container import Container
+from ..models.item import Item
+from ..utils.records import ItemRecord
+
+logger = logging.getLogger(__name__)
+
+# Relative noise applied to item volumes when perturbing the packing order of a start
+VOLUME_JITTER = 0.3
+
+# Seconds between should_stop polls while waiting for the starts
+POLL_INTERVAL = 0.1
+
+# Smallest time budget of the in-process fallback (packing needs a positive budget);
+# with the deadline already passed it returns at once, every item cut short
+MIN_FALLBACK_BUDGET = 0.001
+
+
+def plan_value(items: List[ItemRecord], result: Dict) -> float:
+    # Objective of a plan: priority-weighted volume of the placed items
+    items_by_id = {item.item_id: item for item in items}
+    return sum(items_by_id[placement["itemId"]].priority * items_by_id[placement["itemId"]].volume
+               for placement in result["placements"])
+
+
+def _perturb(items: List[ItemRecord], containers: List[Container],
+             rng: random.Random) -> Tuple[List[ItemRecord], List[Container], Dict[str, float]]:
+    
+    # Seeded variant of a manifest: every item shape starts from a random orientation (which
+    # breaks ties between equally scored orientations differently), containers are
+    # shuffled (which breaks ties between equally scored containers differently) and
+    # each shape gets a random weight on its volume in the sort key, so items of equal
+    # priority are tried in a different order. Priority order is never changed.
+    # Returns (items, containers, sort weights by item_id)
+    
+    # Identical items get the same orientation and weight, so they stay identical and
+    # adjacent (see block building)
+    variants = {}  # Map of shape to (dimensions, weight)
+    variant_items = []
+    weights = {}
+    for item in items:
+        shape = (item.dimensions, item.zone)
+        if shape not in variants:
+            sides = list(item.dimensions)
+            rng.shuffle(sides)
+            variants[shape] = (tuple(sides), rng.uniform(1 - VOLUME_JITTER, 1 + VOLUME_JITTER))
+        dimensions, weights[item.item_id] = variants[shape]
+        variant_items.append(ItemRecord(item.item_id, dimensions, item.priority, item.zone, item.item))
+    variant_containers = list(containers)
+    rng.shuffle(variant_containers)
+    return variant_items, variant_containers, weights
+
+
+def _run_start(start: int, seed: int, items: List[ItemRecord], containers: List[Container], options: Dict,
+               deadline: Optional[float]) -> Tuple[int, Optional[Dict], Optional[Dict[str, float]], float]:
+    
+    # Worker entry point for one start. Start 0 is the unperturbed greedy pass; the
+    # others pack a seeded perturbation of the manifest (see _perturb). deadline is a
+    # time.time() value shared by all starts; a start that begins after it is skipped.
+    # Returns (start, result, occupied volume per container, elapsed seconds), with
+    # result and volumes None for a skipped start
+    
+    from .bin_packing import BinPacker
+    
+    start_time = time.perf_counter()
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return start, None, None, 0.0
+        options = dict(options, time_budget=remaining)
+    if start > 0:
+        items, containers, weights = _perturb(items, containers, random.Random(seed * 1000003 + start))
+        options = dict(options, sort_weights=weights)
+    result = BinPacker.place_items(items, containers, **options)
+    volumes = {container.container_id: container.occupied_volume for container in containers}
+    return start, result, volumes, time.perf_counter() - start_time
+
+
+def pack_multi_start(items: List[Union[Item, ItemRecord]], containers: List[Container], starts: int, seed: int = 0,
+                     max_workers: Optional[int] = None, time_budget: Optional[float] = None,
+                     progress: Optional[Callable[[int, int, Optional[Dict]], None]] = None,
+                     should_stop: Optional[Callable[[], bool]] = None, **options) -> Dict:
+    
+    # Run `starts` greedy packs in worker processes (start 0 unperturbed, the others on
+    # seeded perturbations) and keep the plan with the highest priority-weighted
+    # placed volume; ties go to the lower start, so the baseline wins unless beaten.
+    # time_budget caps the wall clock: every start packs within the time left when it
+    # begins (see BinPacker.place_items), and starts not yet running at the deadline
+    # are dropped.
+    # The containers get the occupied volumes of the chosen plan; progress is called
+    # for its placements once it is chosen.
+    # Returns the chosen result with a "multiStart" entry describing the search
+    
+    from .bin_packing import PackingCancelled
+    
+    start_time = time.perf_counter()
+    items = [item if isinstance(item, ItemRecord) else ItemRecord.from_item(item) for item in items]
+    deadline = time.time() + time_budget if time_budget is not None else None
+    workers = max_workers or min(starts, os.cpu_count() or 1)
+    logger.info(f"Running {starts} packing starts (seed {seed}) with {workers} worker processes")
+    
+    outcomes = {}  # Map of start to (result, volumes, elapsed)
+    cancel_queued = deadline is not None
+    cancelled = False
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {
+            executor.submit(_run_start, start, seed, items, containers, options, deadline)
+            for start in range(starts)
+        }
+        while pending:
+            if should_stop and should_stop():
+                cancelled = True
+                raise PackingCancelled(f"Packing cancelled after {len(outcomes)} of {starts} starts")
+            if cancel_queued and time.time() >= deadline:
+                # Running starts end on their own budget; queued ones are dropped
+                pending = {future for future in pending if not future.cancel()}
+                cancel_queued = False
+                continue
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, result, volumes, elapsed = future.result()
+                if result is not None:
+                    outcomes[start] = (result, volumes, elapsed)
+    finally:
+        # A cancelled search does not wait for the starts still running
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
+    
+    if not outcomes:
+        # No start began before the deadline (e.g. slow process start-up): fall back to
+        # the greedy plan in this process, within what is left of the budget, so the run
+        # still ends near the deadline with the items not reached cut short
+        remaining = max(deadline - time.time(), MIN_FALLBACK_BUDGET) if deadline is not None else None
+        logger.warning("No packing start finished within the time budget; packing the greedy plan in-process")
+        _, result, volumes, elapsed = _run_start(0, seed, items, containers, dict(options, time_budget=remaining), None)
+        outcomes[0] = (result, volumes, elapsed)
+    
+    values = {start: plan_value(items, outcome[0]) for start, outcome in outcomes.items()}
+    best_start = min(values, key=lambda start: (-values[start], start))
+    result, volumes, _ = outcomes[best_start]
+    for container in containers:
+        container.occupied_volume = volumes[container.container_id]
+    
+    baseline = values.get(0)
+    result = dict(result)
+    result["multiStart"] = {
+        "starts": starts,
+        "completedStarts": len(outcomes),
+        "seed": seed,
+        "bestStart": best_start,
+        "baselineValue": baseline,
+        "bestValue": values[best_start],
+        "gainPercent": round((values[best_start] - baseline) / baseline * 100, 2) if baseline else None,
+        "elapsedSeconds": round(time.perf_counter() - start_time, 4),
+        "startResults": [
+            {"start": start, "value": values[start], "placed": len(outcomes[start][0]["placements"]),
+             "seconds": round(outcomes[start][2], 4)}
+            for start in sorted(outcomes)
+        ]
+    }
+    logger.info(f"Multi-start packing kept start {best_start} of {len(outcomes)} completed "
+                f"(gain {result['multiStart']['gainPercent']}% over the greedy plan)")
+    
+    if progress:
+        total = len(items)
+        for index, placement in enumerate(result["placements"]):
+            progress(index + 1, total, placement)
+        if len(result["placements"]) < total:
+            progress(total, total, None)
+    return result
@@ -1,21 +1,45 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import List, Dict, Optional
 from datetime import datetime
 import pymongo
 from pymongo import MongoClient
 import pandas as pd
 import io
+import asyncio
 import json
 import os
+import time
+import logging
 from bson import ObjectId
 
 from .models.container import Container, Dimensions, ContainerCreate
 from .models.item import Item, Position, ItemCreate
-from .services.placement_service import PlacementService
+from .services.placement_service import PlacementService, DEFAULT_PACKING_THREADS
+from .services.grid_cache import GridCache, DEFAULT_MAX_BYTES
+from .services.bulk_writer import BulkWriter, DEFAULT_BATCH_SIZE
+from .services.csv_import import read_csv, parse_containers, parse_items, upsert_documents, normalize_expiry_dates
+from .services.import_jobs import ImportJobManager, DEFAULT_CHUNK_ROWS
+from .services.repository import Repository, DEFAULT_DB_THREADS
+from .services.placement_jobs import PlacementJobManager
+from .services.columnar import is_columnar, columnar_result
+from .services.streaming import FastJSONResponse, stream_documents
+from .services.listing import (
+    ITEM_LISTING, CONTAINER_LISTING, ITEM_SUMMARY, CONTAINER_SUMMARY, DEFAULT_PAGE_SIZE,
+    ensure_indexes, item_filter, container_filter, list_page, listing_summary
+)
+from .algorithms.bin_packing import BinPacker
+from .utils.metrics import REGISTRY, HTTP_REQUEST_SECONDS
 # from .services.retrieval_service import RetrievalService
 
+# Log verbosity from LOG_LEVEL; per-item and per-search messages are only logged at DEBUG
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(title="Space Stowage Management System")
 
@@ -36,10 +60,50 @@ db_name = os.environ.get("DB_NAME", "space_stowage")
 client = MongoClient(mongo_uri)
 db = client[db_name]
 
+# Non-blocking access for the async endpoints: pymongo calls run on a thread pool
+repository = Repository(db, max_workers=int(os.environ.get("DB_THREADS", DEFAULT_DB_THREADS)))
+
+# Process-wide cache of live container grids (memory budget in bytes)
+grid_cache = GridCache(db, max_bytes=int(os.environ.get("GRID_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)))
+
+# Operations per bulk_write call for imports and placement persistence
+write_batch_size = int(os.environ.get("WRITE_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+bulk_writer = BulkWriter(write_batch_size)
+
 # Initialize services
-placement_service = PlacementService(client)
+placement_service = PlacementService(
+    repository,
+    grid_cache,
+    write_batch_size=write_batch_size,
+    packing_threads=int(os.environ.get("PACKING_THREADS", DEFAULT_PACKING_THREADS))
+)
+import_jobs = ImportJobManager(
+    db,
+    bulk_writer,
+    grid_cache,
+    chunk_rows=int(os.environ.get("IMPORT_CHUNK_ROWS", DEFAULT_CHUNK_ROWS))
+)
 # retrieval_service = RetrievalService(client)
 
+# Background packing runs ("background": true on the placement endpoints)
+placement_jobs = PlacementJobManager(max_workers=int(os.environ.get("PLACEMENT_WORKERS", 0)) or None)
+
+# Optional placement request fields and the BinPacker.place_items arguments they map to
+PACKING_OPTION_FIELDS = {
+    "searchMode": "search_mode",
+    "parallelZones": "parallel_zones",
+    "maxWorkers": "max_workers",
+    "containerWorkers": "container_workers",
+    "blockBuilding": "block_building",
+    "timeBudget": "time_budget",
+    "multiStart": "multi_start",
+    "seed": "seed"
+}
+
+def packing_options(request: Dict) -> Dict:
+    #Collect the packing options present in a placement request
+    return {arg: request[field] for field, arg in PACKING_OPTION_FIELDS.items() if field in request}
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, ObjectId):
@@ -48,37 +112,146 @@ class JSONEncoder(json.JSONEncoder):
             return o.isoformat()
         return json.JSONEncoder.default(self, o)
 
+async def create_indexes():
+    # Indexes behind the listings and key lookups (see services/listing.py)
+    try:
+        await repository.run(ensure_indexes, db)
+    except Exception as e:
+        logger.warning(f"Could not create indexes: {str(e)}")
+    # Expiry dates imported from CSV as text, from before imports parsed them
+    try:
+        await repository.run(normalize_expiry_dates, repository.items.sync, bulk_writer)
+    except Exception as e:
+        logger.warning(f"Could not convert expiry dates: {str(e)}")
+
+@app.on_event("startup")
+async def start_index_creation():
+    # In the background, so the API still starts (and serves) while Mongo is slow or down
+    app.state.index_task = asyncio.get_running_loop().create_task(create_indexes())
+
+@app.middleware("http")
+async def record_request_latency(request, call_next):
+    # Observe every request's latency by method, route template and status code
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=status
+        )
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text exposition of the in-process metrics
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "Space Stowage Management System API", "status": "online"}
 @app.get("/api/containers", response_model=List[Dict])
-async def get_containers():
+async def get_containers(fields: Optional[str] = None, format: str = "json"):
 
     # Get all containers
+    # Streamed off the cursor as a JSON array (format=ndjson: one container per line);
+    # fields is an optional comma-separated projection, e.g. fields=container_id,zone
 
     try:
-        containers = list(db.containers.find({}))
-        # Convert ObjectId to string for JSON serialization
-        for container in containers:
-            if "_id" in container:
-                container["_id"] = str(container["_id"])
-        return JSONResponse(content=containers)
+        return stream_documents(repository.containers, {}, fields, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/items", response_model=List[Dict])
-async def get_items():
+async def get_items(fields: Optional[str] = None, format: str = "json"):
 
     # Get all items
+    # Streamed off the cursor as a JSON array (format=ndjson: one item per line);
+    # fields is an optional comma-separated projection, e.g. fields=item_id,name,position
+
+    try:
+        return stream_documents(repository.items, {}, fields, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/containers/page")
+async def get_containers_page(zone: Optional[str] = None, sort: Optional[str] = None,
+                              cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                              fields: Optional[str] = None):
+
+    # One page of containers in keyset order (see services/listing.py)
+    # sort is container_id, zone or occupied_volume ("-" prefix for descending); pass the
+    # returned nextCursor to get the next page
+
+    try:
+        page = await list_page(
+            repository.containers, CONTAINER_LISTING, container_filter(zone), sort, cursor, limit, fields
+        )
+        return FastJSONResponse(page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/containers/summary")
+async def get_containers_summary(zone: Optional[str] = None):
+
+    # Totals over all containers matching the listing filters (count, high utilization)
+    # Separate from the pages, so the first page does not wait for a full scan
 
     try:
-        items = list(db.items.find({}))
-        # Convert ObjectId to string for JSON serialization
-        for item in items:
-            if "_id" in item:
-                item["_id"] = str(item["_id"])
-        return JSONResponse(content=items)
+        return await listing_summary(repository.containers, container_filter(zone), CONTAINER_SUMMARY)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/items/page")
+async def get_items_page(zone: Optional[str] = None, container_id: Optional[str] = None,
+                         placed: Optional[bool] = None, is_waste: Optional[bool] = None,
+                         min_priority: Optional[int] = None, max_priority: Optional[int] = None,
+                         expires_after: Optional[str] = None, expires_before: Optional[str] = None,
+                         sort: Optional[str] = None, cursor: Optional[str] = None,
+                         limit: int = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+
+    # One page of items in keyset order, filtered by preferred zone, container, placed,
+    # waste, priority range and expiry window (see services/listing.py)
+    # sort is item_id, name, priority, expiry_date or preferred_zone ("-" prefix for
+    # descending); pass the returned nextCursor to get the next page
+
+    try:
+        filter = item_filter(zone, container_id, placed, is_waste, min_priority, max_priority,
+                             expires_after, expires_before)
+        page = await list_page(repository.items, ITEM_LISTING, filter, sort, cursor, limit, fields)
+        return FastJSONResponse(page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/items/summary")
+async def get_items_summary(zone: Optional[str] = None, container_id: Optional[str] = None,
+                            placed: Optional[bool] = None, is_waste: Optional[bool] = None,
+                            min_priority: Optional[int] = None, max_priority: Optional[int] = None,
+                            expires_after: Optional[str] = None, expires_before: Optional[str] = None):
+
+    # Totals (count, volume, mass, unplaced) over all items matching the listing filters
+    # Separate from the pages, so the first page does not wait for a full scan
+
+    try:
+        filter = item_filter(zone, container_id, placed, is_waste, min_priority, max_priority,
+                             expires_after, expires_before)
+        return await listing_summary(repository.items, filter, ITEM_SUMMARY)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -87,7 +260,7 @@ async def check_container_exists(container_id: str):
     #Check if a container with the given ID already exists
     try:
         # Find container by ID
-        container = db.containers.find_one({"container_id": container_id})
+        container = await repository.containers.find_one({"container_id": container_id})
         return {"exists": container is not None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -99,7 +272,7 @@ async def create_container(container: ContainerCreate):
     
     try:
         # Check if a container with this ID already exists
-        existing = db.containers.find_one({"container_id": container.container_id})
+        existing = await repository.containers.find_one({"container_id": container.container_id})
         if existing:
             raise HTTPException(
                 status_code=400, 
@@ -117,7 +290,7 @@ async def create_container(container: ContainerCreate):
             "occupied_volume": 0
         }
         
-        result = db.containers.insert_one(container_dict)
+        result = await repository.containers.insert_one(container_dict)
         container_dict["_id"] = str(result.inserted_id)
         
         return container_dict
@@ -153,7 +326,7 @@ async def create_item(item: ItemCreate):
             "is_waste": False
         }
         
-        result = db.items.insert_one(item_dict)
+        result = await repository.items.insert_one(item_dict)
         item_dict["_id"] = str(result.inserted_id)
         
         return item_dict
@@ -165,13 +338,45 @@ async def placement(request: Dict = Body(...)):
 
     # Placement API endpoint
     #Place items in containers based on optimal algorithms
-
-    if "items" not in request or "containers" not in request:
+    # With "incremental": true the items are placed around what is already stowed in the
+    # stored containers (no containers list needed) and only the new placements are saved
+    # With "format": "columnar" the items (and optionally containers) are sent as one
+    # array per field and the placements come back the same way (see services/columnar.py)
+
+    incremental = request.get("incremental", False)
+    columnar = is_columnar(request)
+    if "items" not in request or ("containers" not in request and not incremental):
         raise HTTPException(status_code=400, detail="Items and containers are required")
+    if incremental and request.get("background"):
+        raise HTTPException(status_code=400, detail="Incremental placement cannot run in the background")
+    if incremental and columnar:
+        raise HTTPException(status_code=400, detail="Incremental placement does not accept columnar items")
     
     try:
-        result = await placement_service.place_items(request["items"], request["containers"])
-        return result
+        if incremental:
+            return FastJSONResponse(
+                await placement_service.place_items_incremental(request["items"], packing_options(request))
+            )
+        
+        if request.get("background"):
+            # Pack in the job pool; the plan is saved when the job completes
+            items, containers = placement_service.build_request(request["items"], request["containers"])
+            job = placement_jobs.submit(
+                "placement", items, containers, packing_options(request),
+                on_result=lambda result, packed: placement_service.persist(items, packed, result)
+            )
+            return {"success": True, "jobId": job.job_id, "status": job.status}
+        
+        result = await placement_service.place_items(
+            request["items"],
+            request["containers"],
+            packing_options(request)
+        )
+        return FastJSONResponse(columnar_result(result) if columnar else result)
+    except HTTPException as he:
+        raise he
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -184,53 +389,63 @@ async def simulate_placement(request: Dict = Body(...)):
     if "items" not in request or "containers" not in request:
         raise HTTPException(status_code=400, detail="Items and containers are required")
     
+    columnar = is_columnar(request)
     try:
-        # Similar to place_items but without saving to database
-        items = []
-        for item_data in request["items"]:
-            expiry_date = None
-            if "expiryDate" in item_data and item_data["expiryDate"]:
-                expiry_date = datetime.fromisoformat(item_data["expiryDate"])
-                
-            item = Item(
-                item_id=item_data["itemId"],
-                name=item_data["name"],
-                dimensions=Dimensions(
-                    width=item_data["width"],
-                    depth=item_data["depth"],
-                    height=item_data["height"]
-                ),
-                mass=item_data["mass"],
-                priority=item_data["priority"],
-                expiry_date=expiry_date,
-                usage_limit=item_data["usageLimit"],
-                usage_count=0,
-                preferred_zone=item_data["preferredZone"]
-            )
-            items.append(item)
-        
-        containers = []
-        for container_data in request["containers"]:
-            container = Container(
-                container_id=container_data["containerId"],
-                zone=container_data["zone"],
-                dimensions=Dimensions(
-                    width=container_data["width"],
-                    depth=container_data["depth"],
-                    height=container_data["height"]
-                ),
-                occupied_volume=0
-            )
-            containers.append(container)
+        # Similar to place_items but without saving to database (same request conversion)
+        items, containers = placement_service.build_request(request["items"], request["containers"])
+        
+        if request.get("background"):
+            job = placement_jobs.submit("simulation", items, containers, packing_options(request))
+            return {"success": True, "jobId": job.job_id, "status": job.status}
         
-        # Get bin packing solution without saving to DB
-        from .algorithms.bin_packing import BinPacker
-        packing_result = BinPacker.place_items(items, containers)
+        # Get bin packing solution without saving to DB (off the event loop)
+        packing_result = await placement_service.run_packing(BinPacker.place_items, items, containers,
+                                                             **packing_options(request))
         
-        return packing_result
+        return FastJSONResponse(columnar_result(packing_result) if columnar else packing_result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/placement/jobs/{job_id}")
+async def get_placement_job(job_id: str):
+
+    # Status of a background placement job (with the full result once completed)
+
+    job = placement_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Placement job not found")
+    return FastJSONResponse(job.to_dict())
+
+@app.get("/api/placement/jobs/{job_id}/placements")
+async def get_placement_job_placements(job_id: str, offset: int = 0):
+
+    # Placements a job has made so far, from offset on (poll with the returned nextOffset)
+
+    job = placement_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Placement job not found")
+    placements = job.placements[offset:]
+    return FastJSONResponse({
+        "jobId": job.job_id,
+        "status": job.status,
+        "processedItems": job.processed_items,
+        "totalItems": job.total_items,
+        "placements": placements,
+        "nextOffset": offset + len(placements)
+    })
+
+@app.post("/api/placement/jobs/{job_id}/cancel")
+async def cancel_placement_job(job_id: str):
+
+    # Cancel a queued job, or stop a running one after its current item
+
+    job = placement_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Placement job not found")
+    return {"success": True, "jobId": job.job_id, "status": job.status}
+
 @app.post("/api/place")
 async def place_item(request: Dict = Body(...)):
 
@@ -253,6 +468,55 @@ async def place_item(request: Dict = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def find_suggestion(item: Item, container_docs: List[Dict]):
+    
+    # Best (container, position) for an item over the cached container grids,
+    # preferred zone first; (None, None) if it fits nowhere. Blocking: grids may be
+    # loaded from the database and are searched under the cache lock
+    
+    best_container = None
+    best_position = None
+    best_score = float('inf')
+    
+    # First try preferred zone
+    for doc in container_docs:
+        if doc["zone"] != item.preferred_zone:
+            continue
+            
+        container, position = grid_cache.find_best_fit(doc, item.dimensions)
+        if position:
+            # Score based on position (prefer preferred zone)
+            score = 0  # Preferred zone gets 0 penalty
+            score += position.start_coordinates.height * 10  # Prefer lower positions
+            score += position.start_coordinates.width  # Prefer leftmost positions
+            score += position.start_coordinates.depth  # Prefer deepest positions
+            
+            if score < best_score:
+                best_score = score
+                best_container = container
+                best_position = position
+    
+    #If no position found in preferred zone, try other zones
+    if best_position is None:
+        for doc in container_docs:
+            if doc["zone"] == item.preferred_zone:
+                continue  # Already tried preferred zone
+                
+            container, position = grid_cache.find_best_fit(doc, item.dimensions)
+            if position:
+                #Score based on position (with penalty for non-preferred zone)
+                score = 1000  # Non-preferred zone penalty
+                score += position.start_coordinates.height * 10  # Prefer lower positions
+                score += position.start_coordinates.width  # Prefer leftmost positions
+                score += position.start_coordinates.depth  # Prefer deepest positions
+                
+                if score < best_score:
+                    best_score = score
+                    best_container = container
+                    best_position = position
+    
+    return best_container, best_position
+
 @app.get("/api/placement/suggestion/{item_id}")
 async def get_placement_suggestion(item_id: str):
 
@@ -260,7 +524,7 @@ async def get_placement_suggestion(item_id: str):
 
     try:
         #get item from database
-        item_doc = db.items.find_one({"item_id": item_id})
+        item_doc = await repository.items.find_one({"item_id": item_id})
         if not item_doc:
             raise HTTPException(status_code=404, detail="Item not found")
         
@@ -282,140 +546,10 @@ async def get_placement_suggestion(item_id: str):
         )
         
         #get containers from database
-        containers = []
-        cursor = db.containers.find({})
-        for doc in cursor:
-            container = Container(
-                container_id=doc["container_id"],
-                zone=doc["zone"],
-                dimensions=Dimensions(
-                    width=doc["dimensions"]["width"],
-                    depth=doc["dimensions"]["depth"],
-                    height=doc["dimensions"]["height"]
-                ),
-                occupied_volume=doc.get("occupied_volume", 0)
-            )
-            containers.append(container)
-        
-        #Find best placement
-        from .utils.spatial_grid import SpatialGrid
-        
-        best_container = None
-        best_position = None
-        best_score = float('inf')
-        
-        # First try preferred zone
-        for container in containers:
-            if container.zone != item.preferred_zone:
-                continue
-                
-            grid = SpatialGrid(container)
-            
-            #Load existing items into the grid
-            items_in_container = db.items.find({"container_id": container.container_id})
-            for existing_item in items_in_container:
-                if "position" in existing_item and existing_item["position"]:
-                    pos = existing_item["position"]
-                    position = Position(
-                        start_coordinates=Dimensions(
-                            width=pos["start_coordinates"]["width"],
-                            depth=pos["start_coordinates"]["depth"],
-                            height=pos["start_coordinates"]["height"]
-                        ),
-                        end_coordinates=Dimensions(
-                            width=pos["end_coordinates"]["width"],
-                            depth=pos["end_coordinates"]["depth"],
-                            height=pos["end_coordinates"]["height"]
-                        )
-                    )
-                    existing_item_obj = Item(
-                        item_id=existing_item["item_id"],
-                        name=existing_item["name"],
-                        dimensions=Dimensions(
-                            width=existing_item["dimensions"]["width"],
-                            depth=existing_item["dimensions"]["depth"],
-                            height=existing_item["dimensions"]["height"]
-                        ),
-                        mass=existing_item["mass"],
-                        priority=existing_item["priority"],
-                        expiry_date=existing_item.get("expiry_date"),
-                        usage_limit=existing_item["usage_limit"],
-                        usage_count=existing_item.get("usage_count", 0),
-                        preferred_zone=existing_item["preferred_zone"],
-                        position=position,
-                        container_id=container.container_id
-                    )
-                    grid.place_item(existing_item_obj, position)
-            
-            position = grid.find_best_fit(item.dimensions)
-            if position:
-                # Score based on position (prefer preferred zone)
-                score = 0  # Preferred zone gets 0 penalty
-                score += position.start_coordinates.height * 10  # Prefer lower positions
-                score += position.start_coordinates.width  # Prefer leftmost positions
-                score += position.start_coordinates.depth  # Prefer deepest positions
-                
-                if score < best_score:
-                    best_score = score
-                    best_container = container
-                    best_position = position
+        container_docs = await repository.containers.find({})
         
-        #If no position found in preferred zone, try other zones
-        if best_position is None:
-            for container in containers:
-                if container.zone == item.preferred_zone:
-                    continue  # Already tried preferred zone
-                    
-                grid = SpatialGrid(container)
-                
-                # Load existing items into the grid
-                items_in_container = db.items.find({"container_id": container.container_id})
-                for existing_item in items_in_container:
-                    if "position" in existing_item and existing_item["position"]:
-                        pos = existing_item["position"]
-                        position = Position(
-                            start_coordinates=Dimensions(
-                                width=pos["start_coordinates"]["width"],
-                                depth=pos["start_coordinates"]["depth"],
-                                height=pos["start_coordinates"]["height"]
-                            ),
-                            end_coordinates=Dimensions(
-                                width=pos["end_coordinates"]["width"],
-                                depth=pos["end_coordinates"]["depth"],
-                                height=pos["end_coordinates"]["height"]
-                            )
-                        )
-                        existing_item_obj = Item(
-                            item_id=existing_item["item_id"],
-                            name=existing_item["name"],
-                            dimensions=Dimensions(
-                                width=existing_item["dimensions"]["width"],
-                                depth=existing_item["dimensions"]["depth"],
-                                height=existing_item["dimensions"]["height"]
-                            ),
-                            mass=existing_item["mass"],
-                            priority=existing_item["priority"],
-                            expiry_date=existing_item.get("expiry_date"),
-                            usage_limit=existing_item["usage_limit"],
-                            usage_count=existing_item.get("usage_count", 0),
-                            preferred_zone=existing_item["preferred_zone"],
-                            position=position,
-                            container_id=container.container_id
-                        )
-                        grid.place_item(existing_item_obj, position)
-                
-                position = grid.find_best_fit(item.dimensions)
-                if position:
-                    #Score based on position (with penalty for non-preferred zone)
-                    score = 1000  # Non-preferred zone penalty
-                    score += position.start_coordinates.height * 10  # Prefer lower positions
-                    score += position.start_coordinates.width  # Prefer leftmost positions
-                    score += position.start_coordinates.depth  # Prefer deepest positions
-                    
-                    if score < best_score:
-                        best_score = score
-                        best_container = container
-                        best_position = position
+        #Find best placement using the live grids from the cache (off the event loop)
+        best_container, best_position = await repository.run(find_suggestion, item, container_docs)
         
         if best_position is None:
             return {"success": False, "message": "No suitable placement found"}
@@ -445,45 +579,27 @@ async def get_placement_suggestion(item_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/import/containers")
-async def import_containers(file: UploadFile = File(...)):
+async def import_containers(file: UploadFile = File(...), stream: bool = False):
 
     # Import containers from CSV file
+    # With stream=true the file is imported in row chunks by a background job;
+    # poll /api/import/jobs/{jobId} for progress
 
     try:
+        if stream:
+            job = await import_jobs.start("containers", file)
+            return {"success": True, "jobId": job.job_id, "status": job.status}
+        
         # Read CSV file
         contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
-        
-        containers = []
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                container = {
-                    "container_id": row["container_id"],
-                    "zone": row["zone"],
-                    "dimensions": {
-                        "width": float(row["width_cm"]),
-                        "depth": float(row["depth_cm"]),
-                        "height": float(row["height_cm"])
-                    },
-                    "occupied_volume": 0
-                }
-                
-                # Update or insert container
-                db.containers.update_one(
-                    {"container_id": container["container_id"]},
-                    {"$set": container},
-                    upsert=True
-                )
-                
-                containers.append(container)
-                
-            except Exception as e:
-                errors.append({
-                    "row": index + 2,  # +2 for header row and 0-indexing
-                    "message": str(e)
-                })
+        df = await repository.run(read_csv, contents)
+        
+        # Validate and convert all rows column-wise, then upsert in bulk
+        containers, errors = await repository.run(parse_containers, df)
+        await repository.run(upsert_documents, repository.containers.sync, "container_id", containers, bulk_writer)
+        
+        # Imported containers may have new dimensions; reload their grids on next use
+        grid_cache.invalidate(container["container_id"] for container in containers)
         
         return {
             "success": True,
@@ -495,57 +611,27 @@ async def import_containers(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/import/items")
-async def import_items(file: UploadFile = File(...)):
+async def import_items(file: UploadFile = File(...), stream: bool = False):
 
     # Import items from CSV file
+    # With stream=true the file is imported in row chunks by a background job;
+    # poll /api/import/jobs/{jobId} for progress
 
     try:
+        if stream:
+            job = await import_jobs.start("items", file)
+            return {"success": True, "jobId": job.job_id, "status": job.status}
+        
         # Read CSV file
         contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")), keep_default_na=False, na_values=[''])
-        
-        items = []
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                expiry_date = None
-                if "expiry_date" in row and row["expiry_date"] and pd.notna(row["expiry_date"]):
-                    # Check if it's a string and not "N/A"
-                    if isinstance(row["expiry_date"], str) and row["expiry_date"].lower() != "n/a":
-                        expiry_date = row["expiry_date"]
-                
-                item = {
-                    "item_id": str(row["item_id"]),
-                    "name": row["name"],
-                    "dimensions": {
-                        "width": float(row["width_cm"]),
-                        "depth": float(row["depth_cm"]),
-                        "height": float(row["height_cm"])
-                    },
-                    "mass": float(row["mass_kg"]),
-                    "priority": int(row["priority"]),
-                    "expiry_date": expiry_date,
-                    "usage_limit": int(row["usage_limit"]),
-                    "usage_count": 0,
-                    "preferred_zone": row["preferred_zone"],
-                    "is_waste": False
-                }
-                
-                # Update or insert item
-                db.items.update_one(
-                    {"item_id": item["item_id"]},
-                    {"$set": item},
-                    upsert=True
-                )
-                
-                items.append(item)
-                
-            except Exception as e:
-                errors.append({
-                    "row": index + 2,  # +2 for header row and 0-indexing
-                    "message": str(e)
-                })
+        df = await repository.run(read_csv, contents)
+        
+        # Validate and convert all rows column-wise, then upsert in bulk
+        items, errors = await repository.run(parse_items, df)
+        await repository.run(upsert_documents, repository.items.sync, "item_id", items, bulk_writer)
+        
+        # Imported items may have new dimensions; reload the grids that hold them
+        grid_cache.invalidate_items(item["item_id"] for item in items)
         
         return {
             "success": True,
@@ -556,6 +642,16 @@ async def import_items(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/import/jobs/{job_id}")
+async def get_import_job(job_id: str):
+
+    # Progress of a streaming import: rows processed, imported count and errors so far
+
+    job = import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
+
 @app.get("/api/stats")
 async def get_stats():
 
@@ -563,16 +659,16 @@ async def get_stats():
 
     try:
         # Count total items
-        total_items = db.items.count_documents({})
+        total_items = await repository.items.count_documents({})
         
         # Count placed items
-        placed_items = db.items.count_documents({"container_id": {"$ne": None}})
+        placed_items = await repository.items.count_documents({"container_id": {"$ne": None}})
         
         # Count containers
-        total_containers = db.containers.count_documents({})
+        total_containers = await repository.containers.count_documents({})
         
         # Get total volume of all containers
-        containers = list(db.containers.find({}))
+        containers = await repository.containers.find({})
         total_volume = 0
         used_volume = 0
         for container in containers:
@@ -605,7 +701,7 @@ async def get_stats():
             zones[zone]["usedVolume"] += container.get("occupied_volume", 0)
         
         # Count items in each zone
-        zone_items = db.items.aggregate([
+        zone_items = await repository.items.aggregate([
             {"$match": {"container_id": {"$ne": None}}},
             {"$lookup": {
                 "from": "containers",
@@ -0,0 +1,47 @@
+from typing import Dict, List
+import time
+import logging
+from ..utils.metrics import DB_WRITE_SECONDS, DB_WRITE_OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+# Default number of operations sent per bulk_write call
+DEFAULT_BATCH_SIZE = 1000
+
+
+class BulkWriter:
+    
+    #Sends write operations to Mongo as unordered bulk_write calls of at most
+    #batch_size operations, and records how long each batch took
+    
+    
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+    
+    def write(self, collection, operations: List) -> List[Dict]:
+        
+        #Execute the operations against one collection
+        #Returns one stats entry per batch (collection, operations, seconds and counts)
+        
+        batches = []
+        for start in range(0, len(operations), self.batch_size):
+            batch = operations[start:start + self.batch_size]
+            batch_start = time.perf_counter()
+            result = collection.bulk_write(batch, ordered=False)
+            elapsed = time.perf_counter() - batch_start
+            DB_WRITE_SECONDS.observe(elapsed, collection=collection.name)
+            DB_WRITE_OPERATIONS.inc(len(batch), collection=collection.name)
+            batches.append({
+                "collection": collection.name,
+                "operations": len(batch),
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "upserted": result.upserted_count,
+                "seconds": round(elapsed, 4)
+            })
+        
+        if batches:
+            logger.info(f"Wrote {len(operations)} operations to {collection.name} in {len(batches)} batches")
+        return batches
@@ -0,0 +1,125 @@
+from typing import Dict, List, Sequence
+import logging
+import numpy as np
+from ..models.container import Container, Dimensions
+from ..utils.records import ItemRecord
+
+logger = logging.getLogger(__name__)
+
+# Columnar placement requests ("format": "columnar") send items (and optionally
+# containers) as one array per field instead of one object per row:
+#   {"itemId": [...], "width": [...], "depth": [...], "height": [...],
+#    "priority": [...], "preferredZone": [...]}
+# Columns are validated as whole arrays and turned straight into the packer's
+# ItemRecords, without building Item models. Other item columns (name, mass, ...)
+# may be present and are ignored: the packer does not use them and persistence
+# only writes positions of items that are already stored.
+COLUMNAR_FORMAT = "columnar"
+
+ITEM_TEXT_COLUMNS = ["itemId", "preferredZone"]
+ITEM_FLOAT_COLUMNS = ["width", "depth", "height"]
+ITEM_INT_COLUMNS = ["priority"]
+CONTAINER_TEXT_COLUMNS = ["containerId", "zone"]
+CONTAINER_FLOAT_COLUMNS = ["width", "depth", "height"]
+
+
+def is_columnar(request: Dict) -> bool:
+    #Whether a placement request uses the columnar format (items sent as a table)
+    return request.get("format") == COLUMNAR_FORMAT or isinstance(request.get("items"), dict)
+
+
+def _column(table: Dict, name: str, length: int) -> Sequence:
+    #A required column of the given length
+    values = table.get(name)
+    if not isinstance(values, list):
+        raise ValueError(f"Missing column '{name}'")
+    if len(values) != length:
+        raise ValueError(f"Column '{name}' has {len(values)} values, expected {length}")
+    return values
+
+
+def _text_column(table: Dict, name: str, length: int) -> List[str]:
+    values = _column(table, name, length)
+    for position, value in enumerate(values):
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"Invalid value {value!r} at index {position} of column '{name}'")
+    return values
+
+
+def _number_column(table: Dict, name: str, length: int, integer: bool = False) -> np.ndarray:
+    #Numeric column as a float array; dimensions must be positive, integers whole
+    values = _column(table, name, length)
+    try:
+        values = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Column '{name}' must only contain numbers")
+    invalid = ~np.isfinite(values)
+    if integer:
+        invalid |= values != np.floor(values)
+    else:
+        invalid |= values <= 0
+    if invalid.any():
+        position = int(np.flatnonzero(invalid)[0])
+        raise ValueError(f"Invalid value {values[position]!r} at index {position} of column '{name}'")
+    return values
+
+
+def _length(table: Dict, name: str) -> int:
+    #Row count of a columnar table, taken from its key column
+    if not isinstance(table, dict) or not isinstance(table.get(name), list):
+        raise ValueError(f"Columnar tables need a '{name}' column")
+    return len(table[name])
+
+
+def items_from_columns(table: Dict) -> List[ItemRecord]:
+    #Validate a columnar item table and convert it to ItemRecords
+    length = _length(table, "itemId")
+    item_ids, zones = (_text_column(table, name, length) for name in ITEM_TEXT_COLUMNS)
+    widths, depths, heights = (_number_column(table, name, length).tolist() for name in ITEM_FLOAT_COLUMNS)
+    priorities, = (_number_column(table, name, length, integer=True).astype(np.int64).tolist()
+                   for name in ITEM_INT_COLUMNS)
+    if len(set(item_ids)) != length:
+        raise ValueError("Column 'itemId' contains duplicate ids")
+    return [
+        ItemRecord(item_id, (width, depth, height), priority, zone)
+        for item_id, width, depth, height, priority, zone in zip(item_ids, widths, depths, heights,
+                                                                 priorities, zones)
+    ]
+
+
+def containers_from_columns(table: Dict) -> List[Container]:
+    #Validate a columnar container table and convert it to Container models
+    length = _length(table, "containerId")
+    container_ids, zones = (_text_column(table, name, length) for name in CONTAINER_TEXT_COLUMNS)
+    widths, depths, heights = (_number_column(table, name, length).tolist() for name in CONTAINER_FLOAT_COLUMNS)
+    return [
+        Container(
+            container_id=container_id,
+            zone=zone,
+            dimensions=Dimensions(width=width, depth=depth, height=height),
+            occupied_volume=0
+        )
+        for container_id, zone, width, depth, height in zip(container_ids, zones, widths, depths, heights)
+    ]
+
+
+def placements_to_columns(placements: List[Dict]) -> Dict:
+    #Placement records as one array per field, in placement order
+    columns = {
+        "itemId": [placement["itemId"] for placement in placements],
+        "containerId": [placement["containerId"] for placement in placements]
+    }
+    for corner in ("startCoordinates", "endCoordinates"):
+        columns[corner] = {
+            axis: [placement["position"][corner][axis] for placement in placements]
+            for axis in ("width", "depth", "height")
+        }
+    return columns
+
+
+def columnar_result(result: Dict) -> Dict:
+    #A packing result with its placements in columnar form (other entries unchanged)
+    result = dict(result)
+    result["format"] = COLUMNAR_FORMAT
+    result["placements"] = placements_to_columns(result["placements"])
+    return result
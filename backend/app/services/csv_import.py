@@ -0,0 +1,208 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import io
+import logging
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from .bulk_writer import BulkWriter
+
+logger = logging.getLogger(__name__)
+
+# Required CSV columns of each import
+CONTAINER_TEXT_COLUMNS = ["container_id", "zone"]
+CONTAINER_FLOAT_COLUMNS = ["width_cm", "depth_cm", "height_cm"]
+ITEM_TEXT_COLUMNS = ["item_id", "name", "preferred_zone"]
+ITEM_FLOAT_COLUMNS = ["width_cm", "depth_cm", "height_cm", "mass_kg"]
+ITEM_INT_COLUMNS = ["priority", "usage_limit"]
+
+
+def read_csv(source, **kwargs) -> pd.DataFrame:
+    #Read a CSV (raw bytes, a path or a file object) with every column as text; empty
+    #cells become NaN. Numeric columns are converted (and validated) column-wise by the
+    #parsers below. Extra arguments go to pd.read_csv (e.g. chunksize)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[''], **kwargs)
+
+
+class _RowErrors:
+    
+    #Collects validation messages per row while the columns are checked as a whole
+    
+    
+    def __init__(self, row_count: int):
+        self.row_count = row_count
+        self.messages = {}  # Map of row position to its error messages
+        self.invalid = np.zeros(row_count, dtype=bool)
+    
+    def add(self, mask: np.ndarray, message, values=None) -> None:
+        #Record message for every row in mask; message may be a format string over values
+        for position in np.flatnonzero(mask):
+            text = message.format(values[position]) if values is not None else message
+            self.messages.setdefault(position, []).append(text)
+        self.invalid |= mask
+    
+    def as_list(self, row_offset: int) -> List[Dict]:
+        return [
+            {
+                "row": row_offset + int(position) + 2,  # +2 for header row and 0-indexing
+                "message": "; ".join(messages)
+            }
+            for position, messages in sorted(self.messages.items())
+        ]
+
+
+def _text_column(df: pd.DataFrame, column: str, errors: _RowErrors) -> np.ndarray:
+    #Required text column, stripped of surrounding whitespace
+    if column not in df.columns:
+        errors.add(np.ones(errors.row_count, dtype=bool), f"Missing column '{column}'")
+        return np.full(errors.row_count, None, dtype=object)
+    
+    values = df[column].str.strip()
+    errors.add(values.isna().to_numpy() | (values == "").to_numpy(), f"Missing value for {column}")
+    return values.to_numpy(dtype=object)
+
+
+def _number_column(df: pd.DataFrame, column: str, errors: _RowErrors, integer: bool = False) -> np.ndarray:
+    #Required numeric column; integer columns also reject fractional values
+    if column not in df.columns:
+        errors.add(np.ones(errors.row_count, dtype=bool), f"Missing column '{column}'")
+        return np.zeros(errors.row_count)
+    
+    raw = df[column]
+    values = pd.to_numeric(raw.str.strip(), errors="coerce").to_numpy(dtype=float)
+    missing = raw.isna().to_numpy()
+    errors.add(missing, f"Missing value for {column}")
+    errors.add(np.isnan(values) & ~missing, f"Invalid value '{{}}' for {column}", raw.to_numpy())
+    if integer:
+        errors.add(np.isfinite(values) & (values != np.floor(values)),
+                   f"Invalid value '{{}}' for {column}, expected an integer", raw.to_numpy())
+    return np.nan_to_num(values)
+
+
+def parse_expiry_date(value: str) -> Optional[datetime]:
+    #ISO expiry date as create_item parses it; None when the text is not one
+    try:
+        return datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def parse_containers(df: pd.DataFrame, row_offset: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    
+    #Validate and convert a containers CSV frame column by column
+    #Returns (container documents, per-row errors); row_offset is the number of data
+    #rows before this frame, for chunked reads
+    
+    errors = _RowErrors(len(df))
+    container_ids, zones = (_text_column(df, column, errors) for column in CONTAINER_TEXT_COLUMNS)
+    widths, depths, heights = (_number_column(df, column, errors) for column in CONTAINER_FLOAT_COLUMNS)
+    
+    valid = ~errors.invalid
+    containers = [
+        {
+            "container_id": container_id,
+            "zone": zone,
+            "dimensions": {
+                "width": width,
+                "depth": depth,
+                "height": height
+            },
+            "occupied_volume": 0
+        }
+        for container_id, zone, width, depth, height in zip(
+            container_ids[valid], zones[valid],
+            widths[valid].tolist(), depths[valid].tolist(), heights[valid].tolist()
+        )
+    ]
+    return containers, errors.as_list(row_offset)
+
+
+def parse_items(df: pd.DataFrame, row_offset: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    
+    #Validate and convert an items CSV frame column by column
+    #Returns (item documents, per-row errors); see parse_containers
+    
+    errors = _RowErrors(len(df))
+    item_ids, names, zones = (_text_column(df, column, errors) for column in ITEM_TEXT_COLUMNS)
+    widths, depths, heights, masses = (_number_column(df, column, errors) for column in ITEM_FLOAT_COLUMNS)
+    priorities, usage_limits = (_number_column(df, column, errors, integer=True) for column in ITEM_INT_COLUMNS)
+    
+    # Expiry date is optional; empty and "N/A" mean no expiry. Stored as a datetime, as
+    # create_item does, so the expiry_date sort and filters compare dates
+    if "expiry_date" in df.columns:
+        expiry = df["expiry_date"].str.strip()
+        present = (expiry.notna() & (expiry.str.lower() != "n/a") & (expiry != "")).to_numpy()
+        raw = expiry.to_numpy(dtype=object)
+        expiry_dates = np.full(len(df), None, dtype=object)
+        for position in np.flatnonzero(present):
+            expiry_dates[position] = parse_expiry_date(raw[position])
+        errors.add(present & np.equal(expiry_dates, None), "Invalid value '{}' for expiry_date", raw)
+    else:
+        expiry_dates = np.full(len(df), None, dtype=object)
+    
+    valid = ~errors.invalid
+    items = [
+        {
+            "item_id": item_id,
+            "name": name,
+            "dimensions": {
+                "width": width,
+                "depth": depth,
+                "height": height
+            },
+            "mass": mass,
+            "priority": priority,
+            "expiry_date": expiry_date,
+            "usage_limit": usage_limit,
+            "usage_count": 0,
+            "preferred_zone": zone,
+            "is_waste": False
+        }
+        for item_id, name, zone, width, depth, height, mass, priority, usage_limit, expiry_date in zip(
+            item_ids[valid], names[valid], zones[valid],
+            widths[valid].tolist(), depths[valid].tolist(), heights[valid].tolist(), masses[valid].tolist(),
+            priorities[valid].astype(np.int64).tolist(), usage_limits[valid].astype(np.int64).tolist(),
+            expiry_dates[valid]
+        )
+    ]
+    return items, errors.as_list(row_offset)
+
+
+def upsert_documents(collection, key: str, documents: List[Dict], writer: BulkWriter) -> List[Dict]:
+    
+    #Upsert documents by key through unordered bulk writes
+    #Unordered batches give no ordering between operations, so when a key repeats only
+    #its last document is written (the same end state as upserting row by row)
+    
+    latest = {document[key]: document for document in documents}
+    operations = [
+        UpdateOne({key: value}, {"$set": document}, upsert=True)
+        for value, document in latest.items()
+    ]
+    return writer.write(collection, operations)
+
+
+def normalize_expiry_dates(collection, writer: BulkWriter) -> int:
+    
+    #Convert expiry dates stored as text (CSV imports used to keep the raw string) to
+    #datetimes, so every expiry_date sorts and filters as a date. Text that is not an
+    #ISO date is left as it is and logged. Returns the number of items converted
+    
+    operations = []
+    unparsed = []
+    for doc in collection.find({"expiry_date": {"$type": "string"}}, {"item_id": 1, "expiry_date": 1}):
+        expiry_date = parse_expiry_date(doc["expiry_date"])
+        if expiry_date is None:
+            unparsed.append(doc.get("item_id"))
+            continue
+        # Matched on the old value too, so a concurrent update is not overwritten
+        operations.append(UpdateOne({"_id": doc["_id"], "expiry_date": doc["expiry_date"]},
+                                    {"$set": {"expiry_date": expiry_date}}))
+    writer.write(collection, operations)
+    if unparsed:
+        logger.warning(f"{len(unparsed)} items keep an expiry_date that is not an ISO date, e.g. {unparsed[:10]}")
+    if operations:
+        logger.info(f"Converted {len(operations)} text expiry dates to dates")
+    return len(operations)
@@ -0,0 +1,304 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+import threading
+import logging
+from ..models.container import Container, Dimensions
+from ..models.item import Item, Position
+from ..utils.spatial_grid import SpatialGrid, choose_resolution
+
+logger = logging.getLogger(__name__)
+
+# Default memory budget for cached grids (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class GridReplayError(Exception):
+    # Raised when stored items cannot all be placed back into a container's grid
+    # (overlapping or out-of-bounds positions); the grid is not cached
+    pass
+
+
+def container_from_doc(doc: Dict) -> Container:
+    #Build a Container model from a containers collection document
+    return Container(
+        container_id=doc["container_id"],
+        zone=doc["zone"],
+        dimensions=Dimensions(
+            width=doc["dimensions"]["width"],
+            depth=doc["dimensions"]["depth"],
+            height=doc["dimensions"]["height"]
+        ),
+        occupied_volume=doc.get("occupied_volume", 0)
+    )
+
+
+def position_from_doc(pos: Dict) -> Position:
+    #Build a Position model from a stored {start_coordinates, end_coordinates} dict
+    return Position(
+        start_coordinates=Dimensions(
+            width=pos["start_coordinates"]["width"],
+            depth=pos["start_coordinates"]["depth"],
+            height=pos["start_coordinates"]["height"]
+        ),
+        end_coordinates=Dimensions(
+            width=pos["end_coordinates"]["width"],
+            depth=pos["end_coordinates"]["depth"],
+            height=pos["end_coordinates"]["height"]
+        )
+    )
+
+
+def item_from_doc(doc: Dict) -> Item:
+    #Build an Item model (with its position, if any) from an items collection document
+    position = None
+    if doc.get("position"):
+        position = position_from_doc(doc["position"])
+    return Item(
+        item_id=doc["item_id"],
+        name=doc["name"],
+        dimensions=Dimensions(
+            width=doc["dimensions"]["width"],
+            depth=doc["dimensions"]["depth"],
+            height=doc["dimensions"]["height"]
+        ),
+        mass=doc["mass"],
+        priority=doc["priority"],
+        expiry_date=doc.get("expiry_date"),
+        usage_limit=doc["usage_limit"],
+        usage_count=doc.get("usage_count", 0),
+        preferred_zone=doc["preferred_zone"],
+        container_id=doc.get("container_id"),
+        position=position
+    )
+
+
+class GridCache:
+    
+    #Process-wide cache of live container grids.
+    #A container's grid is rebuilt from Mongo the first time it is needed and then kept
+    #up to date in place by the placement endpoints, so a suggestion costs a search
+    #instead of a full replay of the container. Cold containers are evicted in LRU
+    #order once the grids exceed max_bytes.
+    #Loads run without the lock, so every change to a container (placement, removal,
+    #invalidation) bumps its version; a load that overlapped a change is discarded
+    #and repeated rather than cached without that change.
+    
+    
+    def __init__(self, db, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db = db
+        self.max_bytes = max_bytes
+        self._grids = OrderedDict()  # Map of container_id to SpatialGrid, oldest first
+        self._lock = threading.RLock()
+        self._versions = {}  # Map of container_id to the number of changes seen
+        self._loading = {}  # Map of container_id to the number of loads in progress
+    
+    def __contains__(self, container_id: str) -> bool:
+        return container_id in self._grids
+    
+    def __len__(self) -> int:
+        return len(self._grids)
+    
+    @property
+    def lock(self) -> threading.RLock:
+        #Held by callers that update cached grids outside the cache (incremental placement)
+        return self._lock
+    
+    def memory_bytes(self) -> int:
+        #Approximate memory held by all cached grids
+        with self._lock:
+            return sum(grid.memory_bytes() for grid in self._grids.values())
+    
+    def get(self, container_doc: Dict) -> SpatialGrid:
+        #Return the live grid of a container, loading it from the database on a miss
+        container_id = container_doc["container_id"]
+        while True:
+            with self._lock:
+                grid = self._grids.get(container_id)
+                if grid is not None:
+                    self._grids.move_to_end(container_id)
+                    return grid
+                version = self._versions.get(container_id, 0)
+                self._loading[container_id] = self._loading.get(container_id, 0) + 1
+            
+            try:
+                grid = self._load(container_doc)
+            finally:
+                with self._lock:
+                    self._loading[container_id] -= 1
+                    if not self._loading[container_id]:
+                        del self._loading[container_id]
+            
+            with self._lock:
+                if self._versions.get(container_id, 0) != version:
+                    # Changed while loading: the loaded state may predate the change
+                    logger.info(f"Container {container_id} changed while its grid was loading, reloading")
+                    continue
+                cached = self._grids.get(container_id)
+                if cached is not None:
+                    # Another load of the same container finished first
+                    self._grids.move_to_end(container_id)
+                    return cached
+                self._grids[container_id] = grid
+                self._grids.move_to_end(container_id)
+                self._evict()
+            return grid
+    
+    def _touch(self, container_ids: Iterable[str]) -> None:
+        #Record a change to containers, so loads in progress for them are discarded
+        #(call with the lock held)
+        for container_id in container_ids:
+            self._versions[container_id] = self._versions.get(container_id, 0) + 1
+    
+    def find_best_fit(self, container_doc: Dict, item_dimensions: Dimensions,
+                      search_mode: str = "scan") -> Tuple[Container, Optional[Position]]:
+        
+        #Search a container's live grid for an item, loading it on a miss.
+        #A search updates the grid's memo and extreme points, so it runs under the lock
+        #like every other update; loading from the database does not hold it.
+        #Returns the grid's container and the best position (None if the item does not fit)
+        
+        grid = self.get(container_doc)
+        with self._lock:
+            # A concurrent rebuild may have replaced the grid since it was loaded
+            grid = self._grids.get(container_doc["container_id"], grid)
+            return grid.container, grid.find_best_fit(item_dimensions, search_mode)
+    
+    def _load(self, container_doc: Dict) -> SpatialGrid:
+        #Replay every stored item of a container into a fresh grid
+        container = container_from_doc(container_doc)
+        stored_items = [
+            item_from_doc(doc)
+            for doc in self.db.items.find({"container_id": container.container_id})
+            if doc.get("position")
+        ]
+        
+        resolution = choose_resolution(container, [item.dimensions for item in stored_items],
+                                       positions=[item.position for item in stored_items])
+        grid = self._replay(container, [(item, item.position) for item in stored_items], resolution)
+        
+        logger.info(f"Loaded grid for container {container.container_id} with {len(grid.items)} items")
+        return grid
+    
+    def grids_for(self, container_docs: List[Dict], item_dimensions: List[Dimensions]) -> Dict[str, SpatialGrid]:
+        
+        #Live grids of the given containers with a cell size that also fits the given
+        #item shapes. A cached grid whose cell size does not divide the new shapes is
+        #rebuilt at the common cell size from its own items, without reading the database.
+        #The common cell size comes from the grid's running position divisor, so stowed
+        #positions are only walked when a rebuild actually happens.
+        
+        grids = {}
+        with self._lock:
+            for doc in container_docs:
+                grid = self.get(doc)
+                if grid.on_lattice(item_dimensions):
+                    grids[grid.container.container_id] = grid
+                    continue
+                cell = Dimensions(width=grid.resolution, depth=grid.resolution, height=grid.resolution)
+                resolution = choose_resolution(grid.container, list(item_dimensions) + [cell],
+                                               stored_divisor=grid.position_divisor)
+                if resolution != grid.resolution:
+                    try:
+                        grid = self._rebuild(grid, resolution)
+                    except GridReplayError:
+                        # The old grid's container volume was reset by the replay
+                        del self._grids[grid.container.container_id]
+                        raise
+                    self._grids[grid.container.container_id] = grid
+                grids[grid.container.container_id] = grid
+            self._evict()
+        return grids
+    
+    def _rebuild(self, grid: SpatialGrid, resolution: float) -> SpatialGrid:
+        #Replay a grid's items into a new grid with another cell size
+        container = grid.container
+        rebuilt = self._replay(container, [(item, grid.positions[item_id]) for item_id, item in grid.items.items()],
+                               resolution)
+        logger.info(f"Rebuilt grid for container {container.container_id} with cell size {resolution}")
+        return rebuilt
+    
+    @staticmethod
+    def _replay(container: Container, placements: List, resolution: float) -> SpatialGrid:
+        
+        #Place (item, position) pairs into a fresh grid of a container at a cell size.
+        #The grid recomputes occupied volume from the items it holds. Every item has to
+        #land where it was stored: a grid missing some of them would hand their space
+        #to new items, so GridReplayError is raised instead
+        
+        container.occupied_volume = 0
+        grid = SpatialGrid(container, resolution)
+        failed = [item.item_id for item, position in placements if not grid.place_item(item, position)]
+        if failed:
+            raise GridReplayError(
+                f"Container {container.container_id}: {len(failed)} stored items cannot be placed back "
+                f"at cell size {resolution} ({', '.join(failed[:10])})"
+            )
+        return grid
+    
+    def _evict(self) -> None:
+        #Drop least recently used grids until the cache fits its memory budget
+        total = sum(grid.memory_bytes() for grid in self._grids.values())
+        while total > self.max_bytes and len(self._grids) > 1:
+            container_id, grid = self._grids.popitem(last=False)
+            total -= grid.memory_bytes()
+            logger.info(f"Evicted grid for container {container_id} from cache")
+    
+    def invalidate(self, container_ids: Optional[Iterable[str]] = None) -> None:
+        #Forget the given containers (all containers if None); they reload on next use
+        with self._lock:
+            if container_ids is None:
+                self._touch(list(self._grids) + list(self._loading))
+                self._grids.clear()
+                return
+            container_ids = list(container_ids)
+            self._touch(container_ids)
+            for container_id in container_ids:
+                self._grids.pop(container_id, None)
+    
+    def sync_container(self, container: Container) -> None:
+        #Drop the cached grid of a container whose stored dimensions have changed
+        with self._lock:
+            grid = self._grids.get(container.container_id)
+            if grid is not None and grid.container.dimensions != container.dimensions:
+                del self._grids[container.container_id]
+            self._touch([container.container_id])
+    
+    def invalidate_items(self, item_ids: Iterable[str]) -> None:
+        #Forget every cached container holding one of the given items
+        item_ids = set(item_ids)
+        with self._lock:
+            stale = [cid for cid, grid in self._grids.items() if not item_ids.isdisjoint(grid.items)]
+            # A grid still loading may hold them too
+            self.invalidate(stale + list(self._loading))
+    
+    def apply_placement(self, item: Item, container_id: str, position: Position,
+                        old_container_id: Optional[str] = None) -> None:
+        
+        #Mirror a persisted placement in the cached grids: take the item out of its
+        #previous grid and write it into the new one. A grid that cannot take the item
+        #(e.g. the stored state overlaps) is dropped and reloaded on next use.
+        
+        with self._lock:
+            if old_container_id is None:
+                # Previous container unknown: look for the item in every cached grid (and
+                # treat every grid still loading as a possible source)
+                sources = [cid for cid, grid in self._grids.items() if item.item_id in grid.items]
+                self._touch(list(self._loading))
+            else:
+                sources = [old_container_id, container_id]
+            self._touch(sources + [container_id])
+            for cid in sources:
+                grid = self._grids.get(cid)
+                if grid is not None and item.item_id in grid.items:
+                    grid.remove_item(item.item_id)
+            
+            grid = self._grids.get(container_id)
+            if grid is None:
+                return
+            
+            placed_item = item.copy()
+            placed_item.position = position
+            placed_item.container_id = container_id
+            if not grid.place_item(placed_item, position):
+                logger.info(f"Cached grid for container {container_id} is stale, dropping it")
+                self._grids.pop(container_id, None)
@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+import os
+import tempfile
+import threading
+import uuid
+import logging
+from .bulk_writer import BulkWriter
+from .csv_import import read_csv, parse_containers, parse_items, upsert_documents
+from .grid_cache import GridCache
+
+logger = logging.getLogger(__name__)
+
+# Rows parsed and written per chunk of a streaming import
+DEFAULT_CHUNK_ROWS = 10000
+
+# Bytes copied per read while spooling an upload to disk
+UPLOAD_COPY_BYTES = 1024 * 1024
+
+# Row errors kept per job (the total is always counted)
+MAX_REPORTED_ERRORS = 1000
+
+# Finished jobs kept for polling before the oldest are forgotten
+MAX_FINISHED_JOBS = 100
+
+
+class ImportJob:
+    
+    #Progress of one streaming CSV import, updated by its worker thread
+    
+    
+    def __init__(self, kind: str):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"  # queued, running, completed or failed
+        self.rows_processed = 0
+        self.imported_count = 0
+        self.error_count = 0
+        self.errors = []
+        self.message = None
+        self.created_at = datetime.now()
+        self.finished_at = None
+    
+    def add_errors(self, errors: List[Dict]) -> None:
+        self.error_count += len(errors)
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+    
+    def to_dict(self) -> Dict:
+        return {
+            "jobId": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "rowsProcessed": self.rows_processed,
+            "importedCount": self.imported_count,
+            "errorCount": self.error_count,
+            "errors": list(self.errors),
+            "message": self.message,
+            "createdAt": self.created_at.isoformat(),
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ImportJobManager:
+    
+    #Runs streaming CSV imports in background threads.
+    #The upload is spooled to a temporary file, then read back chunk_rows rows at a
+    #time; every chunk is validated, upserted and released before the next one is read,
+    #so memory stays flat regardless of file size. Progress is polled by job id.
+    
+    
+    def __init__(self, db, bulk_writer: BulkWriter, grid_cache: Optional[GridCache] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.db = db
+        self.bulk_writer = bulk_writer
+        self.grid_cache = grid_cache
+        self.chunk_rows = chunk_rows
+        self._jobs = {}  # Map of job_id to ImportJob, oldest first
+        self._lock = threading.Lock()
+    
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    async def start(self, kind: str, upload) -> ImportJob:
+        
+        #Spool an UploadFile to disk and start importing it ("items" or "containers")
+        #Returns the queued job
+        
+        if kind not in ("items", "containers"):
+            raise ValueError(f"Unknown import kind '{kind}'")
+        
+        spool = tempfile.NamedTemporaryFile(prefix="import-", suffix=".csv", delete=False)
+        try:
+            while True:
+                block = await upload.read(UPLOAD_COPY_BYTES)
+                if not block:
+                    break
+                spool.write(block)
+        except Exception:
+            spool.close()
+            os.unlink(spool.name)
+            raise
+        spool.close()
+        
+        job = ImportJob(kind)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        
+        thread = threading.Thread(target=self._run, args=(job, spool.name), daemon=True)
+        thread.start()
+        logger.info(f"Started {kind} import job {job.job_id}")
+        return job
+    
+    def _prune(self) -> None:
+        #Forget the oldest finished jobs beyond MAX_FINISHED_JOBS
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+    
+    def _run(self, job: ImportJob, path: str) -> None:
+        #Worker thread: import the spooled file chunk by chunk, then delete it
+        job.status = "running"
+        try:
+            for chunk in read_csv(path, chunksize=self.chunk_rows):
+                if job.kind == "items":
+                    documents, errors = parse_items(chunk, row_offset=job.rows_processed)
+                    upsert_documents(self.db.items, "item_id", documents, self.bulk_writer)
+                    if self.grid_cache:
+                        self.grid_cache.invalidate_items(document["item_id"] for document in documents)
+                else:
+                    documents, errors = parse_containers(chunk, row_offset=job.rows_processed)
+                    upsert_documents(self.db.containers, "container_id", documents, self.bulk_writer)
+                    if self.grid_cache:
+                        self.grid_cache.invalidate(document["container_id"] for document in documents)
+                
+                job.rows_processed += len(chunk)
+                job.imported_count += len(documents)
+                job.add_errors(errors)
+            
+            job.status = "completed"
+            logger.info(f"Import job {job.job_id} completed: {job.imported_count} of {job.rows_processed} rows imported")
+        except Exception as e:
+            job.status = "failed"
+            job.message = str(e)
+            logger.error(f"Import job {job.job_id} failed: {e}")
+        finally:
+            job.finished_at = datetime.now()
+            os.unlink(path)
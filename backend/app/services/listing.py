@@ -0,0 +1,227 @@
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+import base64
+import logging
+import pymongo
+from bson import json_util
+from .repository import AsyncCollection
+from .streaming import parse_fields
+
+logger = logging.getLogger(__name__)
+
+# Keyset (cursor) pagination for the item and container listings.
+# A page is the next `limit` documents in (sort field, key) order after the last one
+# of the previous page, so every page costs an index range scan however deep it is,
+# unlike skip/offset. The key (item_id / container_id) breaks ties between equal sort
+# values. The cursor returned with a page is an opaque token holding the sort and the
+# (sort value, key) of its last document.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Listing of a collection: its key field and the sort fields it accepts
+ITEM_LISTING = {"key": "item_id", "sorts": ["item_id", "name", "priority", "expiry_date", "preferred_zone"]}
+CONTAINER_LISTING = {"key": "container_id", "sorts": ["container_id", "zone", "occupied_volume"]}
+
+# Indexes behind the listings (every sort field followed by the key, plus the
+# equality filters), the lookups by key and the grid cache's loads by container.
+# Created at startup; create_index is a no-op for an index that already exists
+INDEXES = {
+    "items": [
+        [("item_id", 1)],
+        [("name", 1), ("item_id", 1)],
+        [("priority", 1), ("item_id", 1)],
+        [("expiry_date", 1), ("item_id", 1)],
+        [("preferred_zone", 1), ("item_id", 1)],
+        [("preferred_zone", 1), ("priority", 1), ("item_id", 1)],
+        [("container_id", 1), ("item_id", 1)],
+        [("is_waste", 1), ("item_id", 1)]
+    ],
+    "containers": [
+        [("container_id", 1)],
+        [("zone", 1), ("container_id", 1)],
+        [("occupied_volume", 1), ("container_id", 1)]
+    ]
+}
+
+# BSON sort order of the value types the sort fields hold (missing sorts as null).
+# Expiry dates are datetimes or null (text from older CSV imports is converted at
+# startup), but a keyset step still continues into the types that sort after the last
+# value, so a document of another type is never skipped
+TYPE_ORDER = ["null", "number", "string", "date"]
+
+
+def ensure_indexes(db) -> None:
+    #Create the listing and lookup indexes (blocking)
+    for collection, indexes in INDEXES.items():
+        for keys in indexes:
+            db[collection].create_index(keys)
+    logger.info(f"Ensured {sum(len(indexes) for indexes in INDEXES.values())} indexes")
+
+
+def _type_of(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, datetime):
+        return "date"
+    if isinstance(value, (int, float)):
+        return "number"
+    raise ValueError(f"Cannot page on a value of type {type(value).__name__}")
+
+
+def parse_sort(sort: Optional[str], listing: Dict) -> Tuple[str, int]:
+    #(field, direction) of a sort option: a sort field, descending with a leading "-"
+    sort = sort or listing["key"]
+    field, direction = (sort[1:], pymongo.DESCENDING) if sort.startswith("-") else (sort, pymongo.ASCENDING)
+    if field not in listing["sorts"]:
+        raise ValueError(f"Unknown sort '{field}' (expected one of {', '.join(listing['sorts'])})")
+    return field, direction
+
+
+def encode_cursor(sort: str, value, key: str) -> str:
+    return base64.urlsafe_b64encode(json_util.dumps([sort, value, key]).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[object, str]:
+    #(sort value, key) of the last document of the previous page
+    #Raises ValueError for a malformed cursor or one issued for another sort
+    try:
+        cursor_sort, value, key = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    return value, key
+
+
+def _after(field: str, key: str, value, key_value: str, direction: int) -> Dict:
+    #Filter for the documents that sort after (value, key_value)
+    operator = "$gt" if direction == pymongo.ASCENDING else "$lt"
+    if field == key:
+        return {key: {operator: key_value}}
+    conditions = [{field: value, key: {operator: key_value}}]
+    if value is not None:
+        conditions.append({field: {operator: value}})
+    rank = TYPE_ORDER.index(_type_of(value))
+    later_types = TYPE_ORDER[rank + 1:] if direction == pymongo.ASCENDING else TYPE_ORDER[:rank]
+    for later_type in later_types:
+        conditions.append({field: None} if later_type == "null" else {field: {"$type": later_type}})
+    return {"$or": conditions}
+
+
+def _parse_date(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}' for {name}")
+
+
+def item_filter(zone: Optional[str] = None, container_id: Optional[str] = None, placed: Optional[bool] = None,
+                is_waste: Optional[bool] = None, min_priority: Optional[int] = None,
+                max_priority: Optional[int] = None, expires_after: Optional[str] = None,
+                expires_before: Optional[str] = None) -> Dict:
+    
+    #Mongo filter for the item listing filters (all optional, combined with and)
+    #expires_after / expires_before are ISO dates bounding expiry_date (after inclusive)
+    
+    conditions = []
+    if zone:
+        conditions.append({"preferred_zone": zone})
+    if container_id:
+        conditions.append({"container_id": container_id})
+    if placed is not None:
+        conditions.append({"container_id": {"$ne": None} if placed else None})
+    if is_waste is not None:
+        conditions.append({"is_waste": is_waste})
+    if min_priority is not None or max_priority is not None:
+        priority = {}
+        if min_priority is not None:
+            priority["$gte"] = min_priority
+        if max_priority is not None:
+            priority["$lte"] = max_priority
+        conditions.append({"priority": priority})
+    if expires_after or expires_before:
+        dates = {}
+        if expires_after:
+            dates["$gte"] = _parse_date(expires_after, "expires_after")
+        if expires_before:
+            dates["$lt"] = _parse_date(expires_before, "expires_before")
+        conditions.append({"expiry_date": dates})
+    return {"$and": conditions} if conditions else {}
+
+
+def container_filter(zone: Optional[str] = None) -> Dict:
+    #Mongo filter for the container listing filters
+    return {"zone": zone} if zone else {}
+
+
+# Aggregates over everything a listing filter matches (see listing_summary)
+ITEM_SUMMARY = {
+    "_id": None,
+    "total": {"$sum": 1},
+    "totalVolume": {"$sum": {"$multiply": ["$dimensions.width", "$dimensions.depth", "$dimensions.height"]}},
+    "totalMass": {"$sum": "$mass"},
+    "unplaced": {"$sum": {"$cond": [{"$ifNull": ["$container_id", False]}, 0, 1]}}
+}
+CONTAINER_SUMMARY = {
+    "_id": None,
+    "total": {"$sum": 1},
+    "highUtilization": {"$sum": {"$cond": [
+        {"$gt": [
+            "$occupied_volume",
+            {"$multiply": [0.8, "$dimensions.width", "$dimensions.depth", "$dimensions.height"]}
+        ]},
+        1, 0
+    ]}}
+}
+
+
+async def list_page(collection: AsyncCollection, listing: Dict, filter: Dict, sort: Optional[str] = None,
+                    cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                    fields: Optional[str] = None) -> Dict:
+    
+    #One page of a listing: up to limit documents matching filter in sort order,
+    #after the cursor of the previous page (first page without one).
+    #fields is a comma-separated projection (see streaming.parse_fields); the sort
+    #field and key are always included, as the next cursor is built from them.
+    #Returns {"data", "nextCursor" (None on the last page), "sort"}
+    #Raises ValueError for an invalid sort, cursor or page size
+    
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    key = listing["key"]
+    sort = sort or key
+    field, direction = parse_sort(sort, listing)
+    
+    query = filter
+    if cursor:
+        value, key_value = decode_cursor(cursor, sort)
+        query = {"$and": [filter, _after(field, key, value, key_value, direction)]}
+    
+    projection = parse_fields(fields)
+    if projection:
+        projection[field] = projection[key] = 1
+    
+    order = [(field, direction)] if field == key else [(field, direction), (key, direction)]
+    documents = await collection.find(query, projection, sort=order, limit=limit + 1)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(sort, last.get(field), last[key])
+    
+    return {"data": documents, "nextCursor": next_cursor, "sort": sort}
+
+
+async def listing_summary(collection: AsyncCollection, filter: Dict, summary: Dict) -> Dict:
+    
+    #Totals of a $group stage (ITEM_SUMMARY, CONTAINER_SUMMARY) over every document
+    #matching filter. It scans all matches, unlike a page, so it is served on its own
+    #and clients fetch it after the first page instead of delaying that page
+    
+    totals = await collection.aggregate([{"$match": filter}, {"$group": summary}])
+    result = {name: 0 for name in summary if name != "_id"}
+    result.update((name, value) for name, value in (totals[0] if totals else {}).items() if name != "_id")
+    return result
@@ -0,0 +1,222 @@
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import logging
+from ..models.container import Container
+from ..models.item import Item
+from ..algorithms.bin_packing import BinPacker, PackingCancelled
+
+logger = logging.getLogger(__name__)
+
+# Seconds between partial-result updates sent by a running job
+PROGRESS_INTERVAL = 0.5
+
+# Finished jobs kept for polling before the oldest are forgotten
+MAX_FINISHED_JOBS = 100
+
+
+def _run_packing_job(job_id: str, items: List[Item], containers: List[Container], options: Dict,
+                     events, cancel_event) -> None:
+    
+    # Worker process entry point: pack the items and report back through the events queue.
+    # New placements are sent in batches at most every PROGRESS_INTERVAL seconds; the
+    # run stops between items once cancel_event is set.
+    
+    events.put(("running", job_id, len(items)))
+    pending = []
+    last_sent = time.time()
+    processed = 0
+    
+    def progress(done: int, total: int, placement: Optional[Dict]) -> None:
+        nonlocal last_sent, processed
+        processed = done
+        if placement:
+            pending.append(placement)
+        if done == total or time.time() - last_sent >= PROGRESS_INTERVAL:
+            events.put(("progress", job_id, done, list(pending)))
+            pending.clear()
+            last_sent = time.time()
+    
+    try:
+        result = BinPacker.place_items(items, containers, progress=progress,
+                                       should_stop=cancel_event.is_set, **options)
+        if pending:
+            # A time budget can end the run before the final progress call
+            events.put(("progress", job_id, processed, list(pending)))
+        # The containers carry the occupied volume of the plan, needed to persist it
+        events.put(("completed", job_id, result, containers))
+    except PackingCancelled as e:
+        events.put(("progress", job_id, processed, list(pending)))
+        events.put(("cancelled", job_id, str(e)))
+    except Exception as e:
+        events.put(("failed", job_id, str(e)))
+
+
+class PlacementJob:
+    
+    #State of one background packing run, updated from the job manager's listener thread
+    
+    
+    def __init__(self, kind: str, total_items: int, on_result: Optional[Callable] = None):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind  # "placement" (persisted when done) or "simulation"
+        self.status = "queued"  # queued, running, completed, failed or cancelled
+        self.total_items = total_items
+        self.processed_items = 0
+        self.placements = []  # Placements so far, in packing order
+        self.result = None
+        self.message = None
+        self.on_result = on_result
+        self.future = None
+        self.cancel_event = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+    
+    def to_dict(self) -> Dict:
+        return {
+            "jobId": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "totalItems": self.total_items,
+            "processedItems": self.processed_items,
+            "placedItems": len(self.placements),
+            "message": self.message,
+            "createdAt": self.created_at.isoformat(),
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result
+        }
+
+
+class PlacementJobManager:
+    
+    #Runs BinPacker.place_items in a pool of worker processes.
+    #Each submitted pack gets a job id; workers stream partial placements back over a
+    #managed queue, which a listener thread folds into the job state. Up to max_workers
+    #packs run at once, the rest wait in the pool's queue. The pool, queue and listener
+    #are started on the first submit.
+    
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._jobs = {}  # Map of job_id to PlacementJob, oldest first
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._events = None
+        self._listener = None
+    
+    def _start(self) -> None:
+        if self._executor:
+            return
+        self._manager = multiprocessing.Manager()
+        self._events = self._manager.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+        logger.info(f"Started placement job pool with {self.max_workers} workers")
+    
+    def get(self, job_id: str) -> Optional[PlacementJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def submit(self, kind: str, items: List[Item], containers: List[Container], options: Dict,
+               on_result: Optional[Callable[[Dict, List[Container]], None]] = None) -> PlacementJob:
+        
+        #Queue a packing run; on_result(result, containers) is called from the listener
+        #thread when it completes (e.g. to persist the plan)
+        #Returns the queued job
+        
+        job = PlacementJob(kind, len(items), on_result)
+        with self._lock:
+            self._start()
+            self._prune()
+            job.cancel_event = self._manager.Event()
+            self._jobs[job.job_id] = job
+            job.future = self._executor.submit(
+                _run_packing_job, job.job_id, items, containers, options, self._events, job.cancel_event
+            )
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        logger.info(f"Queued {kind} job {job.job_id} with {len(items)} items")
+        return job
+    
+    def cancel(self, job_id: str) -> Optional[PlacementJob]:
+        #Cancel a queued job outright, or ask a running one to stop after its current item
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.future.cancel():
+            self._finish(job, "cancelled", "Cancelled before it started")
+        else:
+            job.cancel_event.set()
+        return job
+    
+    def _prune(self) -> None:
+        #Forget the oldest finished jobs beyond MAX_FINISHED_JOBS
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+    
+    def _finish(self, job: PlacementJob, status: str, message: Optional[str] = None) -> None:
+        job.status = status
+        job.message = message
+        job.finished_at = datetime.now()
+        logger.info(f"Placement job {job.job_id} {status}")
+    
+    def _on_done(self, job: PlacementJob, future) -> None:
+        #A worker that died (rather than reporting an error) leaves the job unfinished
+        if not future.cancelled() and future.exception() is not None and not job.finished:
+            self._finish(job, "failed", str(future.exception()))
+    
+    def _listen(self) -> None:
+        #Listener thread: apply worker events to the job state
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            kind, job_id = event[0], event[1]
+            job = self.get(job_id)
+            if job is None:
+                continue
+            
+            if kind == "running":
+                job.status = "running"
+                job.started_at = datetime.now()
+            elif kind == "progress":
+                _, _, done, placements = event
+                job.placements.extend(placements)
+                job.processed_items = done
+            elif kind == "completed":
+                _, _, result, containers = event
+                try:
+                    if job.on_result and result["success"]:
+                        job.on_result(result, containers)
+                    job.result = result
+                    self._finish(job, "completed")
+                except Exception as e:
+                    self._finish(job, "failed", f"Packing finished but saving failed: {e}")
+            elif kind == "cancelled":
+                self._finish(job, "cancelled", event[2])
+            elif kind == "failed":
+                self._finish(job, "failed", event[2])
+    
+    def shutdown(self) -> None:
+        if not self._executor:
+            return
+        for job in list(self._jobs.values()):
+            if not job.finished:
+                self.cancel(job.job_id)
+        self._executor.shutdown(wait=True)
+        self._events.put(None)
+        self._listener.join()
+        self._manager.shutdown()
@@ -1,33 +1,58 @@
 from fastapi import HTTPException
-from typing import List, Dict, Optional
-from pymongo import MongoClient
+from typing import List, Dict, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pymongo import UpdateOne
 from datetime import datetime
+import asyncio
 import time
 import logging
 from ..models.container import Container, Dimensions
 from ..models.item import Item, Position
 from ..algorithms.bin_packing import BinPacker
+from ..utils.records import ItemRecord
+from .grid_cache import GridCache, item_from_doc, position_from_doc
+from .columnar import items_from_columns, containers_from_columns
+from .bulk_writer import BulkWriter, DEFAULT_BATCH_SIZE
+from .repository import Repository
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Threads for packing runs. Packing is CPU-bound, so it gets its own pool instead of
+# the repository's database threads, where a few large runs would stall every query
+DEFAULT_PACKING_THREADS = 4
+
 class PlacementService:
 
     #Service for handling item placement in containers
 
     
-    def __init__(self, db_client):
-        #Initialize with database client
-        self.db = db_client.space_stowage
-        self.items_collection = self.db.items
-        self.containers_collection = self.db.containers
-        self.logs_collection = self.db.logs
+    def __init__(self, repository: Repository, grid_cache: Optional[GridCache] = None,
+                 write_batch_size: int = DEFAULT_BATCH_SIZE, packing_threads: int = DEFAULT_PACKING_THREADS):
+        #Initialize with the non-blocking repository (and the shared grid cache to keep in sync)
+        #write_batch_size bounds the number of operations per bulk_write call
+        #packing_threads bounds the packing runs executing at once
+        self.repository = repository
+        self.items_collection = repository.items
+        self.containers_collection = repository.containers
+        self.logs_collection = repository.logs
+        self.grid_cache = grid_cache
+        self.bulk_writer = BulkWriter(write_batch_size)
+        self._packing_executor = ThreadPoolExecutor(max_workers=packing_threads, thread_name_prefix="packing")
+    
+    async def run_packing(self, function, *args, **kwargs):
+        #Run a packing call (BinPacker.place_items or a blocking step built on it) on the
+        #packing threads and await its result; database work stays on repository.run
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._packing_executor, partial(function, *args, **kwargs))
+    
+    def close(self) -> None:
+        self._packing_executor.shutdown(wait=True)
     
     async def get_containers(self) -> List[Container]:
         #Get all containers from the database
         containers = []
-        cursor = self.containers_collection.find({})
-        for doc in cursor:
+        for doc in await self.containers_collection.find({}):
             container = Container(
                 container_id=doc["container_id"],
                 zone=doc["zone"],
@@ -44,8 +69,7 @@ class PlacementService:
     async def get_items(self) -> List[Item]:
         # Get all items from the database
         items = []
-        cursor = self.items_collection.find({})
-        for doc in cursor:
+        for doc in await self.items_collection.find({}):
             position = None
             if "position" in doc and doc["position"]:
                 position = Position(
@@ -63,7 +87,9 @@ class PlacementService:
             
             expiry_date = None
             if "expiry_date" in doc and doc["expiry_date"]:
-                expiry_date = datetime.fromisoformat(doc["expiry_date"])
+                expiry_date = doc["expiry_date"]
+                if isinstance(expiry_date, str):
+                    expiry_date = datetime.fromisoformat(expiry_date)
                 
             item = Item(
                 item_id=doc["item_id"],
@@ -87,111 +113,283 @@ class PlacementService:
             items.append(item)
         return items
     
-    async def place_items(self, items_data: List[Dict], containers_data: List[Dict]) -> Dict:
+    def build_models(self, items_data: List[Dict], containers_data: List[Dict]) -> Tuple[List[Item], List[Container]]:
+        #Convert placement request payloads (camelCase) to Item and Container models
+        items = []
+        for item_data in items_data:
+            logger.debug("Converting item: %s", item_data["itemId"])
+            expiry_date = None
+            if "expiryDate" in item_data and item_data["expiryDate"]:
+                expiry_date = datetime.fromisoformat(item_data["expiryDate"])
+                
+            item = Item(
+                item_id=item_data["itemId"],
+                name=item_data["name"],
+                dimensions=Dimensions(
+                    width=item_data["width"],
+                    depth=item_data["depth"],
+                    height=item_data["height"]
+                ),
+                mass=item_data["mass"],
+                priority=item_data["priority"],
+                expiry_date=expiry_date,
+                usage_limit=item_data["usageLimit"],
+                usage_count=0,
+                preferred_zone=item_data["preferredZone"]
+            )
+            items.append(item)
+        
+        containers = []
+        for container_data in containers_data:
+            logger.debug("Converting container: %s", container_data["containerId"])
+            container = Container(
+                container_id=container_data["containerId"],
+                zone=container_data["zone"],
+                dimensions=Dimensions(
+                    width=container_data["width"],
+                    depth=container_data["depth"],
+                    height=container_data["height"]
+                ),
+                occupied_volume=0
+            )
+            containers.append(container)
+        
+        return items, containers
+    
+    def build_columnar(self, items_table: Dict,
+                       containers_data: Union[Dict, List[Dict]]) -> Tuple[List[ItemRecord], List[Container]]:
+        #Convert a columnar placement request to ItemRecords (no Item models) and Container
+        #models; containers may be a columnar table or the usual list of objects
+        #Raises ValueError for a malformed table
+        items = items_from_columns(items_table)
+        if isinstance(containers_data, dict):
+            containers = containers_from_columns(containers_data)
+        else:
+            _, containers = self.build_models([], containers_data)
+        return items, containers
+    
+    def build_request(self, items_data: Union[Dict, List[Dict]],
+                      containers_data: Union[Dict, List[Dict]]) -> Tuple[List[Union[Item, ItemRecord]], List[Container]]:
+        #build_columnar for a columnar item table, build_models for a list of items
+        if isinstance(items_data, dict):
+            return self.build_columnar(items_data, containers_data)
+        return self.build_models(items_data, containers_data)
+    
+    async def place_items(self, items_data: Union[Dict, List[Dict]], containers_data: Union[Dict, List[Dict]],
+                          packing_options: Optional[Dict] = None) -> Dict:
     
         #Place items in containers and save results to database
+        #items_data is a list of item objects or a columnar table (see services/columnar.py)
+        #packing_options are passed through to BinPacker.place_items (search_mode, parallel_zones, ...)
     
         start_time = time.time()
-        logger.info(f"Starting placement of {len(items_data)} items in {len(containers_data)} containers")
 
         try:
-            # Convert input data to model objects
-            items = []
-            for item_data in items_data:
-                print(f"Converting item: {item_data['itemId']}")
-                expiry_date = None
-                if "expiryDate" in item_data and item_data["expiryDate"]:
-                    expiry_date = datetime.fromisoformat(item_data["expiryDate"])
-                    
-                item = Item(
-                    item_id=item_data["itemId"],
-                    name=item_data["name"],
-                    dimensions=Dimensions(
-                        width=item_data["width"],
-                        depth=item_data["depth"],
-                        height=item_data["height"]
-                    ),
-                    mass=item_data["mass"],
-                    priority=item_data["priority"],
-                    expiry_date=expiry_date,
-                    usage_limit=item_data["usageLimit"],
-                    usage_count=0,
-                    preferred_zone=item_data["preferredZone"]
-                )
-                items.append(item)
-            
-            containers = []
-            for container_data in containers_data:
-                print(f"Converting container: {container_data['containerId']}")
-                container = Container(
-                    container_id=container_data["containerId"],
-                    zone=container_data["zone"],
-                    dimensions=Dimensions(
-                        width=container_data["width"],
-                        depth=container_data["depth"],
-                        height=container_data["height"]
-                    ),
-                    occupied_volume=0
-                )
-                containers.append(container)
+            items, containers = self.build_request(items_data, containers_data)
+            logger.info(f"Starting placement of {len(items)} items in {len(containers)} containers")
             
             # Get bin packing solution
-            print("Calling bin packer algorithm...")
-            packing_result = BinPacker.place_items(items, containers)
-            print(f"Bin packing completed in {time.time() - start_time:.2f} seconds")
+            packing_result = await self.run_packing(
+                BinPacker.place_items, items, containers, **(packing_options or {})
+            )
+            logger.debug("Bin packing completed in %.2f seconds", time.time() - start_time)
             
             # Save results to database if successful
             if packing_result["success"]:
-
-                print(f"Saving {len(packing_result['placements'])} placements to database")
-
-                #update containers in database
-                for container in containers:
-                    self.containers_collection.update_one(
-                        {"container_id": container.container_id},
-                        {"$set": container.dict()},
-                        upsert=True
-                    )
-                
-                # Update items in database
-                for placement in packing_result["placements"]:
-                    item_id = placement["itemId"]
-                    container_id = placement["containerId"]
-                    position = placement["position"]
-                    
-                    # Update item with container and position
-                    self.db.items.update_one(
-                        {"item_id": item_id},
-                        {"$set": {
-                            "container_id": container_id,
-                            "position": {
-                                "start_coordinates": position["startCoordinates"],
-                                "end_coordinates": position["endCoordinates"]
-                            }
-                        }}
-                    )
-                    
-                    # Calculate volume for this item
-                    width = position["endCoordinates"]["width"] - position["startCoordinates"]["width"]
-                    depth = position["endCoordinates"]["depth"] - position["startCoordinates"]["depth"]
-                    height = position["endCoordinates"]["height"] - position["startCoordinates"]["height"]
-                    volume = width * depth * height
-                    
-                    # Update container occupied volume
-                    self.containers_collection.update_one(
-                        {"container_id": container_id},
-                        {"$inc": {"occupied_volume": volume}}
-                    )
+                await self.repository.run(self.persist, items, containers, packing_result)
                 
             logger.info(f"Placement completed in {time.time() - start_time:.2f} seconds")
             
             return packing_result
         
+        except ValueError as e:
+            # Malformed columnar tables and invalid packing options
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.error(f"Error in place_items: {str(e)}")
-            print(f"ERROR in placement: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
     
+    async def place_items_incremental(self, items_data: List[Dict], packing_options: Optional[Dict] = None) -> Dict:
+        
+        #Place new items around the items already stowed, using the live container grids
+        #Only the new placements are written (item positions and an occupied volume
+        #increment per container); items that already have a position are skipped
+        
+        start_time = time.time()
+        logger.info(f"Starting incremental placement of {len(items_data)} items")
+        
+        try:
+            items, _ = self.build_models(items_data, [])
+            
+            # Items already stowed keep their place
+            stowed = await self.items_collection.find(
+                {"item_id": {"$in": [item.item_id for item in items]}, "position": {"$ne": None}},
+                {"item_id": 1}
+            )
+            stowed_ids = {doc["item_id"] for doc in stowed}
+            new_items = [item for item in items if item.item_id not in stowed_ids]
+            
+            container_docs = await self.containers_collection.find({})
+            packing_result = await self.run_packing(
+                self._pack_incremental, new_items, container_docs, packing_options or {}
+            )
+            packing_result["skippedItems"] = sorted(stowed_ids)
+            
+            logger.info(f"Incremental placement completed in {time.time() - start_time:.2f} seconds")
+            return packing_result
+        
+        except ValueError as e:
+            # Invalid items and packing options
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error in place_items_incremental: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    def _pack_incremental(self, items: List[Item], container_docs: List[Dict], packing_options: Dict) -> Dict:
+        
+        #Pack items into the cached grids and persist the delta (blocking; run off the event loop)
+        #The cache lock is held throughout so concurrent runs cannot claim the same space
+        
+        grid_cache = self.grid_cache or GridCache(self.repository.db)
+        with grid_cache.lock:
+            spatial_grids = grid_cache.grids_for(container_docs, [item.dimensions for item in items])
+            containers = [grid.container for grid in spatial_grids.values()]
+            volumes_before = {c.container_id: c.occupied_volume for c in containers}
+            
+            packing_result = BinPacker.place_items(items, containers, spatial_grids=spatial_grids,
+                                                   **packing_options)
+            touched = {placement["containerId"] for placement in packing_result["placements"]}
+            
+            if not packing_result["success"]:
+                # Nothing is saved; forget the grids that took part of the plan
+                grid_cache.invalidate(touched)
+                return packing_result
+            
+            try:
+                items_by_id = {item.item_id: item for item in items}
+                placed_items = []
+                for placement in packing_result["placements"]:
+                    placed_item = items_by_id[placement["itemId"]].copy()
+                    placed_item.container_id = placement["containerId"]
+                    placed_item.position = position_from_doc({
+                        "start_coordinates": placement["position"]["startCoordinates"],
+                        "end_coordinates": placement["position"]["endCoordinates"]
+                    })
+                    placed_items.append(placed_item)
+                
+                persistence_start = time.time()
+                
+                # Only the placement is written over an existing item, as in persist, so its
+                # usage count and waste flags are kept; items not stored yet are inserted whole
+                item_operations = [
+                    UpdateOne(
+                        {"item_id": item.item_id},
+                        {
+                            "$set": {"container_id": item.container_id, "position": item.position.dict()},
+                            "$setOnInsert": item.dict(exclude={"container_id", "position"})
+                        },
+                        upsert=True
+                    )
+                    for item in placed_items
+                ]
+                
+                # Containers only receive the volume added by this run
+                container_operations = [
+                    UpdateOne(
+                        {"container_id": container.container_id},
+                        {"$inc": {"occupied_volume": container.occupied_volume - volumes_before[container.container_id]}}
+                    )
+                    for container in containers
+                    if container.container_id in touched
+                ]
+                
+                batches = self.bulk_writer.write(self.items_collection.sync, item_operations)
+                batches += self.bulk_writer.write(self.containers_collection.sync, container_operations)
+                packing_result["persistence"] = {
+                    "batches": batches,
+                    "seconds": round(time.time() - persistence_start, 4)
+                }
+            except Exception:
+                # The grids already hold the new items; reload them from the database
+                grid_cache.invalidate(touched)
+                raise
+        
+        return packing_result
+    
+    def persist(self, items: List[Union[Item, ItemRecord]], containers: List[Container], packing_result: Dict) -> None:
+        
+        #Save a successful packing result: containers, item positions and the cached grids
+        #Blocking; runs on the repository threads (or a placement job's listener thread)
+        
+        logger.info(f"Saving {len(packing_result['placements'])} placements to database")
+        persistence_start = time.time()
+        
+        # Containers are written whole; their occupied volume already includes
+        # every item placed in this run
+        container_operations = [
+            UpdateOne(
+                {"container_id": container.container_id},
+                {"$set": container.dict()},
+                upsert=True
+            )
+            for container in containers
+        ]
+        
+        # Update items with container and position
+        item_operations = [
+            UpdateOne(
+                {"item_id": placement["itemId"]},
+                {"$set": {
+                    "container_id": placement["containerId"],
+                    "position": {
+                        "start_coordinates": placement["position"]["startCoordinates"],
+                        "end_coordinates": placement["position"]["endCoordinates"]
+                    }
+                }}
+            )
+            for placement in packing_result["placements"]
+        ]
+        
+        # Unordered bulk writes, batch_size operations per round trip
+        batches = self.bulk_writer.write(self.containers_collection.sync, container_operations)
+        batches += self.bulk_writer.write(self.items_collection.sync, item_operations)
+        packing_result["persistence"] = {
+            "batches": batches,
+            "seconds": round(time.time() - persistence_start, 4)
+        }
+        
+        # Mirror the committed placements in the cached grids
+        if self.grid_cache:
+            self._mirror_placements(items, containers, packing_result["placements"])
+    
+    def _mirror_placements(self, items: List[Union[Item, ItemRecord]], containers: List[Container],
+                           placements: List[Dict]) -> None:
+        #Apply a persisted packing plan to the cached grids (blocking; run off the event loop)
+        for container in containers:
+            self.grid_cache.sync_container(container)
+        items_by_id = {item.item_id: item for item in items}
+        
+        # Items from columnar requests have no model to put in a grid: the grids they
+        # leave or enter reload from the database on next use instead
+        unmodelled = [placement for placement in placements
+                      if isinstance(items_by_id[placement["itemId"]], ItemRecord)]
+        if unmodelled:
+            self.grid_cache.invalidate_items(placement["itemId"] for placement in unmodelled)
+            self.grid_cache.invalidate(placement["containerId"] for placement in unmodelled)
+            placements = [placement for placement in placements
+                          if not isinstance(items_by_id[placement["itemId"]], ItemRecord)]
+        
+        for placement in placements:
+            position = placement["position"]
+            self.grid_cache.apply_placement(
+                items_by_id[placement["itemId"]],
+                placement["containerId"],
+                position_from_doc({
+                    "start_coordinates": position["startCoordinates"],
+                    "end_coordinates": position["endCoordinates"]
+                })
+            )
+    
     async def place_item(self, item_id: str, user_id: str, timestamp: str, 
                          container_id: str, position: Dict) -> Dict:
 
@@ -199,19 +397,19 @@ class PlacementService:
 
 
         #Get the item from the database
-        item_doc = self.items_collection.find_one({"item_id": item_id})
+        item_doc = await self.items_collection.find_one({"item_id": item_id})
         if not item_doc:
             return {"success": False, "message": "Item not found"}
         
         #Get the container from the database
-        container_doc = self.containers_collection.find_one({"container_id": container_id})
+        container_doc = await self.containers_collection.find_one({"container_id": container_id})
         if not container_doc:
             return {"success": False, "message": "Container not found"}
         
         #update item position
         old_container_id = item_doc.get("container_id")
         
-        self.items_collection.update_one(
+        await self.items_collection.update_one(
             {"item_id": item_id},
             {"$set": {
                 "container_id": container_id,
@@ -230,8 +428,21 @@ class PlacementService:
             }}
         )
         
+        # Keep the cached grids in step with the new position
+        if self.grid_cache:
+            await self.repository.run(
+                self.grid_cache.apply_placement,
+                item_from_doc(item_doc),
+                container_id,
+                position_from_doc({
+                    "start_coordinates": position["startCoordinates"],
+                    "end_coordinates": position["endCoordinates"]
+                }),
+                old_container_id
+            )
+        
         # Log the placement action
-        self.logs_collection.insert_one({
+        await self.logs_collection.insert_one({
             "timestamp": datetime.fromisoformat(timestamp).isoformat(),
             "user_id": user_id,
             "action_type": "placement",
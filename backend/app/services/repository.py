@@ -0,0 +1,96 @@
+from typing import AsyncIterator, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Threads available for blocking database calls
+DEFAULT_DB_THREADS = 16
+
+# Documents fetched per thread pool round trip when iterating a cursor
+DEFAULT_STREAM_BATCH = 500
+
+
+class AsyncCollection:
+    
+    #Awaitable facade over a pymongo collection.
+    #Every call runs on the repository's thread pool, so a slow query only occupies a
+    #worker thread instead of the event loop. Cursors are drained inside the worker.
+    
+    
+    def __init__(self, collection, executor: ThreadPoolExecutor):
+        self.sync = collection  # The underlying pymongo collection, for code already off the loop
+        self._executor = executor
+    
+    @property
+    def name(self) -> str:
+        return self.sync.name
+    
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+    
+    async def find(self, filter: Optional[Dict] = None, *args, **kwargs) -> List[Dict]:
+        return await self._run(lambda: list(self.sync.find(filter or {}, *args, **kwargs)))
+    
+    async def iterate(self, filter: Optional[Dict] = None, *args, batch_size: int = DEFAULT_STREAM_BATCH,
+                      **kwargs) -> AsyncIterator[List[Dict]]:
+        #Documents matching filter in batches of at most batch_size, fetched one batch at a
+        #time on the thread pool; only the current batch is held in memory.
+        #The cursor is closed when the caller stops iterating (or disconnects)
+        cursor = await self._run(self.sync.find, filter or {}, *args, batch_size=batch_size, **kwargs)
+        try:
+            while True:
+                batch = await self._run(lambda: list(itertools.islice(cursor, batch_size)))
+                if not batch:
+                    return
+                yield batch
+        finally:
+            await self._run(cursor.close)
+    
+    async def find_one(self, filter: Optional[Dict] = None, *args, **kwargs) -> Optional[Dict]:
+        return await self._run(self.sync.find_one, filter or {}, *args, **kwargs)
+    
+    async def count_documents(self, filter: Dict, **kwargs) -> int:
+        return await self._run(self.sync.count_documents, filter, **kwargs)
+    
+    async def aggregate(self, pipeline: List[Dict], **kwargs) -> List[Dict]:
+        return await self._run(lambda: list(self.sync.aggregate(pipeline, **kwargs)))
+    
+    async def insert_one(self, document: Dict, **kwargs):
+        return await self._run(self.sync.insert_one, document, **kwargs)
+    
+    async def update_one(self, filter: Dict, update: Dict, **kwargs):
+        return await self._run(self.sync.update_one, filter, update, **kwargs)
+    
+    async def bulk_write(self, operations: List, **kwargs):
+        return await self._run(self.sync.bulk_write, operations, **kwargs)
+
+
+class Repository:
+    
+    #Non-blocking data access for the async endpoints and services.
+    #Wraps the synchronous pymongo database: collections are exposed as AsyncCollection
+    #and run() offloads any other blocking I/O (bulk writers, grid cache loads, CSV
+    #parsing) to the same bounded thread pool. Packing runs use the placement service's
+    #own threads.
+    
+    
+    def __init__(self, db, max_workers: int = DEFAULT_DB_THREADS):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self.items = AsyncCollection(db.items, self._executor)
+        self.containers = AsyncCollection(db.containers, self._executor)
+        self.logs = AsyncCollection(db.logs, self._executor)
+        logger.info(f"Repository using {max_workers} database threads")
+    
+    async def run(self, function, *args, **kwargs):
+        #Run a blocking callable on the repository's thread pool and await its result
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+    
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,118 @@
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime
+import json
+import logging
+import numpy as np
+from bson import ObjectId
+from fastapi.responses import Response, StreamingResponse
+from .repository import AsyncCollection, DEFAULT_STREAM_BATCH
+
+logger = logging.getLogger(__name__)
+
+# Serialization for large responses (listings, packing results).
+# orjson is used when installed (several times faster than the standard library encoder
+# and without its intermediate str); otherwise json.dumps with the same conversions.
+# Either way ObjectIds become strings, datetimes ISO 8601 strings and numpy values
+# plain numbers, so documents are encoded straight off the cursor without a copy.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+# Listing formats: a JSON array sent in chunks (same body as before), or one document per line
+STREAM_FORMATS = {"json": JSON_MEDIA_TYPE, "ndjson": NDJSON_MEDIA_TYPE}
+
+
+def _default(value):
+    #Conversions for the types Mongo documents and packing results contain
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def encode(value) -> bytes:
+        #JSON bytes of a value (orjson)
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def encode(value) -> bytes:
+        #JSON bytes of a value (standard library fallback)
+        return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    
+    #JSONResponse rendered with encode(): skips FastAPI's jsonable_encoder pass over
+    #the content, which dominates the cost of returning large packing results
+    
+    
+    media_type = JSON_MEDIA_TYPE
+    
+    def render(self, content) -> bytes:
+        return encode(content)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    #Mongo projection for a comma-separated list of document fields ("item_id,name")
+    #None when no fields are given (whole documents). _id is only returned when listed
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names:
+        return None
+    projection = {name: 1 for name in names}
+    if "_id" not in projection:
+        projection["_id"] = 0
+    return projection
+
+
+def encode_batch(documents: List[Dict], format: str, first: bool) -> bytes:
+    #One chunk of a streamed listing: NDJSON lines, or array elements with their separators
+    if format == "ndjson":
+        return b"".join(encode(document) + b"\n" for document in documents)
+    chunk = b",".join(encode(document) for document in documents)
+    return chunk if first else b"," + chunk
+
+
+async def stream_batches(batches: AsyncIterator[List[Dict]], format: str) -> AsyncIterator[bytes]:
+    #Encode document batches as they arrive; a JSON array is opened and closed around them
+    if format == "json":
+        yield b"["
+    first = True
+    try:
+        async for documents in batches:
+            yield encode_batch(documents, format, first)
+            first = False
+    except Exception as e:
+        # The status line is already sent: the client sees a truncated body
+        logger.error(f"Streaming response failed: {str(e)}")
+        raise
+    if format == "json":
+        yield b"]"
+
+
+def stream_documents(collection: AsyncCollection, filter: Optional[Dict] = None, fields: Optional[str] = None,
+                     format: str = "json", batch_size: int = DEFAULT_STREAM_BATCH) -> StreamingResponse:
+    
+    #Stream the documents of a collection matching filter, batch by batch off the cursor,
+    #so time to first byte and server memory do not grow with the collection size.
+    #fields is a comma-separated projection (see parse_fields); format is "json" (a
+    #chunked JSON array) or "ndjson" (one document per line)
+    #Raises ValueError for an unknown format
+    
+    if format not in STREAM_FORMATS:
+        raise ValueError(f"Unknown format '{format}' (expected one of {', '.join(STREAM_FORMATS)})")
+    batches = collection.iterate(filter, parse_fields(fields), batch_size=batch_size)
+    return StreamingResponse(stream_batches(batches, format), media_type=STREAM_FORMATS[format])
+
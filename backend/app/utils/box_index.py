@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+Box = Tuple[int, int, int, int, int, int]  # (x1, y1, z1, x2, y2, z2), end-exclusive
+Bucket = Tuple[int, int, int]
+
+# Default edge of a bucket, in cells
+DEFAULT_BUCKET_SIZE = 32
+
+
+class BoxIndex:
+
+    #Geometric occupancy index storing one axis-aligned box per item.
+    #Space is divided into cubic buckets of bucket_size cells on all three axes and every
+    #box is registered in each bucket it overlaps. Inserting or removing a box costs one
+    #set operation per bucket it covers; an overlap query visits the buckets the query box
+    #covers and tests only the boxes registered there, so its cost depends on the boxes
+    #near the query, not on how many boxes share a coordinate on one axis. Memory scales
+    #with the item count (times the buckets per item), not with the volume.
+
+
+    def __init__(self, bucket_size: int = DEFAULT_BUCKET_SIZE):
+        if bucket_size < 1:
+            raise ValueError("bucket_size must be at least 1")
+        self.bucket_size = bucket_size
+        self.boxes: Dict[str, Box] = {}  # Map of item_id to box
+        self._buckets: Dict[Bucket, Set[str]] = {}  # Map of bucket to ids of the boxes overlapping it
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.boxes
+
+    def _bucket_span(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int) -> Tuple[range, range, range]:
+        #Bucket coordinates covered by a (non-empty) box along each axis
+        size = self.bucket_size
+        return (range(x1 // size, (x2 - 1) // size + 1),
+                range(y1 // size, (y2 - 1) // size + 1),
+                range(z1 // size, (z2 - 1) // size + 1))
+
+    def insert(self, item_id: str, box: Box) -> None:
+        #Add (or move) the box of an item
+        if item_id in self.boxes:
+            self.remove(item_id)
+
+        self.boxes[item_id] = box
+        xs, ys, zs = self._bucket_span(*box)
+        for bx in xs:
+            for by in ys:
+                for bz in zs:
+                    self._buckets.setdefault((bx, by, bz), set()).add(item_id)
+
+    def remove(self, item_id: str) -> Optional[Box]:
+        #Remove the box of an item, returning it (None if unknown)
+        box = self.boxes.pop(item_id, None)
+        if box is None:
+            return None
+
+        xs, ys, zs = self._bucket_span(*box)
+        for bx in xs:
+            for by in ys:
+                for bz in zs:
+                    ids = self._buckets[(bx, by, bz)]
+                    ids.discard(item_id)
+                    if not ids:
+                        del self._buckets[(bx, by, bz)]
+        return box
+
+    def query(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int) -> List[str]:
+        #Return the ids of all items whose box intersects the query box
+        if x1 >= x2 or y1 >= y2 or z1 >= z2:
+            return []
+        xs, ys, zs = self._bucket_span(x1, y1, z1, x2, y2, z2)
+        buckets, boxes = self._buckets, self.boxes
+        if len(xs) * len(ys) * len(zs) > len(buckets):
+            # A query spanning most of the container: walk the occupied buckets instead
+            candidates = [ids for (bx, by, bz), ids in buckets.items() if bx in xs and by in ys and bz in zs]
+        else:
+            candidates = [buckets[key] for key in ((bx, by, bz) for bx in xs for by in ys for bz in zs)
+                          if key in buckets]
+        if len(candidates) == 1:
+            ids = candidates[0]
+        else:
+            ids = set().union(*candidates)
+        hits = []
+        for item_id in ids:
+            ax1, ay1, az1, ax2, ay2, az2 = boxes[item_id]
+            if ax1 < x2 and ax2 > x1 and ay1 < y2 and ay2 > y1 and az1 < z2 and az2 > z1:
+                hits.append(item_id)
+        return hits
+
+    def overlaps(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int) -> bool:
+        #Check whether any stored box intersects the query box
+        #(the search hot path, so the bucket walk stops at the first hit)
+        if x1 >= x2 or y1 >= y2 or z1 >= z2:
+            return False
+        size = self.bucket_size
+        bx1, by1, bz1 = x1 // size, y1 // size, z1 // size
+        bx2, by2, bz2 = (x2 - 1) // size + 1, (y2 - 1) // size + 1, (z2 - 1) // size + 1
+        buckets, boxes = self._buckets, self.boxes
+        if (bx2 - bx1) * (by2 - by1) * (bz2 - bz1) > len(buckets):
+            return bool(self.query(x1, y1, z1, x2, y2, z2))
+        for bx in range(bx1, bx2):
+            for by in range(by1, by2):
+                for bz in range(bz1, bz2):
+                    ids = buckets.get((bx, by, bz))
+                    if not ids:
+                        continue
+                    for item_id in ids:
+                        ax1, ay1, az1, ax2, ay2, az2 = boxes[item_id]
+                        if ax1 < x2 and ax2 > x1 and ay1 < y2 and ay2 > y1 and az1 < z2 and az2 > z1:
+                            return True
+        return False
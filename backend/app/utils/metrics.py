@@ -0,0 +1,182 @@
+from typing import Dict, Iterable, List, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+# Default histogram buckets for latencies (seconds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Histogram buckets for counts (e.g. positions checked per search)
+COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    
+    #Base of the in-process metrics: a name, help text and one value per label combination
+    
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}  # Map of label values tuple to the metric's state
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, state in items:
+            lines.extend(self._render_state(key, state))
+        return lines
+    
+    def _render_state(self, key, state) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    
+    #Monotonically increasing total
+    
+    
+    kind = "counter"
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+    
+    def _render_state(self, key, state) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(state)}"]
+
+
+class Histogram(_Metric):
+    
+    #Distribution of observed values over fixed buckets, with their sum and count
+    
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last slot is +Inf), then sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+    
+    @contextmanager
+    def time(self, **labels):
+        #Observe the wall time of a with-block
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[:-1]) if state else 0
+    
+    def total(self, **labels) -> float:
+        #Sum of the observed values
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0.0
+    
+    def _render_state(self, key, state) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), state[:-1]):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            bucket_labels = _format_labels(self.labels, key, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(state[-1])}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    
+    #Collection of metrics rendered together in the Prometheus text exposition format
+    
+    
+    def __init__(self):
+        self._metrics = {}  # Map of name to metric, in registration order
+    
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served by /metrics. Metrics are per process: work done in
+# worker processes (zone-parallel packing, container workers, placement jobs) is not
+# included.
+REGISTRY = Registry()
+
+GRID_BUILD_SECONDS = REGISTRY.register(Histogram(
+    "stowage_grid_build_seconds", "Time to create a container's spatial grid", ["representation"]
+))
+GRID_SEARCH_SECONDS = REGISTRY.register(Histogram(
+    "stowage_grid_search_seconds", "Time of one SpatialGrid.find_best_fit call", ["mode"]
+))
+POSITIONS_CHECKED = REGISTRY.register(Histogram(
+    "stowage_positions_checked", "Candidate positions evaluated per find_best_fit call", ["mode"],
+    buckets=COUNT_BUCKETS
+))
+GRID_SEARCH_SKIPS = REGISTRY.register(Counter(
+    "stowage_grid_search_skips_total", "find_best_fit calls answered from the failed-shape memo", ["mode"]
+))
+CANDIDATE_CHECKS = REGISTRY.register(Counter(
+    "stowage_candidate_checks_total", "Candidate containers considered for an item", ["result"]
+))
+ITEMS_PACKED = REGISTRY.register(Counter(
+    "stowage_items_packed_total", "Items handled by the bin packer", ["outcome"]
+))
+PACKING_SECONDS = REGISTRY.register(Histogram(
+    "stowage_packing_seconds", "Time of one BinPacker.place_items run"
+))
+DB_WRITE_SECONDS = REGISTRY.register(Histogram(
+    "stowage_db_write_seconds", "Time of one bulk_write batch", ["collection"]
+))
+DB_WRITE_OPERATIONS = REGISTRY.register(Counter(
+    "stowage_db_write_operations_total", "Write operations sent in bulk_write batches", ["collection"]
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "stowage_http_request_seconds", "API request latency", ["method", "route", "status"]
+))
@@ -0,0 +1,80 @@
+from typing import Dict, Optional, Tuple
+from ..models.container import Dimensions
+from ..models.item import Item, Position
+
+# Slim records used inside the packer hot loop (BinPacker, SpatialGrid, the worker
+# pools). They carry only what the search needs, as plain tuples and floats, and are
+# converted to and from the pydantic models at the edges of a packing run.
+
+
+class PositionRecord:
+
+    #Position of an item in real units: start and end corners as (width, depth, height)
+
+
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: Tuple[float, float, float], end: Tuple[float, float, float]):
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PositionRecord) and self.start == other.start and self.end == other.end
+
+    def __repr__(self) -> str:
+        return f"PositionRecord(start={self.start}, end={self.end})"
+
+    @classmethod
+    def from_position(cls, position: Position) -> "PositionRecord":
+        start, end = position.start_coordinates, position.end_coordinates
+        return cls((start.width, start.depth, start.height), (end.width, end.depth, end.height))
+
+    def to_position(self) -> Position:
+        return Position(
+            start_coordinates=Dimensions(width=self.start[0], depth=self.start[1], height=self.start[2]),
+            end_coordinates=Dimensions(width=self.end[0], depth=self.end[1], height=self.end[2])
+        )
+
+    def to_dict(self) -> Dict:
+        #Position in the camelCase layout of placement results
+        return {
+            "startCoordinates": {"width": self.start[0], "depth": self.start[1], "height": self.start[2]},
+            "endCoordinates": {"width": self.end[0], "depth": self.end[1], "height": self.end[2]}
+        }
+
+
+class ItemRecord:
+
+    #Packing view of an Item: id, dimensions as a (width, depth, height) tuple, volume
+    #computed once, priority and preferred zone, plus the source model for converting
+    #results back (None for items that never had one, e.g. from a columnar request)
+
+
+    __slots__ = ("item_id", "dimensions", "volume", "priority", "zone", "item")
+
+    def __init__(self, item_id: str, dimensions: Tuple[float, float, float], priority: int,
+                 zone: str, item: Optional[Item] = None):
+        self.item_id = item_id
+        self.dimensions = dimensions
+        self.volume = dimensions[0] * dimensions[1] * dimensions[2]
+        self.priority = priority
+        self.zone = zone
+        self.item = item
+
+    @classmethod
+    def from_item(cls, item: Item) -> "ItemRecord":
+        dimensions = item.dimensions
+        return cls(item.item_id, (dimensions.width, dimensions.depth, dimensions.height),
+                   item.priority, item.preferred_zone, item)
+
+
+def as_position_record(position) -> PositionRecord:
+    #Accept either a Position model or a PositionRecord
+    return position if isinstance(position, PositionRecord) else PositionRecord.from_position(position)
+
+
+def as_dimensions_tuple(dimensions) -> Tuple[float, float, float]:
+    #Accept either a Dimensions model or a (width, depth, height) tuple
+    if isinstance(dimensions, tuple):
+        return dimensions
+    return (dimensions.width, dimensions.depth, dimensions.height)
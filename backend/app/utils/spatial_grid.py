@@ -1,38 +1,275 @@
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, Iterable, List, Tuple, Optional, Set
+from functools import lru_cache
+import math
 import time
+import logging
+import numpy as np
 from ..models.container import Container, Dimensions
 from ..models.item import Item, Position
+from .box_index import BoxIndex, DEFAULT_BUCKET_SIZE
+from .records import ItemRecord, PositionRecord, as_dimensions_tuple, as_position_record
+from .metrics import GRID_BUILD_SECONDS, GRID_SEARCH_SECONDS, GRID_SEARCH_SKIPS, POSITIONS_CHECKED
 
+logger = logging.getLogger(__name__)
+
+# Candidate generators accepted by SpatialGrid.find_best_fit
+SEARCH_MODES = ("scan", "extreme_points")
+
+# Containers with more cells than this use the sparse BoxIndex representation
+DENSE_CELL_LIMIT = 1000000
+
+# BoxIndex buckets along the longest side of a sparse grid (buckets are never smaller
+# than the BoxIndex default, so item-sized queries touch only a few of them)
+SPARSE_BUCKETS_PER_SIDE = 16
+
+# Tolerance when snapping real coordinates onto the cell lattice
+_SNAP_EPSILON = 1e-6
+
+# Unit (in cm) of the cell sizes choose_resolution picks and of position divisors
+RESOLUTION_PRECISION = 0.01
+
+# Axis permutations for the six orientations of an item (width, depth, height)
+_ORIENTATIONS = ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))
+
+
+def position_divisor(positions: Iterable, precision: float = RESOLUTION_PRECISION, divisor: int = 0) -> int:
+    #GCD, in units of precision, of divisor and the corners of the positions
+    #(Position or PositionRecord); 0 when there are none
+    for position in positions:
+        record = as_position_record(position)
+        for value in record.start + record.end:
+            divisor = math.gcd(divisor, round(value / precision))
+    return divisor
+
+def choose_resolution(container: Container, item_dimensions: Iterable,
+                      precision: float = RESOLUTION_PRECISION, positions: Iterable = (),
+                      stored_divisor: int = 0) -> float:
+    
+    #Pick the cell size for a container's grid: the largest multiple of `precision`
+    #that divides the container and every item dimension (their GCD). Manifests in
+    #multiples of 5 or 10 cm then get 5 or 10 cm cells instead of 1 cm ones.
+    #If the exact lattice is finer than 1 unit and too large for a dense grid, the
+    #1 unit lattice is used instead (items are then rounded up to whole cells).
+    #item_dimensions are Dimensions or (width, depth, height) tuples.
+    #positions are those of items already in the container (Position or PositionRecord):
+    #their corners are part of the GCD, and the 1 unit fallback is only taken when
+    #they all lie on it, so every stored item can be replayed where it was placed.
+    #stored_divisor is the position_divisor of positions not passed in (e.g. a grid's
+    #running SpatialGrid.position_divisor), so they need not be walked again.
+    
+    container_values = (container.dimensions.width, container.dimensions.depth,
+                        container.dimensions.height)
+    divisor = 0
+    for value in container_values:
+        divisor = math.gcd(divisor, round(value / precision))
+    for dims in item_dimensions:
+        for value in as_dimensions_tuple(dims):
+            divisor = math.gcd(divisor, round(value / precision))
+            if divisor == 1:
+                break
+    corners = position_divisor(positions, precision, stored_divisor)
+    divisor = math.gcd(divisor, corners)
+    
+    if divisor == 0:
+        return 1.0
+    resolution = divisor * precision
+    
+    cells = 1
+    for value in container_values:
+        cells *= max(1, int(value / resolution + _SNAP_EPSILON))
+    if resolution < 1.0 and cells > DENSE_CELL_LIMIT and corners % round(1.0 / precision) == 0:
+        return 1.0
+    return resolution
+
+@lru_cache(maxsize=4096)
+def _orientations_at(resolution: float, real: Tuple[float, float, float]) -> List[Tuple[Tuple[int, int, int], Tuple[float, float, float]]]:
+    #Distinct orientations of an item at a cell size, shared by every grid with that size
+    cells = tuple(max(1, int(math.ceil(value / resolution - _SNAP_EPSILON))) for value in real)
+    distinct = {}
+    for a, b, c in _ORIENTATIONS:
+        distinct.setdefault((cells[a], cells[b], cells[c]), (real[a], real[b], real[c]))
+    return list(distinct.items())
+
+def _longest_empty_runs(empty: np.ndarray, axis: int) -> np.ndarray:
+    #Length of the longest run of True along `axis` for every line of a boolean array
+    counts = np.cumsum(empty, axis=axis, dtype=np.int32)
+    resets = np.maximum.accumulate(np.where(empty, 0, counts), axis=axis)
+    return (counts - resets).max(axis=axis)
 
 class SpatialGrid:
 
     #a 3D grid representation of a container for efficient item placement and retrieval.
-    #The grid is a 3D array where each cell represents a 1x1x1 volume.
+    #The grid is a 3D array where each cell represents a cube of `resolution` units per side
+    #(see choose_resolution). Cell-level methods take cell coordinates, while positions
+    #and dimensions passed in and returned are in real units.
     #NOTE: Each cell can be either empty or occupied by an item.
+    #Dense grids are a NumPy integer array where 0 marks an empty cell and any other
+    #value is the slot of the occupying item (see item_slots / slot_items).
+    #Dense grids also keep a summed-volume table (3D prefix sum) of occupancy so any
+    #box can be tested for emptiness with an 8-corner lookup.
+    #A set of extreme points (corners of placed items, projected back onto the walls
+    #and item faces) is maintained as the candidate origins for the extreme-point search.
+    #Very large containers use a sparse BoxIndex holding one box per item instead of cells.
+    #Dense grids also track the longest empty run of every line of cells along each axis,
+    #counted by length in run_counts: a w x d x h box needs d*h lines along x with a run
+    #of at least w (and likewise along y and z), which may_fit checks before a search.
+    #free_extent is the longest of those runs per axis, in real units.
+    #Failed searches are memoized per mode by sorted cell dimensions (failed_shapes;
+    #unsorted for the capped sparse scan, whose result depends on the given order).
+    #Placing items only removes free space, so a shape that did not fit still does not,
+    #nor does any shape at least as large on every sorted side; remove_item clears the
+    #memo. Extreme points remember the generation (placement count) that added them, so
+    #after a failure only the points added since then are searched.
+    #Internally positions are PositionRecords and item dimensions (width, depth, height)
+    #tuples; find_best_fit and place_item also take and return the pydantic models.
 
 
-    def __init__(self, container: Container):
+    def __init__(self, container: Container, resolution: float = 1.0):
         #Initialize the grid based on container dimensions
+        start_time = time.perf_counter()
         self.container = container
-        self.width = int(container.dimensions.width)
-        self.depth = int(container.dimensions.depth)
-        self.height = int(container.dimensions.height)
+        self.resolution = resolution
+        self.width = self._to_cells_floor(container.dimensions.width)
+        self.depth = self._to_cells_floor(container.dimensions.depth)
+        self.height = self._to_cells_floor(container.dimensions.height)
+        self.capacity = container.calculate_total_volume()
         
-        print(f"Creating grid of size {self.width}x{self.depth}x{self.height} for container {container.container_id}")
+        logger.debug("Creating grid of size %dx%dx%d (cell size %s) for container %s",
+                     self.width, self.depth, self.height, resolution, container.container_id)
         
         # Use sparse representation for large containers
-        if self.width * self.depth * self.height > 1000000:  # For very large containers
+        if self.width * self.depth * self.height > DENSE_CELL_LIMIT:  # For very large containers
             self.use_sparse = True
-            self.grid = {}  # Sparse representation
-            print(f"Using sparse grid representation for large container {container.container_id}")
+            longest = max(self.width, self.depth, self.height)
+            # Sparse representation: one box per item
+            self.grid = BoxIndex(bucket_size=max(DEFAULT_BUCKET_SIZE, math.ceil(longest / SPARSE_BUCKETS_PER_SIDE)))
+            logger.debug("Using sparse grid representation for large container %s", container.container_id)
         else:
             self.use_sparse = False
-            # Initialize an empty 3D grid
-            self.grid = [[[None for _ in range(self.height)] 
-                          for _ in range(self.depth)] 
-                         for _ in range(self.width)]
+            # Initialize an empty 3D occupancy array (0 = empty cell)
+            self.grid = np.zeros((self.width, self.depth, self.height), dtype=np.int32)
+            # occupancy_sums[i, j, k] = number of occupied cells in [0,i) x [0,j) x [0,k)
+            self.occupancy_sums = np.zeros((self.width + 1, self.depth + 1, self.height + 1),
+                                           dtype=np.int32)
+            # Longest empty run of every line along x (per y, z), y (per x, z) and z (per x, y)
+            self.free_runs = (
+                np.full((self.depth, self.height), self.width, dtype=np.int32),
+                np.full((self.width, self.height), self.depth, dtype=np.int32),
+                np.full((self.width, self.depth), self.height, dtype=np.int32)
+            )
+            # run_histograms[axis][r] = lines along axis whose longest run is r cells;
+            # run_counts[axis][r] = lines whose longest run is at least r cells
+            self.run_histograms = []
+            for runs, length in zip(self.free_runs, (self.width, self.depth, self.height)):
+                histogram = np.zeros(length + 1, dtype=np.int64)
+                histogram[length] = runs.size
+                self.run_histograms.append(histogram)
+            self.run_counts = [np.cumsum(h[::-1])[::-1] for h in self.run_histograms]
             
-        self.items = {}  # Map of item_id to Item
+        self.items = {}  # Map of item_id to Item (None for records placed without a model)
+        self.positions = {}  # Map of item_id to PositionRecord
+        self.volumes = {}  # Map of item_id to item volume, so removal needs no model
+        # position_divisor of every position placed so far (not reduced on removal, which
+        # only makes it finer than needed), so a cell size change needs no walk over them
+        self.position_divisor = 0
+        
+        # Side table between item ids and the integer slots stored in the dense grid
+        self.item_slots = {}  # Map of item_id to slot
+        self.slot_items = {}  # Map of slot to item_id
+        self._next_slot = 1
+        
+        # Candidate origins (cell coordinates) for find_best_fit_extreme_points, mapped
+        # to the generation that added them
+        self.generation = 0  # Number of placements since the last removal
+        self.extreme_points = {(0, 0, 0): 0}
+        
+        # Map of mode to {sorted cell dimensions: generation of the last failed search}
+        self.failed_shapes = {mode: {} for mode in SEARCH_MODES}
+        
+        # Sparse grids do not track free runs; their extent stays the whole container
+        self.free_extent = (self.width * resolution, self.depth * resolution, self.height * resolution)
+        
+        GRID_BUILD_SECONDS.observe(time.perf_counter() - start_time,
+                                   representation="sparse" if self.use_sparse else "dense")
+        
+    def memory_bytes(self) -> int:
+        #Approximate memory held by the occupancy representation
+        if self.use_sparse:
+            return len(self.grid) * 256  # One box plus index entries per item
+        return (self.grid.nbytes + self.occupancy_sums.nbytes
+                + sum(runs.nbytes for runs in self.free_runs))
+    
+    def _assign_slot(self, item_id: str) -> int:
+        #Return the slot for an item, allocating a new one if needed
+        slot = self.item_slots.get(item_id)
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot += 1
+            self.item_slots[item_id] = slot
+            self.slot_items[slot] = item_id
+        return slot
+    
+    def _release_slot(self, item_id: str) -> None:
+        #Forget the slot of a removed item
+        slot = self.item_slots.pop(item_id, None)
+        if slot is not None:
+            del self.slot_items[slot]
+    
+    def _to_cells_floor(self, value: float) -> int:
+        #Number of whole cells that fit in a real length
+        return int(math.floor(value / self.resolution + _SNAP_EPSILON))
+    
+    def _to_cells_ceil(self, value: float) -> int:
+        #Number of cells needed to cover a real length
+        return int(math.ceil(value / self.resolution - _SNAP_EPSILON))
+    
+    def _cell_box(self, position: PositionRecord) -> Tuple[int, int, int, int, int, int]:
+        #Convert a position into the grid cell bounds (x1, y1, z1, x2, y2, z2) it covers
+        start, end = position.start, position.end
+        return (self._to_cells_floor(start[0]), self._to_cells_floor(start[1]), self._to_cells_floor(start[2]),
+                self._to_cells_ceil(end[0]), self._to_cells_ceil(end[1]), self._to_cells_ceil(end[2]))
+    
+    def _orientations(self, item_dimensions) -> List[Tuple[Tuple[int, int, int], Tuple[float, float, float]]]:
+        #Distinct orientations of an item (Dimensions or a (width, depth, height) tuple)
+        #as (cell dimensions, real dimensions) pairs
+        return _orientations_at(self.resolution, as_dimensions_tuple(item_dimensions))
+    
+    def _position(self, x: int, y: int, z: int, real_dims: Tuple[float, float, float]) -> PositionRecord:
+        #Build a position in real units from a cell origin and the oriented item dimensions
+        r = self.resolution
+        start = (round(x * r, 6), round(y * r, 6), round(z * r, 6))
+        return PositionRecord(start, (round(start[0] + real_dims[0], 6),
+                                      round(start[1] + real_dims[1], 6),
+                                      round(start[2] + real_dims[2], 6)))
+    
+    def _update_occupancy_sums(self, x1: int, y1: int, z1: int,
+                               x2: int, y2: int, z2: int, sign: int) -> None:
+        
+        #Incrementally add (sign=1) or subtract (sign=-1) a filled box from the
+        #summed-volume table. Entry (i, j, k) changes by the overlap of the box with
+        #[0,i) x [0,j) x [0,k), which is an outer product of three clipped ramps.
+        
+        dtype = self.occupancy_sums.dtype
+        overlap_x = np.minimum(np.arange(1, self.width - x1 + 1, dtype=dtype), x2 - x1)
+        overlap_y = np.minimum(np.arange(1, self.depth - y1 + 1, dtype=dtype), y2 - y1)
+        overlap_z = np.minimum(np.arange(1, self.height - z1 + 1, dtype=dtype), z2 - z1)
+        delta = overlap_x[:, None, None] * overlap_y[None, :, None] * overlap_z[None, None, :]
+        if sign > 0:
+            self.occupancy_sums[x1+1:, y1+1:, z1+1:] += delta
+        else:
+            self.occupancy_sums[x1+1:, y1+1:, z1+1:] -= delta
+    
+    def _rebuild_occupancy_sums(self) -> None:
+        #Recompute the summed-volume table from scratch (only needed after overlaps)
+        occupied = (self.grid != 0).astype(self.occupancy_sums.dtype)
+        self.occupancy_sums[1:, 1:, 1:] = occupied.cumsum(0).cumsum(1).cumsum(2)
+    
+    def count_occupied(self, x1: int, y1: int, z1: int,
+                       x2: int, y2: int, z2: int) -> int:
+        #Number of occupied cells in a region of a dense grid (8-corner lookup)
+        s = self.occupancy_sums
+        return int(s[x2, y2, z2] - s[x1, y2, z2] - s[x2, y1, z2] - s[x2, y2, z1]
+                   + s[x1, y1, z2] + s[x1, y2, z1] + s[x2, y1, z1] - s[x1, y1, z1])
         
     def is_valid_position(self, x: int, y: int, z: int) -> bool:
         #Check if the given coordinates are within bounds
@@ -46,10 +283,10 @@ class SpatialGrid:
             return False
             
         if self.use_sparse:
-            # In sparse representation, if position isn't in dict, it's empty
-            return (x, y, z) not in self.grid
+            # In sparse representation, a cell is empty if no item box covers it
+            return not self.grid.overlaps(x, y, z, x+1, y+1, z+1)
         else:
-            return self.grid[x][y][z] is None
+            return self.grid[x, y, z] == 0
     
     def is_region_empty(self, x1: int, y1: int, z1: int, 
                         x2: int, y2: int, z2: int) -> bool:
@@ -58,47 +295,26 @@ class SpatialGrid:
             not self.is_valid_position(x2-1, y2-1, z2-1)):
             return False
         
-        # For large regions, do quick volume check first
-        if (x2-x1) * (y2-y1) * (z2-z1) > 10000:
-            # Check corners first as they're likely to be occupied
-            corners = [
-                (x1, y1, z1), (x1, y1, z2-1), 
-                (x1, y2-1, z1), (x1, y2-1, z2-1),
-                (x2-1, y1, z1), (x2-1, y1, z2-1),
-                (x2-1, y2-1, z1), (x2-1, y2-1, z2-1)
-            ]
-            for x, y, z in corners:
-                if not self.is_position_empty(x, y, z):
-                    return False
-        
-        # Check entire region
-        if self.use_sparse:
-            # For sparse grid, check if any occupied positions are in this region
-            for pos in self.grid:
-                x, y, z = pos
-                if x1 <= x < x2 and y1 <= y < y2 and z1 <= z < z2:
-                    return False
-            return True
-        else:
-            # For dense grid, check all positions
-            for x in range(x1, x2):
-                for y in range(y1, y2):
-                    for z in range(z1, z2):
-                        if not self.is_position_empty(x, y, z):
-                            return False
-            return True
+        # Dense grid: constant-time lookup in the summed-volume table
+        if not self.use_sparse:
+            return self.count_occupied(x1, y1, z1, x2, y2, z2) == 0
+        
+        # Sparse grid: overlap query against the item boxes
+        return not self.grid.overlaps(x1, y1, z1, x2, y2, z2)
     
-    def place_item(self, item: Item, position: Position) -> bool:
+    def place_item(self, item: Item, position) -> bool:
     
-        #Place an item at the specified position
+        #Place an item at the specified position (a Position or PositionRecord)
         #Returns True if the item was successfully placed, False otherwise
     
-        x1 = int(position.start_coordinates.width)
-        y1 = int(position.start_coordinates.depth)
-        z1 = int(position.start_coordinates.height)
-        x2 = int(position.end_coordinates.width)
-        y2 = int(position.end_coordinates.depth)
-        z2 = int(position.end_coordinates.height)
+        return self._place(item.item_id, item, item.calculate_volume(), as_position_record(position))
+    
+    def place_record(self, record: ItemRecord, position: PositionRecord) -> bool:
+        #place_item for the packer's slim records: no model is copied or validated
+        return self._place(record.item_id, record.item, record.volume, position)
+    
+    def _place(self, item_id: str, item: Item, volume: float, position: PositionRecord) -> bool:
+        x1, y1, z1, x2, y2, z2 = self._cell_box(position)
         
         #Check if the region is empty
         if not self.is_region_empty(x1, y1, z1, x2, y2, z2):
@@ -106,21 +322,90 @@ class SpatialGrid:
         
         # Place the item
         if self.use_sparse:
-            for x in range(x1, x2):
-                for y in range(y1, y2):
-                    for z in range(z1, z2):
-                        self.grid[(x, y, z)] = item.item_id
+            self.grid.insert(item_id, (x1, y1, z1, x2, y2, z2))
         else:
-            for x in range(x1, x2):
-                for y in range(y1, y2):
-                    for z in range(z1, z2):
-                        self.grid[x][y][z] = item.item_id
+            self.grid[x1:x2, y1:y2, z1:z2] = self._assign_slot(item_id)
+            self._update_occupancy_sums(x1, y1, z1, x2, y2, z2, 1)
+            self._update_free_runs(x1, y1, z1, x2, y2, z2)
         
-        #Update the items dictionary
-        self.items[item.item_id] = item
+        #Update the items and positions dictionaries
+        self.items[item_id] = item
+        self.positions[item_id] = position
+        self.volumes[item_id] = volume
+        self.position_divisor = position_divisor((position,), divisor=self.position_divisor)
         
         #Update container's occupied volume
-        self.container.occupied_volume += item.calculate_volume()
+        self.container.occupied_volume += volume
+        
+        self.generation += 1
+        self._add_extreme_points(x1, y1, z1, x2, y2, z2)
+        
+        return True
+    
+    def find_block(self, position: PositionRecord, count: int) -> Tuple[int, int, int]:
+    
+        #Size of a layer-first block of copies of the item at position: as many copies as
+        #fit along width, then as many such rows along depth, then as many layers along
+        #height, growing only into empty cells and stopping once the block holds count items
+        #Returns the number of copies along each axis
+    
+        x1, y1, z1, x2, y2, z2 = self._cell_box(position)
+        w, d, h = x2 - x1, y2 - y1, z2 - z1
+        nx = ny = nz = 1
+        while nx < count and self.is_region_empty(x1 + nx*w, y1, z1, x1 + (nx+1)*w, y2, z2):
+            nx += 1
+        while nx * ny < count and self.is_region_empty(x1, y1 + ny*d, z1, x1 + nx*w, y1 + (ny+1)*d, z2):
+            ny += 1
+        while nx * ny * nz < count and self.is_region_empty(x1, y1, z1 + nz*h, x1 + nx*w, y1 + ny*d, z1 + (nz+1)*h):
+            nz += 1
+        return nx, ny, nz
+    
+    def block_positions(self, position: PositionRecord, counts: Tuple[int, int, int]) -> List[PositionRecord]:
+        #Positions of the copies in a block found by find_block, width fastest and height
+        #slowest, so lower layers come first
+        x1, y1, z1, x2, y2, z2 = self._cell_box(position)
+        start, end = position.start, position.end
+        real_dims = (end[0] - start[0], end[1] - start[1], end[2] - start[2])
+        nx, ny, nz = counts
+        return [
+            self._position(x1 + i*(x2 - x1), y1 + j*(y2 - y1), z1 + k*(z2 - z1), real_dims)
+            for k in range(nz) for j in range(ny) for i in range(nx)
+        ]
+    
+    def place_block(self, records: List[ItemRecord], positions: List[PositionRecord]) -> bool:
+    
+        #Place items whose positions tile a box (e.g. a full block from block_positions)
+        #with one update of the occupancy sums, free runs and extreme points for the box
+        #Returns True if the items were placed, False if the box is not empty
+    
+        boxes = [self._cell_box(position) for position in positions]
+        x1, y1, z1 = (min(box[axis] for box in boxes) for axis in range(3))
+        x2, y2, z2 = (max(box[axis] for box in boxes) for axis in range(3, 6))
+        volume = sum((b[3] - b[0]) * (b[4] - b[1]) * (b[5] - b[2]) for b in boxes)
+        if volume != (x2 - x1) * (y2 - y1) * (z2 - z1):
+            raise ValueError("Block items must tile their bounding box")
+        
+        if not self.is_region_empty(x1, y1, z1, x2, y2, z2):
+            return False
+        
+        if self.use_sparse:
+            for record, box in zip(records, boxes):
+                self.grid.insert(record.item_id, box)
+        else:
+            for record, (a, b, c, d, e, f) in zip(records, boxes):
+                self.grid[a:d, b:e, c:f] = self._assign_slot(record.item_id)
+            self._update_occupancy_sums(x1, y1, z1, x2, y2, z2, 1)
+            self._update_free_runs(x1, y1, z1, x2, y2, z2)
+        
+        for record, position in zip(records, positions):
+            self.items[record.item_id] = record.item
+            self.positions[record.item_id] = position
+            self.volumes[record.item_id] = record.volume
+            self.container.occupied_volume += record.volume
+        self.position_divisor = position_divisor(positions, divisor=self.position_divisor)
+        
+        self.generation += 1
+        self._add_extreme_points(x1, y1, z1, x2, y2, z2)
         
         return True
     
@@ -132,69 +417,301 @@ class SpatialGrid:
         if item_id not in self.items:
             return False
         
-        item = self.items[item_id]
-        position = item.position
-        
-        if position is None:
-            return False
-        
-        x1 = int(position.start_coordinates.width)
-        y1 = int(position.start_coordinates.depth)
-        z1 = int(position.start_coordinates.height)
-        x2 = int(position.end_coordinates.width)
-        y2 = int(position.end_coordinates.depth)
-        z2 = int(position.end_coordinates.height)
+        x1, y1, z1, x2, y2, z2 = self._cell_box(self.positions[item_id])
         
         # Remove the item from the grid
         if self.use_sparse:
-            for x in range(x1, x2):
-                for y in range(y1, y2):
-                    for z in range(z1, z2):
-                        if (x, y, z) in self.grid and self.grid[(x, y, z)] == item_id:
-                            del self.grid[(x, y, z)]
+            self.grid.remove(item_id)
         else:
-            for x in range(x1, x2):
-                for y in range(y1, y2):
-                    for z in range(z1, z2):
-                        if self.grid[x][y][z] == item_id:
-                            self.grid[x][y][z] = None
+            # Only clear the cells that still belong to this item
+            region = self.grid[x1:x2, y1:y2, z1:z2]
+            owned = region == self.item_slots[item_id]
+            region[owned] = 0
+            self._release_slot(item_id)
+            if owned.all():
+                self._update_occupancy_sums(x1, y1, z1, x2, y2, z2, -1)
+            else:
+                self._rebuild_occupancy_sums()
+            self._update_free_runs(x1, y1, z1, x2, y2, z2)
         
         #Update container's occupied volume
-        self.container.occupied_volume -= item.calculate_volume()
+        self.container.occupied_volume -= self.volumes.pop(item_id)
         
-        #Remove from items dictionary
+        #Remove from items and positions dictionaries
         del self.items[item_id]
+        del self.positions[item_id]
+        
+        # Removal can reopen space anywhere, so regenerate the candidate set and forget
+        # the failed searches
+        self.generation = 0
+        self._rebuild_extreme_points()
+        self.failed_shapes = {mode: {} for mode in SEARCH_MODES}
         
         return True
+    
+    def _update_free_runs(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int) -> None:
+        #Recompute the runs of the lines crossing a changed box, then the free extent
+        self._set_runs(0, (slice(y1, y2), slice(z1, z2)), self.grid[:, y1:y2, z1:z2])
+        self._set_runs(1, (slice(x1, x2), slice(z1, z2)), self.grid[x1:x2, :, z1:z2])
+        self._set_runs(2, (slice(x1, x2), slice(y1, y2)), self.grid[x1:x2, y1:y2, :])
+        # run_counts is non-increasing, so its last non-zero index is the longest run
+        self.free_extent = tuple((int(np.count_nonzero(counts)) - 1) * self.resolution
+                                 for counts in self.run_counts)
+    
+    def _set_runs(self, axis: int, lines: Tuple[slice, slice], region: np.ndarray) -> None:
+        #Replace the runs of some lines along an axis, keeping the run counts in step
+        runs = self.free_runs[axis]
+        histogram = self.run_histograms[axis]
+        new_runs = _longest_empty_runs(region == 0, axis)
+        histogram -= np.bincount(runs[lines].ravel(), minlength=len(histogram))
+        histogram += np.bincount(new_runs.ravel(), minlength=len(histogram))
+        runs[lines] = new_runs
+        self.run_counts[axis] = np.cumsum(histogram[::-1])[::-1]
+    
+    def on_lattice(self, item_dimensions: Iterable, precision: float = RESOLUTION_PRECISION) -> bool:
+        #Whether every item dimension (Dimensions or tuples) is a whole number of cells,
+        #so the grid's cell size can stay for these items
+        cell = round(self.resolution / precision)
+        return all(round(value / precision) % cell == 0
+                   for dims in item_dimensions for value in as_dimensions_tuple(dims))
+    
+    def may_fit(self, item_dimensions) -> bool:
+        #Cheap necessary condition for find_best_fit to find a position for an item
+        #(Dimensions or a (width, depth, height) tuple): some orientation
+        #has enough lines with long enough empty runs along every axis. Sparse grids
+        #always answer True.
+        if self.use_sparse:
+            return True
+        counts_x, counts_y, counts_z = self.run_counts
+        for (w, d, h), _ in self._orientations(item_dimensions):
+            if (w < len(counts_x) and d < len(counts_y) and h < len(counts_z)
+                    and counts_x[w] >= d * h and counts_y[d] >= w * h and counts_z[h] >= w * d):
+                return True
+        return False
+    
+    def _project(self, x: int, y: int, z: int, axis: int) -> Tuple[int, int, int]:
+        #Slide an empty cell towards the origin along one axis until it touches an
+        #occupied cell or the container wall
+        point = [x, y, z]
+        if self.use_sparse:
+            # The nearest blocking box along the ray decides where the point stops
+            ray = [x, y, z, x+1, y+1, z+1]
+            ray[axis], ray[axis + 3] = 0, point[axis]
+            point[axis] = max((self.grid.boxes[item_id][axis + 3] for item_id in self.grid.query(*ray)),
+                              default=0)
+            return tuple(point)
+        
+        if axis == 0:
+            line = self.grid[:x, y, z]
+        elif axis == 1:
+            line = self.grid[x, :y, z]
+        else:
+            line = self.grid[x, y, :z]
+        occupied = np.flatnonzero(line)
+        point[axis] = int(occupied[-1]) + 1 if occupied.size else 0
+        return tuple(point)
+    
+    def _add_extreme_points(self, x1: int, y1: int, z1: int,
+                            x2: int, y2: int, z2: int) -> None:
+        
+        #Update the extreme points after the box has been filled: drop the points it
+        #covers and add its three outer corners plus their projections
+        
+        self.extreme_points = {
+            p: generation for p, generation in self.extreme_points.items()
+            if not (x1 <= p[0] < x2 and y1 <= p[1] < y2 and z1 <= p[2] < z2)
+        }
+        corners = (
+            ((x2, y1, z1), (1, 2)),
+            ((x1, y2, z1), (0, 2)),
+            ((x1, y1, z2), (0, 1))
+        )
+        for corner, axes in corners:
+            if not self.is_position_empty(*corner):
+                continue
+            self.extreme_points.setdefault(corner, self.generation)
+            for axis in axes:
+                self.extreme_points.setdefault(self._project(*corner, axis), self.generation)
+    
+    def _rebuild_extreme_points(self) -> None:
+        #Regenerate the extreme points from the items currently in the grid
+        self.extreme_points = {(0, 0, 0): self.generation} if self.is_position_empty(0, 0, 0) else {}
+        for position in self.positions.values():
+            self._add_extreme_points(*self._cell_box(position))
+        
+    def find_best_fit(self, item_dimensions: Dimensions, search_mode: str = "scan") -> Optional[Position]:
+        #Find the best position to place an item (see search), as a Position model
+        position = self.search(item_dimensions, search_mode)
+        return position.to_position() if position else None
+    
+    def search(self, item_dimensions, search_mode: str = "scan") -> Optional[PositionRecord]:
+        
+        #Find the best position to place an item (Dimensions or a (width, depth, height)
+        #tuple) using optimized algorithm
+        #Dense grids score every origin of each orientation in one vectorized pass over
+        #the summed-volume table; sparse grids fall back to the capped scan.
+        #search_mode="extreme_points" only tests the maintained extreme points instead.
+    
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search_mode}', expected one of {SEARCH_MODES}")
+        if search_mode == "extreme_points":
+            return self._search_extreme_points(item_dimensions)
+        
+        start_time = time.perf_counter()
+        
+        #Try all possible orientations of the item
+        orientations = self._orientations(item_dimensions)
+        
+        # Any earlier failure of this shape (or a dominated one) is final for the scan
+        shape = self._shape(orientations, "scan")
+        if self._failed_generation("scan", shape) is not None:
+            GRID_SEARCH_SKIPS.inc(mode="scan")
+            return None
         
-    def find_best_fit(self, item_dimensions: Dimensions) -> Optional[Position]:
+        if self.use_sparse:
+            best_position, positions_checked = self._scan_best_fit(orientations)
+            self._record_search("scan", positions_checked, start_time)
+            if best_position is None:
+                self.failed_shapes["scan"][shape] = self.generation
+            return best_position
+        
+        best_position = None
+        best_score = float('inf')  #Lower is better
+        positions_checked = 0
+        s = self.occupancy_sums
+        
+        for (w, d, h), real_dims in orientations:
+            if (w > self.width or d > self.depth or h > self.height):
+                continue
+            
+            # Occupied-cell count of the w x d x h box at every origin (x, y, z)
+            nx, ny, nz = self.width - w + 1, self.depth - d + 1, self.height - h + 1
+            counts = (s[w:, d:, h:] - s[:nx, d:, h:] - s[w:, :ny, h:] - s[w:, d:, :nz]
+                      + s[:nx, :ny, h:] + s[:nx, d:, :nz] + s[w:, :ny, :nz] - s[:nx, :ny, :nz])
+            positions_checked += counts.size
+            
+            xs, ys, zs = np.nonzero(counts == 0)
+            if xs.size == 0:
+                continue
+            
+            #Score based on position (prefer lower, leftmost, deepest)
+            scores = zs.astype(np.int64) * 10000 + xs.astype(np.int64) * 100 + ys
+            best = int(np.argmin(scores))
+            if scores[best] < best_score:
+                best_score = scores[best]
+                best_position = self._position(int(xs[best]), int(ys[best]), int(zs[best]), real_dims)
+                
+        self._record_search("scan", positions_checked, start_time)
+        if best_position is None:
+            self.failed_shapes["scan"][shape] = self.generation
+        return best_position
+    
+    def find_best_fit_extreme_points(self, item_dimensions: Dimensions) -> Optional[Position]:
+        #find_best_fit restricted to the extreme points, as a Position model
+        position = self._search_extreme_points(item_dimensions)
+        return position.to_position() if position else None
+    
+    def _search_extreme_points(self, item_dimensions) -> Optional[PositionRecord]:
     
-        #Find the best position to place an item using optimized algorithm
-        #this version skips irrelevant positions and uses key optimizations
+        #Find the best position among the extreme points, with the same
+        #lower / leftmost / deepest scoring as the scan and no cap on candidates
     
-        start_time = time.time()
-        width = int(item_dimensions.width)
-        depth = int(item_dimensions.depth)
-        height = int(item_dimensions.height)
+        start_time = time.perf_counter()
+        orientations = self._orientations(item_dimensions)
+        
+        # Points that existed at the last failure of this shape (or a dominated one)
+        # still do not fit, so only the points added since then are searched
+        shape = self._shape(orientations, "extreme_points")
+        failed = self._failed_generation("extreme_points", shape)
+        if failed == self.generation:
+            GRID_SEARCH_SKIPS.inc(mode="extreme_points")
+            return None
+        if failed is None:
+            candidates = self.extreme_points
+        else:
+            candidates = [p for p, generation in self.extreme_points.items() if generation > failed]
+        
+        # The score only depends on the origin, so visiting points from best to worst
+        # score means the first fitting point wins
+        points = sorted(candidates, key=lambda p: (p[2] * 10000 + p[0] * 100 + p[1], p))
+        best_index = len(points)
+        best_orientation = None
+        positions_checked = 0
+        
+        if self.use_sparse:
+            for index, (x, y, z) in enumerate(points):
+                for (w, d, h), real_dims in orientations:
+                    positions_checked += 1
+                    if self.is_region_empty(x, y, z, x+w, y+d, z+h):
+                        best_index, best_orientation = index, real_dims
+                        break
+                if best_orientation is not None:
+                    break
+        elif points:
+            s = self.occupancy_sums
+            xs, ys, zs = np.array(points, dtype=np.int64).T
+            for (w, d, h), real_dims in orientations:
+                # Only points where the box stays inside the container
+                candidates = np.flatnonzero((xs + w <= self.width) &
+                                            (ys + d <= self.depth) &
+                                            (zs + h <= self.height))
+                positions_checked += candidates.size
+                if candidates.size == 0:
+                    continue
+                x1, y1, z1 = xs[candidates], ys[candidates], zs[candidates]
+                x2, y2, z2 = x1 + w, y1 + d, z1 + h
+                counts = (s[x2, y2, z2] - s[x1, y2, z2] - s[x2, y1, z2] - s[x2, y2, z1]
+                          + s[x1, y1, z2] + s[x1, y2, z1] + s[x2, y1, z1] - s[x1, y1, z1])
+                free = candidates[counts == 0]
+                if free.size and free[0] < best_index:
+                    best_index, best_orientation = int(free[0]), real_dims
+        
+        self._record_search("extreme_points", positions_checked, start_time)
+        if best_orientation is None:
+            self.failed_shapes["extreme_points"][shape] = self.generation
+            return None
         
+        x, y, z = points[best_index]
+        return self._position(x, y, z, best_orientation)
+    
+    def _shape(self, orientations: List[Tuple[Tuple[int, int, int], Tuple[float, float, float]]],
+               mode: str) -> Tuple[int, int, int]:
+        #Memo key of an item: its cell dimensions, sorted. The capped sparse scan picks its
+        #orientations and stops early depending on the order the item was given in, so
+        #there the key keeps that order
+        if self.use_sparse and mode == "scan":
+            return orientations[0][0]
+        return tuple(sorted(orientations[0][0]))
+    
+    def _failed_generation(self, mode: str, shape: Tuple[int, int, int]) -> Optional[int]:
+        #Latest generation at which this shape, or one no larger on any sorted side,
+        #failed a search in this mode (None if it never did)
+        failures = self.failed_shapes[mode]
+        if self.use_sparse and mode == "scan":
+            # The capped scan steps by item size, so only the same shape (in the same
+            # order) is known to fail
+            return failures.get(shape)
+        return max((generation for (a, b, c), generation in failures.items()
+                    if a <= shape[0] and b <= shape[1] and c <= shape[2]), default=None)
+    
+    def _record_search(self, mode: str, positions_checked: int, start_time: float) -> None:
+        #Record the latency and size of one find_best_fit call
+        elapsed = time.perf_counter() - start_time
+        GRID_SEARCH_SECONDS.observe(elapsed, mode=mode)
+        POSITIONS_CHECKED.observe(positions_checked, mode=mode)
+        logger.debug("Checked %d %s positions in %.4f seconds", positions_checked, mode, elapsed)
+    
+    def _scan_best_fit(self, orientations: List[Tuple[Tuple[int, int, int], Tuple[float, float, float]]]) -> Tuple[Optional[PositionRecord], int]:
+    
+        #Capped position-by-position scan used for sparse grids
+        #Returns the best position found and the number of positions checked
+    
         # For large items, only try basic orientations
+        width, depth, height = orientations[0][0]
         if width * depth * height > 10000:
-            orientations = [
-                (width, depth, height),
-                (depth, width, height),
-                (height, width, depth)
-            ]
-            print(f"Large item ({width}x{depth}x{height}), trying {len(orientations)} orientations")
-        else:
-            #Try all possible orientations of the item
-            orientations = [
-                (width, depth, height),
-                (width, height, depth),
-                (depth, width, height),
-                (depth, height, width),
-                (height, width, depth),
-                (height, depth, width)
-            ]
+            basic = {(width, depth, height), (depth, width, height), (height, width, depth)}
+            orientations = [o for o in orientations if o[0] in basic]
+            logger.debug("Large item (%dx%dx%d), trying %d orientations", width, depth, height, len(orientations))
         
         best_position = None
         best_score = float('inf')  #Lower is better
@@ -203,7 +720,7 @@ class SpatialGrid:
         max_positions_to_check = 10000
         positions_checked = 0
         
-        for w, d, h in orientations:
+        for (w, d, h), real_dims in orientations:
             if (w > self.width or d > self.depth or h > self.height):
                 continue
                 
@@ -239,19 +756,20 @@ class SpatialGrid:
                             score = z * 10000 + x * 100 + y
                             if score < best_score:
                                 best_score = score
-                                best_position = Position(
-                                    start_coordinates=Dimensions(width=float(x), depth=float(y), height=float(z)),
-                                    end_coordinates=Dimensions(width=float(x+w), depth=float(y+d), height=float(z+h))
-                                )
+                                best_position = self._position(x, y, z, real_dims)
                 
                 if positions_checked > max_positions_to_check:
                     break
             
             if positions_checked > max_positions_to_check:
                 break
-                
-        print(f"Checked {positions_checked} positions in {time.time() - start_time:.2f} seconds")
-        return best_position
+        
+        return best_position, positions_checked
+    
+    def _item_name(self, item_id: str) -> Optional[str]:
+        #Name of a placed item (None for records placed without a model)
+        item = self.items.get(item_id)
+        return item.name if item is not None else None
     
     def calculate_retrieval_steps(self, item_id: str) -> List[Dict]:
     
@@ -261,18 +779,7 @@ class SpatialGrid:
         if item_id not in self.items:
             return []
         
-        item = self.items[item_id]
-        position = item.position
-        
-        if position is None:
-            return []
-        
-        x1 = int(position.start_coordinates.width)
-        y1 = int(position.start_coordinates.depth)
-        z1 = int(position.start_coordinates.height)
-        x2 = int(position.end_coordinates.width)
-        y2 = int(position.end_coordinates.depth)
-        z2 = int(position.end_coordinates.height)
+        x1, y1, z1, x2, y2, z2 = self._cell_box(self.positions[item_id])
         
         #If the item is directly accessible from the open face (y1 = 0)
         if y1 == 0:
@@ -280,28 +787,25 @@ class SpatialGrid:
         
         #Find blocking items
         blocking_items = set()
-        for x in range(x1, x2):
-            for z in range(z1, z2):
-                for y in range(0, y1):
-                    if self.use_sparse:
-                        if (x, y, z) in self.grid:
-                            cell_item_id = self.grid[(x, y, z)]
-                            if cell_item_id is not None and cell_item_id != item_id:
-                                blocking_items.add(cell_item_id)
-                    else:
-                        cell_item_id = self.grid[x][y][z]
-                        if cell_item_id is not None and cell_item_id != item_id:
-                            blocking_items.add(cell_item_id)
+        if self.use_sparse:
+            for cell_item_id in self.grid.query(x1, 0, z1, x2, y1, z2):
+                if cell_item_id != item_id:
+                    blocking_items.add(cell_item_id)
+        else:
+            # Every distinct slot in the column in front of the item is a blocker
+            own_slot = self.item_slots.get(item_id)
+            for slot in np.unique(self.grid[x1:x2, 0:y1, z1:z2]):
+                if slot != 0 and slot != own_slot:
+                    blocking_items.add(self.slot_items[int(slot)])
         
         #create retrieval steps
         steps = []
         for i, blocking_id in enumerate(blocking_items):
-            blocking_item = self.items[blocking_id]
             steps.append({
                 "step": i + 1,
                 "action": "remove",
                 "itemId": blocking_id,
-                "itemName": blocking_item.name
+                "itemName": self._item_name(blocking_id)
             })
             
         #add step to retrieve the target item
@@ -309,17 +813,16 @@ class SpatialGrid:
             "step": len(blocking_items) + 1,
             "action": "retrieve",
             "itemId": item_id,
-            "itemName": item.name
+            "itemName": self._item_name(item_id)
         })
         
         #add steps to place back the blocking items
         for i, blocking_id in enumerate(blocking_items):
-            blocking_item = self.items[blocking_id]
             steps.append({
                 "step": len(blocking_items) + 2 + i,
                 "action": "placeBack",
                 "itemId": blocking_id,
-                "itemName": blocking_item.name
+                "itemName": self._item_name(blocking_id)
             })
             
         return steps
\ No newline at end of file
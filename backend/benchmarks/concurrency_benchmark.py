@@ -0,0 +1,123 @@
+# Benchmark: request latency under concurrent mixed load
+#
+# Drives a running API server with a fixed number of concurrent clients issuing a
+# weighted mix of cheap requests (health check, container lookup) and expensive ones
+# (item listing, stats), and reports p50/p95/p99 latency per endpoint. With a blocking
+# database layer the cheap requests queue behind the expensive ones and their p99
+# tracks the slowest query; with the non-blocking layer it stays near their own cost.
+#
+# Usage (from backend/, with the server running against a populated database):
+#   uvicorn app.main:app --port 8000
+#   python -m benchmarks.concurrency_benchmark --url http://localhost:8000 --clients 32 --requests 2000
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# (name, path, weight) of the request mix
+REQUEST_MIX = [
+    ("health", "/", 40),
+    ("container_check", "/api/containers/check/{container_id}", 30),
+    ("items", "/api/items", 10),
+    ("stats", "/api/stats", 20)
+]
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def fetch(url, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 500
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def worker(base_url, schedule, results, lock, timeout):
+    while True:
+        with lock:
+            if not schedule:
+                return
+            name, path = schedule.pop()
+        elapsed, ok = fetch(base_url + path, timeout)
+        with lock:
+            results.setdefault(name, []).append((elapsed, ok))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API latency under concurrent mixed load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--container-id", default="contA")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="emit one JSON object per endpoint")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [name for name, _, _ in REQUEST_MIX]
+    paths = {name: path.format(container_id=args.container_id) for name, path, _ in REQUEST_MIX}
+    weights = [weight for _, _, weight in REQUEST_MIX]
+    schedule = [(name, paths[name]) for name in rng.choices(names, weights, k=args.requests)]
+
+    results = {}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(args.url.rstrip("/"), schedule, results, lock, args.timeout))
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_time = time.perf_counter() - start
+
+    rows = []
+    everything = []
+    for name in names + ["all"]:
+        samples = everything if name == "all" else results.get(name, [])
+        if name != "all":
+            everything.extend(samples)
+        latencies = [elapsed * 1000 for elapsed, ok in samples if ok]
+        rows.append({
+            "endpoint": name,
+            "requests": len(samples),
+            "errors": sum(1 for _, ok in samples if not ok),
+            "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+            "max_ms": round(max(latencies), 2) if latencies else None,
+            "clients": args.clients,
+            "throughput_rps": round(len(samples) / wall_time, 1) if name == "all" else None
+        })
+
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+        return
+
+    print(f"{'endpoint':>16} {'requests':>9} {'errors':>7} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'max_ms':>9}")
+    for row in rows:
+        print(f"{row['endpoint']:>16} {row['requests']:>9} {row['errors']:>7} "
+              f"{row['p50_ms']!s:>9} {row['p95_ms']!s:>9} {row['p99_ms']!s:>9} {row['max_ms']!s:>9}")
+    print(f"{args.requests} requests from {args.clients} clients in {wall_time:.2f}s "
+          f"({args.requests / wall_time:.1f} req/s)")
+
+
+if __name__ == "__main__":
+    main()
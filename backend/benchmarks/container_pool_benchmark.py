@@ -0,0 +1,98 @@
+# Benchmark: concurrent per-container candidate evaluation (BinPacker container_workers)
+#
+# Packs the same seeded manifest serially and with a ContainerWorkerPool for a range of
+# container counts, and reports the speedup. All containers share one zone so every
+# container is a candidate for every item.
+#
+# Usage (from backend/):
+#   python -m benchmarks.container_pool_benchmark --containers 4 16 64 --workers 4
+
+import argparse
+import json
+import random
+import time
+
+from app.algorithms.bin_packing import BinPacker
+from app.models.container import Container, Dimensions
+from app.models.item import Item
+
+
+def make_manifest(container_count: int, item_count: int, seed: int):
+    rng = random.Random(seed)
+    containers = [
+        Container(
+            container_id=f"C{index:03d}",
+            zone="Storage",
+            dimensions=Dimensions(width=100, depth=85, height=200)
+        )
+        for index in range(container_count)
+    ]
+    items = [
+        Item(
+            item_id=f"I{index:05d}",
+            name=f"Item {index}",
+            dimensions=Dimensions(
+                width=rng.choice([5, 10, 15, 20, 30]),
+                depth=rng.choice([5, 10, 15, 20]),
+                height=rng.choice([5, 10, 20, 40])
+            ),
+            mass=1.0,
+            priority=rng.randint(1, 100),
+            usage_limit=10,
+            preferred_zone="Storage"
+        )
+        for index in range(item_count)
+    ]
+    return items, containers
+
+
+def run(items, containers, **options):
+    start = time.perf_counter()
+    result = BinPacker.place_items(items, containers, **options)
+    return time.perf_counter() - start, result["placements"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent per-container evaluation")
+    parser.add_argument("--containers", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--search-mode", default="scan")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="emit one JSON object per row")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'containers':>10} {'serial_s':>10} {'pool_s':>10} {'speedup':>8} {'placed':>8}")
+
+    for container_count in args.containers:
+        items, containers = make_manifest(container_count, args.items, args.seed)
+        serial_time, serial_placements = run(items, containers, search_mode=args.search_mode)
+
+        items, containers = make_manifest(container_count, args.items, args.seed)
+        pool_time, pool_placements = run(items, containers, search_mode=args.search_mode,
+                                         container_workers=args.workers)
+
+        # Both modes must produce the identical plan
+        if serial_placements != pool_placements:
+            raise SystemExit(f"Placement mismatch with {container_count} containers")
+        pool_placed = len(pool_placements)
+
+        row = {
+            "containers": container_count,
+            "items": args.items,
+            "workers": args.workers,
+            "serial_seconds": round(serial_time, 4),
+            "pool_seconds": round(pool_time, 4),
+            "speedup": round(serial_time / pool_time, 2) if pool_time else None,
+            "placed": pool_placed
+        }
+        if args.json:
+            print(json.dumps(row))
+        else:
+            print(f"{container_count:>10} {serial_time:>10.3f} {pool_time:>10.3f} "
+                  f"{row['speedup']:>8} {pool_placed:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# Seeded synthetic cargo manifests for the benchmarks
+#
+# The same arguments (including the seed) always produce the same items and containers,
+# so timings and packing results can be compared across commits.
+
+import random
+
+from app.models.container import Container, Dimensions
+from app.models.item import Item
+
+# Item edge lengths (cm) drawn per axis for each size distribution
+SIZE_DISTRIBUTIONS = {
+    "small": [5, 10, 15],
+    "mixed": [5, 10, 15, 20, 30, 40],
+    "large": [20, 30, 40, 50, 60],
+    "fractional": [2.5, 5, 7.5, 12.5, 17.5],
+    "kits": [15, 25, 35]  # Few distinct shapes repeated many times (ration packs, tool kits)
+}
+
+# Container dimensions (width, depth, height) in cm. choose_resolution scales cells up to
+# the GCD of the container and item edges, so "sparse" uses odd edges: its cells stay
+# 1 cm and the grid exceeds the dense cell limit whatever the item sizes
+CONTAINER_SIZES = {
+    "dense": (100, 85, 100),
+    "sparse": (203, 201, 199)
+}
+
+
+def zone_names(zones: int):
+    return [f"Zone{index}" for index in range(zones)]
+
+
+def generate_manifest(item_count: int, container_count: int, sizes: str = "mixed", zones: int = 1,
+                      container_size: str = "dense", seed: int = 42, priority_levels: int = 100):
+
+    # Build (items, containers) for a scenario.
+    # Containers are spread round-robin over the zones; item preferred zones follow a
+    # skewed 1/(rank+1) distribution so the first zones overflow into the others.
+    # Priorities are drawn from 1..priority_levels (few levels mean many equal priorities).
+
+    rng = random.Random(seed)
+    edges = SIZE_DISTRIBUTIONS[sizes]
+    width, depth, height = CONTAINER_SIZES[container_size]
+    names = zone_names(zones)
+    weights = [1 / (rank + 1) for rank in range(zones)]
+
+    containers = [
+        Container(
+            container_id=f"C{index:03d}",
+            zone=names[index % zones],
+            dimensions=Dimensions(width=width, depth=depth, height=height)
+        )
+        for index in range(container_count)
+    ]
+    items = [
+        Item(
+            item_id=f"I{index:05d}",
+            name=f"Item {index}",
+            dimensions=Dimensions(
+                width=rng.choice(edges),
+                depth=rng.choice(edges),
+                height=rng.choice(edges)
+            ),
+            mass=round(rng.uniform(0.5, 20), 2),
+            priority=rng.randint(1, priority_levels),
+            usage_limit=rng.randint(1, 50),
+            preferred_zone=rng.choices(names, weights)[0]
+        )
+        for index in range(item_count)
+    ]
+    return items, containers
@@ -0,0 +1,224 @@
+# Benchmark suite: BinPacker and SpatialGrid on seeded synthetic manifests
+#
+# Every scenario is generated from a fixed seed (see benchmarks/manifest.py) and run
+# offline against BinPacker.place_items ("packer" runs) and against a single
+# SpatialGrid filled greedily with find_best_fit + place_item ("grid" runs). Each run
+# reports wall time (best and median of --repeat runs), positions checked, peak traced
+# memory and volume utilization, and the whole suite is written as one JSON document
+# so two commits can be compared with --compare.
+#
+# Usage (from backend/):
+#   python -m benchmarks.packing_benchmark --output before.json
+#   python -m benchmarks.packing_benchmark --output after.json --compare before.json
+
+import argparse
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.algorithms.bin_packing import BinPacker
+from app.utils.metrics import POSITIONS_CHECKED
+from app.utils.spatial_grid import SpatialGrid, SEARCH_MODES, choose_resolution
+from app.utils.records import as_dimensions_tuple
+
+from .manifest import generate_manifest
+
+# Packer scenarios: arguments of generate_manifest
+SCENARIOS = {
+    "uniform-small": dict(item_count=300, container_count=4, sizes="small", zones=1),
+    "mixed-zones": dict(item_count=500, container_count=8, sizes="mixed", zones=4),
+    "large-items": dict(item_count=200, container_count=6, sizes="large", zones=2),
+    "fractional": dict(item_count=300, container_count=4, sizes="fractional", zones=1),
+    "sparse": dict(item_count=30, container_count=1, sizes="large", zones=1, container_size="sparse"),
+    "many-containers": dict(item_count=400, container_count=60, sizes="large", zones=4),
+    "repeated-kits": dict(item_count=1500, container_count=6, sizes="kits", zones=2),
+    "bulk-resupply": dict(item_count=2000, container_count=8, sizes="kits", zones=2, priority_levels=2)
+}
+
+# Grid scenarios: one container filled item by item
+GRID_SCENARIOS = {
+    "grid-dense": dict(item_count=400, container_count=1, sizes="mixed", zones=1),
+    "grid-sparse": dict(item_count=30, container_count=1, sizes="large", zones=1, container_size="sparse")
+}
+
+
+def scaled(arguments, scale):
+    arguments = dict(arguments)
+    arguments["item_count"] = max(1, int(arguments["item_count"] * scale))
+    return arguments
+
+
+def utilization(placed_volume, containers):
+    capacity = sum(c.dimensions.width * c.dimensions.depth * c.dimensions.height for c in containers)
+    return placed_volume / capacity if capacity else 0.0
+
+
+def check_representation(arguments, grid):
+    # A "sparse" scenario only measures BoxIndex if its grids stay above the dense cell limit
+    if arguments.get("container_size") == "sparse":
+        assert grid.use_sparse, f"Sparse scenario built a dense {grid.width}x{grid.depth}x{grid.height} grid"
+
+
+def pack_once(arguments, mode, seed, **options):
+    # One packer run on a freshly generated manifest; returns (seconds, stats)
+    items, containers = generate_manifest(seed=seed, **arguments)
+    if arguments.get("container_size") == "sparse":
+        # Same cell size as BinPacker picks for these items
+        dimensions = [as_dimensions_tuple(item.dimensions) for item in items]
+        for container in containers:
+            check_representation(arguments, SpatialGrid(container, choose_resolution(container, dimensions)))
+    volumes = {item.item_id: item.calculate_volume() for item in items}
+    positions_before = POSITIONS_CHECKED.total(mode=mode)
+    searches_before = POSITIONS_CHECKED.count(mode=mode)
+
+    start = time.perf_counter()
+    result = BinPacker.place_items(items, containers, search_mode=mode, **options)
+    seconds = time.perf_counter() - start
+
+    placed_volume = sum(volumes[placement["itemId"]] for placement in result["placements"])
+    return seconds, {
+        "placed": len(result["placements"]),
+        "unplaced": len(result["unplaced_items"]),
+        "searches": POSITIONS_CHECKED.count(mode=mode) - searches_before,
+        "positions_checked": int(POSITIONS_CHECKED.total(mode=mode) - positions_before),
+        "utilization": round(utilization(placed_volume, containers), 4)
+    }
+
+
+def grid_once(arguments, mode, seed):
+    # Fill one SpatialGrid greedily; returns (seconds, stats) with per-search latency
+    items, containers = generate_manifest(seed=seed, **arguments)
+    container = containers[0]
+    positions_before = POSITIONS_CHECKED.total(mode=mode)
+
+    start = time.perf_counter()
+    grid = SpatialGrid(container, choose_resolution(container, [item.dimensions for item in items]))
+    check_representation(arguments, grid)
+    search_times = []
+    placed_volume = 0.0
+    placed = 0
+    for item in items:
+        search_start = time.perf_counter()
+        position = grid.find_best_fit(item.dimensions, mode)
+        search_times.append(time.perf_counter() - search_start)
+        if position and grid.place_item(item, position):
+            placed += 1
+            placed_volume += item.calculate_volume()
+    seconds = time.perf_counter() - start
+
+    return seconds, {
+        "placed": placed,
+        "unplaced": len(items) - placed,
+        "searches": len(search_times),
+        "positions_checked": int(POSITIONS_CHECKED.total(mode=mode) - positions_before),
+        "search_mean_ms": round(statistics.mean(search_times) * 1000, 4),
+        "search_p95_ms": round(float(np.percentile(search_times, 95)) * 1000, 4),
+        "utilization": round(utilization(placed_volume, [container]), 4)
+    }
+
+
+def measure(run, arguments, mode, seed, repeat, memory):
+    times = []
+    stats = None
+    for _ in range(repeat):
+        seconds, stats = run(arguments, mode, seed)
+        times.append(seconds)
+
+    row = {
+        "best_seconds": round(min(times), 4),
+        "median_seconds": round(statistics.median(times), 4),
+        **stats
+    }
+    if memory:
+        # Separate traced run: tracemalloc slows allocation-heavy code, so it is not timed
+        tracemalloc.start()
+        run(arguments, mode, seed)
+        row["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return row
+
+
+def metadata(seed, scale, repeat, block_building):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "seed": seed,
+        "scale": scale,
+        "repeat": repeat,
+        "block_building": block_building,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def compare(results, baseline_path):
+    # Print the time ratio and utilization change of every run also found in the baseline
+    with open(baseline_path) as handle:
+        baseline = {(r["benchmark"], r["scenario"], r["mode"]): r for r in json.load(handle)["results"]}
+
+    print(f"{'benchmark':>8} {'scenario':>14} {'mode':>15} {'base_s':>9} {'new_s':>9} {'ratio':>7} {'util_delta':>11}")
+    for row in results:
+        before = baseline.get((row["benchmark"], row["scenario"], row["mode"]))
+        if before is None:
+            continue
+        ratio = row["best_seconds"] / before["best_seconds"] if before["best_seconds"] else float("nan")
+        delta = row["utilization"] - before["utilization"]
+        print(f"{row['benchmark']:>8} {row['scenario']:>14} {row['mode']:>15} {before['best_seconds']:>9.4f} "
+              f"{row['best_seconds']:>9.4f} {ratio:>7.2f} {delta:>+11.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BinPacker and SpatialGrid on seeded manifests")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS) + list(GRID_SCENARIOS),
+                        help="subset of scenarios to run (default: all)")
+    parser.add_argument("--modes", nargs="+", choices=SEARCH_MODES, default=list(SEARCH_MODES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every scenario's item count")
+    parser.add_argument("--block-building", action="store_true", help="pack with BinPacker block building")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--output", help="write the results JSON here instead of stdout")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    packer_run = functools.partial(pack_once, block_building=args.block_building)
+    suites = [("packer", packer_run, SCENARIOS), ("grid", grid_once, GRID_SCENARIOS)]
+    results = []
+    for benchmark, run, scenarios in suites:
+        for scenario, arguments in scenarios.items():
+            if args.scenarios and scenario not in args.scenarios:
+                continue
+            for mode in args.modes:
+                row = measure(run, scaled(arguments, args.scale), mode, args.seed,
+                              args.repeat, not args.no_memory)
+                row = {"benchmark": benchmark, "scenario": scenario, "mode": mode, **row}
+                results.append(row)
+                if args.output:
+                    # Progress while the suite runs; the document goes to the file
+                    print(json.dumps(row), flush=True)
+
+    document = {"meta": metadata(args.seed, args.scale, args.repeat, args.block_building), "results": results}
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(document, handle, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
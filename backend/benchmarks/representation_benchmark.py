@@ -0,0 +1,131 @@
+# Benchmark: pydantic models vs the packer's slim records (app/utils/records.py)
+#
+# Times the per-item operations of the packing hot loop in both representations and
+# measures the memory each retained object costs:
+#   position  - a search result: Position with two nested Dimensions vs a PositionRecord
+#   commit    - recording a placement: item.copy() with position and container set vs
+#               nothing (the grid keeps the ItemRecord and PositionRecord it was given)
+#   volume    - the free-volume check of a candidate container: calculate_volume() and
+#               get_available_volume() vs the cached record volume and grid capacity
+# plus a full BinPacker.place_items run for the end-to-end effect (compare it across
+# commits with packing_benchmark --compare).
+#
+# Usage (from backend/):
+#   python -m benchmarks.representation_benchmark
+#   python -m benchmarks.representation_benchmark --count 20000 --output records.json
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from app.models.container import Dimensions
+from app.models.item import Position
+from app.utils.records import ItemRecord, PositionRecord
+from app.utils.spatial_grid import SpatialGrid, choose_resolution
+
+from .manifest import generate_manifest
+
+
+def position_model(i):
+    return Position(start_coordinates=Dimensions(width=i, depth=0.0, height=0.0),
+                    end_coordinates=Dimensions(width=i + 10.0, depth=10.0, height=10.0))
+
+
+def position_record(i):
+    return PositionRecord((i, 0.0, 0.0), (i + 10.0, 10.0, 10.0))
+
+
+def timed(function, arguments):
+    # Seconds per call over all arguments
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def retained_bytes(function, arguments):
+    # Traced bytes held by the results of function over all arguments, per result
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [function(argument) for argument in arguments]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del results
+    return held / len(arguments)
+
+
+def cases(count, seed):
+    items, containers = generate_manifest(item_count=count, container_count=1, sizes="mixed",
+                                          zones=1, seed=seed)
+    container = containers[0]
+    grid = SpatialGrid(container, choose_resolution(container, [item.dimensions for item in items]))
+    records = [ItemRecord.from_item(item) for item in items]
+    positions = [position_model(float(i)) for i in range(count)]
+    position_records = [PositionRecord.from_position(position) for position in positions]
+
+    def commit_model(i):
+        placed = items[i].copy()
+        placed.position = positions[i]
+        placed.container_id = container.container_id
+        return placed
+
+    def commit_record(i):
+        return (records[i], position_records[i])
+
+    def volume_model(i):
+        return container.get_available_volume() < items[i].calculate_volume()
+
+    def volume_record(i):
+        return grid.capacity - container.occupied_volume < records[i].volume
+
+    indices = range(count)
+    return {
+        "position": (position_model, position_record, [float(i) for i in indices]),
+        "commit": (commit_model, commit_record, indices),
+        "volume": (volume_model, volume_record, indices)
+    }
+
+
+def pack_seconds(count, seed):
+    from app.algorithms.bin_packing import BinPacker
+
+    items, containers = generate_manifest(item_count=count, container_count=8, sizes="mixed",
+                                          zones=4, seed=seed)
+    start = time.perf_counter()
+    BinPacker.place_items(items, containers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pydantic models with the packer's slim records")
+    parser.add_argument("--count", type=int, default=10000, help="operations per case")
+    parser.add_argument("--pack-items", type=int, default=500, help="items in the end-to-end packing run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for case, (model, record, arguments) in cases(args.count, args.seed).items():
+        arguments = list(arguments)
+        model_seconds = timed(model, arguments)
+        record_seconds = timed(record, arguments)
+        results.append({
+            "case": case,
+            "model_us": round(model_seconds * 1e6, 3),
+            "record_us": round(record_seconds * 1e6, 3),
+            "speedup": round(model_seconds / record_seconds, 2) if record_seconds else None,
+            "model_bytes": round(retained_bytes(model, arguments), 1),
+            "record_bytes": round(retained_bytes(record, arguments), 1)
+        })
+
+    document = {"results": results, "pack_seconds": round(pack_seconds(args.pack_items, args.seed), 4)}
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(document, handle, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from app.models.container import Container, Dimensions
+from app.utils.records import ItemRecord, PositionRecord
+from app.utils.spatial_grid import SpatialGrid
+
+
+def sparse_grid_with_block():
+    # Sparse grid (1 cm cells) with a block filling z in [10, 50) over x in [0, 110)
+    container = Container(container_id="C1", zone="A", dimensions=Dimensions(width=203, depth=201, height=199))
+    grid = SpatialGrid(container, 1.0)
+    assert grid.use_sparse
+    assert grid.place_record(ItemRecord("block", (110, 201, 40), 1, "A"), PositionRecord((0, 0, 10), (110, 201, 50)))
+    return grid
+
+
+def test_sparse_scan_memo_keeps_orientation_order():
+    # The capped scan's result depends on the order of the dimensions, so a failure of
+    # one order must not rule out another
+    fresh = sparse_grid_with_block().search((50, 10, 10))
+    assert fresh is not None
+
+    grid = sparse_grid_with_block()
+    grid.search((10, 10, 50))
+    assert grid.search((50, 10, 10)) == fresh
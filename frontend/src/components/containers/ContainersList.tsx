@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import {
     Box,
     Typography,
@@ -19,11 +19,14 @@ import {
     CardContent,
     useTheme,
     alpha,
-    Grid as MuiGrid
+    Grid as MuiGrid,
+    TablePagination,
+    TextField,
+    MenuItem
 } from '@mui/material';
 import { Add, Refresh, Upload, Storage, Warning } from '@mui/icons-material';
-import { getContainers } from '../../services/containerService';
-import { Container } from '../../types/Container';
+import { getContainersPage, getContainersSummary } from '../../services/containerService';
+import { Container, ContainerSummary } from '../../types/Container';
 import ContainerForm from './ContainerForm';
 import ContainerImport from './ContainerImport';
 
@@ -34,29 +37,98 @@ const GridItem = (props: any) => <MuiGrid {...props} />;
 
 const ContainersList: React.FC = () => {
     const [containers, setContainers] = useState<Container[]>([]);
+    const [containerSummary, setContainerSummary] = useState<ContainerSummary | null>(null);
     const [loading, setLoading] = useState<boolean>(true);
     const [error, setError] = useState<string | null>(null);
     const [openForm, setOpenForm] = useState<boolean>(false);
     const [openImport, setOpenImport] = useState<boolean>(false);
     const theme = useTheme();
 
-    const fetchContainers = async () => {
+    // Zone filter and sort are applied by the server
+    const [zone, setZone] = useState<string>('');
+    const [sort, setSort] = useState<string>('container_id');
+
+    // Keyset pagination: cursors[p] fetches page p (null for the first page)
+    const [page, setPage] = useState(0);
+    const [rowsPerPage, setRowsPerPage] = useState(25);
+    const [cursors, setCursors] = useState<(string | null)[]>([null]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const requestId = useRef(0);
+    const summaryRequestId = useRef(0);
+
+    // Returns whether the page was shown (false if it failed or was superseded)
+    const fetchPage = async (pageIndex: number, cursor: string | null): Promise<boolean> => {
+        const request = ++requestId.current;
         try {
             setLoading(true);
-            const data = await getContainers();
-            setContainers(data);
+            const data = await getContainersPage({
+                filters: { zone: zone || undefined },
+                sort,
+                cursor,
+                limit: rowsPerPage
+            });
+            if (request !== requestId.current) return false;  // A newer request superseded this one
+            setContainers(data.data);
+            setNextCursor(data.nextCursor);
+            setPage(pageIndex);
             setError(null);
+            return true;
         } catch (err) {
+            if (request !== requestId.current) return false;
             console.error('Failed to fetch containers:', err);
             setError('Failed to load containers. Please try again.');
+            return false;
         } finally {
-            setLoading(false);
+            if (request === requestId.current) {
+                setLoading(false);
+            }
         }
     };
 
+    // Totals over every match: a full scan on the server, so requested on their own
+    // once the first page is shown instead of delaying it
+    const fetchSummary = async () => {
+        const request = summaryRequestId.current;
+        try {
+            const data = await getContainersSummary({ zone: zone || undefined });
+            if (request === summaryRequestId.current) {
+                setContainerSummary(data);
+            }
+        } catch (err) {
+            console.error('Failed to fetch container totals:', err);
+        }
+    };
+
+    // Back to the first page, then fresh totals
+    const fetchContainers = async () => {
+        setCursors([null]);
+        summaryRequestId.current += 1;  // Totals still loading are for the old filters
+        setContainerSummary(null);
+        if (await fetchPage(0, null)) {
+            fetchSummary();
+        }
+    };
+
+    // Refetch when the filter, sort or page size change (debounced for typing)
     useEffect(() => {
-        fetchContainers();
-    }, []);
+        const timer = setTimeout(fetchContainers, 300);
+        return () => clearTimeout(timer);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [zone, sort, rowsPerPage]);
+
+    const handleChangePage = (event: unknown, newPage: number) => {
+        if (newPage > page) {
+            if (!nextCursor) return;
+            setCursors(current => [...current.slice(0, newPage), nextCursor]);
+            fetchPage(newPage, nextCursor);
+        } else {
+            fetchPage(newPage, cursors[newPage]);
+        }
+    };
+
+    const handleChangeRowsPerPage = (event: React.ChangeEvent<HTMLInputElement>) => {
+        setRowsPerPage(parseInt(event.target.value, 10));
+    };
 
     const handleFormClose = (refresh: boolean = false) => {
         setOpenForm(false);
@@ -84,15 +156,14 @@ const ContainersList: React.FC = () => {
         return theme.palette.success.main;
     };
 
+    // Totals over every container matching the filter (not just the current page)
     const getContainerSummary = () => {
-        if (containers.length === 0) return null;
-        
-        const totalContainers = containers.length;
-        const highUtilization = containers.filter(c => 
-            parseFloat(calculateVolumePercentage(c)) > 80
-        ).length;
+        if (!containerSummary || containerSummary.total === 0) return null;
         
-        return { totalContainers, highUtilization };
+        return {
+            totalContainers: containerSummary.total,
+            highUtilization: containerSummary.highUtilization
+        };
     };
 
     const summary = getContainerSummary();
@@ -173,6 +244,29 @@ const ContainersList: React.FC = () => {
                 </Box>
             </Box>
 
+            {/* Zone filter and sort */}
+            <Box sx={{ display: 'flex', flexWrap: 'wrap', gap: 2, mb: 3 }}>
+                <TextField
+                    label="Zone"
+                    size="small"
+                    value={zone}
+                    onChange={(e) => setZone(e.target.value)}
+                />
+                <TextField
+                    select
+                    label="Sort by"
+                    size="small"
+                    value={sort}
+                    onChange={(e) => setSort(e.target.value)}
+                    sx={{ minWidth: 220 }}
+                >
+                    <MenuItem value="container_id">Container ID</MenuItem>
+                    <MenuItem value="zone">Zone</MenuItem>
+                    <MenuItem value="-occupied_volume">Occupied volume (high to low)</MenuItem>
+                    <MenuItem value="occupied_volume">Occupied volume (low to high)</MenuItem>
+                </TextField>
+            </Box>
+
             {/* Summary Cards */}
             {summary && (
                 <GridContainer spacing={3} sx={{ mb: 4 }}>
@@ -251,7 +345,7 @@ const ContainersList: React.FC = () => {
                 >
                     <Storage sx={{ fontSize: 60, color: alpha(theme.palette.text.secondary, 0.3), mb: 2 }} />
                     <Typography variant="h5" sx={{ fontWeight: 'medium', mb: 1 }}>
-                        No containers found
+                        {zone ? 'No containers in this zone' : 'No containers found'}
                     </Typography>
                     <Typography color="text.secondary" sx={{ mb: 4, maxWidth: 450, mx: 'auto' }}>
                         Add your first container to start organizing items and tracking inventory
@@ -367,6 +461,15 @@ const ContainersList: React.FC = () => {
                             })}
                         </TableBody>
                     </Table>
+                    <TablePagination
+                        rowsPerPageOptions={[10, 25, 50, 100]}
+                        component="div"
+                        count={containerSummary ? containerSummary.total : -1}
+                        rowsPerPage={rowsPerPage}
+                        page={page}
+                        onPageChange={handleChangePage}
+                        onRowsPerPageChange={handleChangeRowsPerPage}
+                    />
                 </TableContainer>
             )}
 
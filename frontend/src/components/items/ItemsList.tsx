@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import {
     Box,
     Typography,
@@ -21,11 +21,13 @@ import {
     useMediaQuery,
     Card,
     CardContent,
-    Divider
+    Divider,
+    TextField,
+    MenuItem
 } from '@mui/material';
 import { Add, Refresh, Upload, ViewInAr, Info } from '@mui/icons-material';
-import { getItems } from '../../services/itemService';
-import { Item } from '../../types/Item';
+import { getItemsPage, getItemsSummary } from '../../services/itemService';
+import { Item, ItemFilters, ItemSummary } from '../../types/Item';
 import ItemForm from './ItemForm';
 import ItemImport from './ItemImport';
 import { priorityToColor } from '../../utils/colors';
@@ -36,32 +38,90 @@ const ItemsList: React.FC = () => {
     const isSmallScreen = useMediaQuery(theme.breakpoints.down('md'));
 
     const [items, setItems] = useState<Item[]>([]);
+    const [summary, setSummary] = useState<ItemSummary | null>(null);
     const [loading, setLoading] = useState<boolean>(true);
     const [error, setError] = useState<string | null>(null);
     const [openForm, setOpenForm] = useState<boolean>(false);
     const [openImport, setOpenImport] = useState<boolean>(false);
 
-    // Pagination
+    // Filters and sort are applied by the server
+    const [filters, setFilters] = useState<ItemFilters>({});
+    const [sort, setSort] = useState<string>('-priority');
+
+    // Keyset pagination: cursors[p] fetches page p (null for the first page)
     const [page, setPage] = useState(0);
     const [rowsPerPage, setRowsPerPage] = useState(10);
+    const [cursors, setCursors] = useState<(string | null)[]>([null]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const requestId = useRef(0);
+    const summaryRequestId = useRef(0);
 
-    const fetchItems = async () => {
+    // Returns whether the page was shown (false if it failed or was superseded)
+    const fetchPage = async (pageIndex: number, cursor: string | null): Promise<boolean> => {
+        const request = ++requestId.current;
         try {
             setLoading(true);
-            const data = await getItems();
-            setItems(data);
+            const data = await getItemsPage({
+                filters,
+                sort,
+                cursor,
+                limit: rowsPerPage
+            });
+            if (request !== requestId.current) return false;  // A newer request superseded this one
+            setItems(data.data);
+            setNextCursor(data.nextCursor);
+            setPage(pageIndex);
             setError(null);
+            return true;
         } catch (err) {
+            if (request !== requestId.current) return false;
             console.error('Failed to fetch items:', err);
             setError('Failed to load items. Please try again.');
+            return false;
         } finally {
-            setLoading(false);
+            if (request === requestId.current) {
+                setLoading(false);
+            }
+        }
+    };
+
+    // Totals over every match: a full scan on the server, so requested on their own
+    // once the first page is shown instead of delaying it
+    const fetchSummary = async () => {
+        const request = summaryRequestId.current;
+        try {
+            const data = await getItemsSummary(filters);
+            if (request === summaryRequestId.current) {
+                setSummary(data);
+            }
+        } catch (err) {
+            console.error('Failed to fetch item totals:', err);
+        }
+    };
+
+    // Back to the first page, then fresh totals
+    const fetchItems = async () => {
+        setCursors([null]);
+        summaryRequestId.current += 1;  // Totals still loading are for the old filters
+        setSummary(null);
+        if (await fetchPage(0, null)) {
+            fetchSummary();
         }
     };
 
+    // Refetch when the filters, sort or page size change (debounced for typing)
     useEffect(() => {
-        fetchItems();
-    }, []);
+        const timer = setTimeout(fetchItems, 300);
+        return () => clearTimeout(timer);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [filters, sort, rowsPerPage]);
+
+    const updateFilter = <K extends keyof ItemFilters>(name: K, value: ItemFilters[K]) => {
+        setFilters(current => ({ ...current, [name]: value }));
+    };
+
+    const parseNumber = (value: string) => (value === '' ? undefined : Number(value));
+    const parseFlag = (value: string) => (value === '' ? undefined : value === 'true');
 
     const handleFormClose = (refresh: boolean = false) => {
         setOpenForm(false);
@@ -78,12 +138,17 @@ const ItemsList: React.FC = () => {
     };
 
     const handleChangePage = (event: unknown, newPage: number) => {
-        setPage(newPage);
+        if (newPage > page) {
+            if (!nextCursor) return;
+            setCursors(current => [...current.slice(0, newPage), nextCursor]);
+            fetchPage(newPage, nextCursor);
+        } else {
+            fetchPage(newPage, cursors[newPage]);
+        }
     };
 
     const handleChangeRowsPerPage = (event: React.ChangeEvent<HTMLInputElement>) => {
         setRowsPerPage(parseInt(event.target.value, 10));
-        setPage(0);
     };
 
     // Formatted volume calculation
@@ -109,19 +174,20 @@ const ItemsList: React.FC = () => {
         return expiryDate < new Date();
     };
 
+    // Totals over every item matching the filters (not just the current page)
     const getItemStats = () => {
-        if (items.length === 0) return null;
-
-        const totalItems = items.length;
-        const totalVolume = items.reduce((sum, item) => {
-            return sum + (item.dimensions.width * item.dimensions.depth * item.dimensions.height);
-        }, 0);
-        const totalMass = items.reduce((sum, item) => sum + item.mass, 0);
-        const unplacedItems = items.filter(item => !item.container_id).length;
+        if (!summary || summary.total === 0) return null;
 
-        return { totalItems, totalVolume, totalMass, unplacedItems };
+        return {
+            totalItems: summary.total,
+            totalVolume: summary.totalVolume,
+            totalMass: summary.totalMass,
+            unplacedItems: summary.unplaced
+        };
     };
 
+    const hasFilters = Object.values(filters).some(value => value !== undefined && value !== '');
+
     const stats = getItemStats();
 
     return (
@@ -193,6 +259,103 @@ const ItemsList: React.FC = () => {
                 </Box>
             </Card>
 
+            {/* Filters and sort */}
+            <Paper sx={{ p: 2, mb: 3, borderRadius: 2, boxShadow: 1 }}>
+                <Box sx={{
+                    display: 'grid',
+                    gridTemplateColumns: isSmallScreen ? '1fr 1fr' : 'repeat(8, 1fr)',
+                    gap: 2
+                }}>
+                    <TextField
+                        label="Zone"
+                        size="small"
+                        value={filters.zone || ''}
+                        onChange={(e) => updateFilter('zone', e.target.value || undefined)}
+                    />
+                    <TextField
+                        label="Container"
+                        size="small"
+                        value={filters.container_id || ''}
+                        onChange={(e) => updateFilter('container_id', e.target.value || undefined)}
+                    />
+                    <TextField
+                        select
+                        label="Location"
+                        size="small"
+                        value={filters.placed === undefined ? '' : String(filters.placed)}
+                        onChange={(e) => updateFilter('placed', parseFlag(e.target.value))}
+                    >
+                        <MenuItem value="">All</MenuItem>
+                        <MenuItem value="true">Placed</MenuItem>
+                        <MenuItem value="false">Unplaced</MenuItem>
+                    </TextField>
+                    <TextField
+                        select
+                        label="Waste"
+                        size="small"
+                        value={filters.is_waste === undefined ? '' : String(filters.is_waste)}
+                        onChange={(e) => updateFilter('is_waste', parseFlag(e.target.value))}
+                    >
+                        <MenuItem value="">All</MenuItem>
+                        <MenuItem value="true">Waste</MenuItem>
+                        <MenuItem value="false">Not waste</MenuItem>
+                    </TextField>
+                    <TextField
+                        label="Min priority"
+                        type="number"
+                        size="small"
+                        value={filters.min_priority ?? ''}
+                        onChange={(e) => updateFilter('min_priority', parseNumber(e.target.value))}
+                    />
+                    <TextField
+                        label="Max priority"
+                        type="number"
+                        size="small"
+                        value={filters.max_priority ?? ''}
+                        onChange={(e) => updateFilter('max_priority', parseNumber(e.target.value))}
+                    />
+                    <TextField
+                        label="Expires after"
+                        type="date"
+                        size="small"
+                        InputLabelProps={{ shrink: true }}
+                        value={filters.expires_after || ''}
+                        onChange={(e) => updateFilter('expires_after', e.target.value || undefined)}
+                    />
+                    <TextField
+                        label="Expires before"
+                        type="date"
+                        size="small"
+                        InputLabelProps={{ shrink: true }}
+                        value={filters.expires_before || ''}
+                        onChange={(e) => updateFilter('expires_before', e.target.value || undefined)}
+                    />
+                </Box>
+                <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mt: 2, gap: 2 }}>
+                    <TextField
+                        select
+                        label="Sort by"
+                        size="small"
+                        value={sort}
+                        onChange={(e) => setSort(e.target.value)}
+                        sx={{ minWidth: 220 }}
+                    >
+                        <MenuItem value="-priority">Priority (high to low)</MenuItem>
+                        <MenuItem value="priority">Priority (low to high)</MenuItem>
+                        <MenuItem value="expiry_date">Expiry date (oldest first)</MenuItem>
+                        <MenuItem value="-expiry_date">Expiry date (newest first)</MenuItem>
+                        <MenuItem value="item_id">Item ID</MenuItem>
+                        <MenuItem value="name">Name</MenuItem>
+                        <MenuItem value="preferred_zone">Preferred zone</MenuItem>
+                    </TextField>
+                    {hasFilters && (
+                        <Button size="small" onClick={() => setFilters({})}>
+                            Clear filters
+                        </Button>
+                    )}
+                </Box>
+            </Paper>
+
             {/* Stats Cards */}
             {!loading && stats && (
                 <Box sx={{
@@ -283,19 +446,23 @@ const ItemsList: React.FC = () => {
                 >
                     <Info sx={{ fontSize: 60, color: 'text.secondary', mb: 2 }} />
                     <Typography variant="h5" color="text.secondary" gutterBottom>
-                        No items found
+                        {hasFilters ? 'No items match the filters' : 'No items found'}
                     </Typography>
                     <Typography color="text.secondary" sx={{ mb: 3, maxWidth: 500, mx: 'auto' }}>
-                        Add your first item to start organizing storage. Items can be placed into containers for better organization.
+                        {hasFilters
+                            ? 'Change or clear the filters to see more items.'
+                            : 'Add your first item to start organizing storage. Items can be placed into containers for better organization.'}
                     </Typography>
-                    <Button
-                        variant="contained"
-                        size="large"
-                        startIcon={<Add />}
-                        onClick={() => setOpenForm(true)}
-                    >
-                        Add First Item
-                    </Button>
+                    {!hasFilters && (
+                        <Button
+                            variant="contained"
+                            size="large"
+                            startIcon={<Add />}
+                            onClick={() => setOpenForm(true)}
+                        >
+                            Add First Item
+                        </Button>
+                    )}
                 </Paper>
             ) : (
                 <Paper sx={{ width: '100%', mb: 4, overflow: 'hidden', borderRadius: 2, boxShadow: 3 }}>
@@ -317,7 +484,6 @@ const ItemsList: React.FC = () => {
                             </TableHead>
                             <TableBody>
                                 {items
-                                    .slice(page * rowsPerPage, page * rowsPerPage + rowsPerPage)
                                     .map((item) => (
                                         <TableRow
                                             key={item.item_id}
@@ -446,7 +612,7 @@ const ItemsList: React.FC = () => {
                     <TablePagination
                         rowsPerPageOptions={[5, 10, 25, 50]}
                         component="div"
-                        count={items.length}
+                        count={summary ? summary.total : -1}
                         rowsPerPage={rowsPerPage}
                         page={page}
                         onPageChange={handleChangePage}
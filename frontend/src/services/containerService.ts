@@ -1,11 +1,26 @@
 import api from './api';
-import { Container, ContainerCreate } from '../types/Container';
+import { Container, ContainerCreate, ContainerFilters, ContainerSummary } from '../types/Container';
+import { ListingPage, ListingParams, listingQuery } from '../types/Listing';
 
 export const getContainers = async (): Promise<Container[]> => {
     const response = await api.get('/containers');
     return response.data;
 };
 
+// One page of containers; pass the returned nextCursor as cursor for the next page
+export const getContainersPage = async (
+    params: ListingParams<ContainerFilters> = {}
+): Promise<ListingPage<Container>> => {
+    const response = await api.get('/containers/page', { params: listingQuery(params) });
+    return response.data;
+};
+
+// Totals over all containers matching the filters (a full scan, so fetch it after the first page)
+export const getContainersSummary = async (filters: ContainerFilters = {}): Promise<ContainerSummary> => {
+    const response = await api.get('/containers/summary', { params: listingQuery({ filters }) });
+    return response.data;
+};
+
 export const getContainerById = async (id: string): Promise<Container> => {
     const response = await api.get(`/containers/${id}`);
     return response.data;
@@ -1,11 +1,26 @@
 import api from './api';
-import { Item, ItemCreate } from '../types/Item';
+import { Item, ItemCreate, ItemFilters, ItemSummary } from '../types/Item';
+import { ListingPage, ListingParams, listingQuery } from '../types/Listing';
 
 export const getItems = async (): Promise<Item[]> => {
     const response = await api.get('/items');
     return response.data;
 };
 
+// One page of items; pass the returned nextCursor as cursor for the next page
+export const getItemsPage = async (
+    params: ListingParams<ItemFilters> = {}
+): Promise<ListingPage<Item>> => {
+    const response = await api.get('/items/page', { params: listingQuery(params) });
+    return response.data;
+};
+
+// Totals over all items matching the filters (a full scan, so fetch it after the first page)
+export const getItemsSummary = async (filters: ItemFilters = {}): Promise<ItemSummary> => {
+    const response = await api.get('/items/summary', { params: listingQuery({ filters }) });
+    return response.data;
+};
+
 export const createItem = async (item: ItemCreate): Promise<Item> => {
     const response = await api.post('/items', item);
     return response.data;
@@ -18,4 +18,13 @@ export interface ContainerCreate {
     width: number;
     depth: number;
     height: number;
-}
\ No newline at end of file
+}
+
+export interface ContainerFilters {
+    zone?: string;
+}
+
+export interface ContainerSummary {
+    total: number;
+    highUtilization: number;
+}
@@ -33,4 +33,22 @@ export interface ItemCreate {
     expiry_date?: string;
     usage_limit: number;
     preferred_zone: string;
-}
\ No newline at end of file
+}
+
+export interface ItemFilters {
+    zone?: string;
+    container_id?: string;
+    placed?: boolean;
+    is_waste?: boolean;
+    min_priority?: number;
+    max_priority?: number;
+    expires_after?: string;
+    expires_before?: string;
+}
+
+export interface ItemSummary {
+    total: number;
+    totalVolume: number;
+    totalMass: number;
+    unplaced: number;
+}
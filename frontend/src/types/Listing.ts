@@ -0,0 +1,30 @@
+// One page of a keyset-paginated listing (/api/items/page, /api/containers/page).
+// Totals over all matches come from the separate summary endpoints
+export interface ListingPage<T> {
+    data: T[];
+    nextCursor: string | null;
+    sort: string;
+}
+
+export interface ListingParams<F> {
+    filters?: F;
+    sort?: string;
+    cursor?: string | null;
+    limit?: number;
+    fields?: string[];
+}
+
+// Query parameters of a listing request; unset filters are left out
+export const listingQuery = <F extends object>(params: ListingParams<F>): Record<string, any> => {
+    const query: Record<string, any> = {};
+    Object.entries(params.filters || {}).forEach(([name, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            query[name] = value;
+        }
+    });
+    if (params.sort) query.sort = params.sort;
+    if (params.cursor) query.cursor = params.cursor;
+    if (params.limit) query.limit = params.limit;
+    if (params.fields && params.fields.length > 0) query.fields = params.fields.join(',');
+    return query;
+};